@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 提醒规则执行脚本
+
+直接修改过projects表（如执行help/update_status.py）后，运行本脚本按提醒规则补齐或更新提醒。
+"""
+
+import sys
+from pathlib import Path
+
+from utils.logger import get_logger
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from logic.reminder_rule_logic import ReminderRuleLogic
+
+logger = get_logger(__name__)
+
+
+def apply_reminder_rules():
+    """对全部项目执行全部提醒规则"""
+    try:
+        logger.info("开始执行提醒规则...")
+        removed, updated, created = ReminderRuleLogic().apply_all_rules()
+        logger.info(f"提醒规则执行完成，删除过时提醒 {removed} 条，更新提醒 {updated} 条，生成提醒 {created} 条")
+        return True
+    except Exception as e:
+        logger.error(f"执行提醒规则时出错: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    if not apply_reminder_rules():
+        sys.exit(1)
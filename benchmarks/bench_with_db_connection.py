@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - with_db_connection 单次调用开销基准测试
+
+使用内存中的假连接/游标，只测量装饰器本身的开销：
+- legacy: 旧实现（每次调用 inspect.signature + 递归格式化）
+- deep / columns / none: 新实现的三种结果格式化方式
+
+运行方式（在项目根目录）：
+    python benchmarks/bench_with_db_connection.py [调用次数] [每次返回行数]
+"""
+import functools
+import inspect
+import os
+import sys
+import timeit
+from datetime import date, datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymysql.constants import FIELD_TYPE
+
+import data.db_connection as db_connection
+from data.db_connection import (with_db_connection, RESULT_FORMAT_DEEP, RESULT_FORMAT_COLUMNS,
+                                RESULT_FORMAT_NONE)
+from utils.decorators import format_datetime_in_result
+
+DESCRIPTION = [
+    ('id', FIELD_TYPE.LONG), ('project_name', FIELD_TYPE.VAR_STRING), ('leader', FIELD_TYPE.VAR_STRING),
+    ('department', FIELD_TYPE.VAR_STRING), ('start_date', FIELD_TYPE.DATE), ('end_date', FIELD_TYPE.DATE),
+    ('funding_unit', FIELD_TYPE.VAR_STRING), ('level', FIELD_TYPE.VAR_STRING),
+    ('funding_amount', FIELD_TYPE.NEWDECIMAL), ('approval_year', FIELD_TYPE.VAR_STRING),
+    ('status', FIELD_TYPE.VAR_STRING), ('update_time', FIELD_TYPE.TIMESTAMP),
+]
+
+
+class FakeCursor:
+    description = [column + (None, None, None, None, None) for column in DESCRIPTION]
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        # 每次返回新的字典，和真实游标一致
+        return [dict(row) for row in self._rows]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    open = True
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def cursor(self, cursor_type=None):
+        return FakeCursor(self._rows)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def make_rows(count):
+    return [{
+        'id': i, 'project_name': f'项目{i}', 'leader': '张三', 'department': '科研处',
+        'start_date': date(2024, 1, 1), 'end_date': date(2026, 12, 31), 'funding_unit': '国家自然科学基金委',
+        'level': '国家级', 'funding_amount': Decimal('12.50'), 'approval_year': '2024', 'status': '进行中',
+        'update_time': datetime(2024, 5, 1, 12, 0, 0),
+    } for i in range(count)]
+
+
+def legacy_with_db_connection(cursor_type=None, commit=True):
+    """旧版装饰器的等价实现，作为对照"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        @format_datetime_in_result
+        def wrapper(*args, **kwargs):
+            conn = db_connection.get_connection()
+            cursor = conn.cursor(cursor_type)
+            try:
+                sig = inspect.signature(func)
+                if 'cursor' in sig.parameters:
+                    kwargs['cursor'] = cursor
+                    result = func(*args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                if commit:
+                    conn.commit()
+                return result
+            except Exception:
+                conn.rollback()
+                return None
+            finally:
+                cursor.close()
+                db_connection.release_connection(conn)
+
+        return wrapper
+
+    return decorator
+
+
+def query(cursor):
+    return cursor.fetchall()
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    fake_conn = FakeConnection(make_rows(rows))
+    db_connection.get_connection = lambda: fake_conn
+    db_connection.release_connection = lambda conn: None
+
+    variants = {
+        'legacy': legacy_with_db_connection()(query),
+        'deep': with_db_connection(result_format=RESULT_FORMAT_DEEP)(query),
+        'columns': with_db_connection(result_format=RESULT_FORMAT_COLUMNS)(query),
+        'none': with_db_connection(result_format=RESULT_FORMAT_NONE)(query),
+    }
+
+    # 校验三种格式化方式的结果一致
+    assert variants['legacy']() == variants['deep']() == variants['columns']()
+
+    print(f"调用次数: {calls}, 每次返回行数: {rows}")
+    baseline = None
+    for name, func in variants.items():
+        seconds = min(timeit.repeat(func, number=calls, repeat=3))
+        per_call_us = seconds / calls * 1e6
+        baseline = baseline or per_call_us
+        print(f"{name:>8}: {per_call_us:9.2f} us/次  ({baseline / per_call_us:5.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
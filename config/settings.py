@@ -126,6 +126,17 @@ DB_CONFIG = {
 if 'database' in config:
     DB_CONFIG.update({k: v for k, v in config['database'].items() if not (v is None or v == "")})
 
+# 数据库连接池配置
+DB_POOL_CONFIG = {
+    'min_size': 1,  # 回收空闲连接时至少保留的连接数
+    'max_size': 10,  # 最大连接数
+    'idle_timeout': 300,  # 空闲连接保留时间（秒）
+    'ping_interval': 30,  # 空闲超过该时间（秒）的连接取出前做存活检测
+    'wait_timeout': 10  # 连接耗尽时的最长等待时间（秒）
+}
+if 'database_pool' in config:
+    DB_POOL_CONFIG.update({k: v for k, v in config['database_pool'].items() if not (v is None or v == "")})
+
 # 系统配置
 SYSTEM_CONFIG = {
     'system_name': '科研项目管理系统',
@@ -185,11 +196,27 @@ FILE_SERVER_CONFIG = {
     "root_dir": DEFAULT_ROOT_DIR,
     "remote_server": True,
     "remote_host": "",
-    "remote_port": 5001
+    "remote_port": 5001,
+    "dedup": False  # 按内容SHA-256去重存储上传的文件，相同内容只保存一份
 }
 if 'file_server' in config:
     FILE_SERVER_CONFIG.update({k: v for k, v in config['file_server'].items() if not (v is None or v == "")})
 
+# 文件服务器客户端HTTP连接配置，每个文件服务器（host, port）共用一个保持长连接的会话
+FILE_CLIENT_CONFIG = {
+    "pool_connections": 4,  # 连接池数量
+    "pool_maxsize": 10,  # 每个连接池保持的最大连接数
+    "connect_timeout": 5,  # 建立连接超时时间（秒）
+    "read_timeout": 60,  # 读取响应超时时间（秒）
+    "max_retries": 2,  # 建立连接失败时的重试次数（不重试上传）
+    "resumable_threshold": 32 * 1024 * 1024,  # 不小于该大小（字节）的文件使用断点续传分块上传
+    "chunk_size": 8 * 1024 * 1024,  # 断点续传的分块大小（字节）
+    "upload_retries": 5,  # 断点续传连续失败（没有新分块上传成功）的最多重试次数
+    "download_retries": 3  # 下载中断后连续续传（没有收到新数据）的最多次数
+}
+if 'file_client' in config:
+    FILE_CLIENT_CONFIG.update({k: v for k, v in config['file_client'].items() if not (v is None or v == "")})
+
 LOG_CONFIG = {
     "log_dir": DEFAULT_LOG_DIR,
     "log_level": "INFO",
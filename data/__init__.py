@@ -1,8 +1,9 @@
 # 数据访问模块初始化文件
-from .db_connection import get_connection, init_database
+from .db_connection import get_connection, release_connection, get_pool_stats, init_database, transaction
 from .help_doc_dao import HelpDocDAO
 from .project_dao import ProjectDAO
 from .project_result_attachment_dao import ProjectResultAttachmentDAO
 from .project_result_dao import ProjectResultDAO
 from .reminder_dao import ReminderDAO
+from .reminder_rule_dao import ReminderRuleDAO
 from .user_dao import UserDAO
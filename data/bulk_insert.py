@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+科研项目管理系统 - 批量插入/更新工具
+"""
+from typing import Any, Iterator, List, Optional, Sequence
+
+# 默认每条多行INSERT语句包含的行数
+DEFAULT_CHUNK_SIZE = 500
+
+
+def chunked(rows: Sequence[Any], chunk_size: int) -> Iterator[Sequence[Any]]:
+    """按固定大小切分序列"""
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+def _row_values(row, fields: Sequence[str]) -> tuple:
+    """按字段顺序取查询结果的值（兼容Cursor和DictCursor）"""
+    if isinstance(row, dict):
+        return tuple(row[field] for field in fields)
+    return tuple(row)
+
+
+def _values_sql(field_count: int, row_count: int) -> str:
+    """生成多行VALUES占位符"""
+    row_sql = "(" + ", ".join(["%s"] * field_count) + ")"
+    return ", ".join([row_sql] * row_count)
+
+
+def _select_ids(cursor, table: str, key_fields: Sequence[str], keys: Sequence[tuple]) -> List[int]:
+    """按唯一键回查记录ID，返回与keys顺序一致的ID，查不到的为-1"""
+    if len(key_fields) == 1:
+        where_sql = f"{key_fields[0]} IN ({', '.join(['%s'] * len(keys))})"
+    else:
+        where_sql = f"({', '.join(key_fields)}) IN ({_values_sql(len(key_fields), len(keys))})"
+    cursor.execute(f"SELECT id, {', '.join(key_fields)} FROM {table} WHERE {where_sql}",
+                   [value for key in keys for value in key])
+    id_map = {}
+    for row in cursor.fetchall():
+        values = _row_values(row, ['id'] + list(key_fields))
+        id_map[values[1:]] = values[0]
+    return [id_map.get(key, -1) for key in keys]
+
+
+def insert_many(cursor, table: str, fields: Sequence[str], rows: Sequence[Sequence[Any]],
+                chunk_size: int = DEFAULT_CHUNK_SIZE, key_fields: Optional[Sequence[str]] = None) -> List[int]:
+    """
+    使用多行INSERT批量插入数据
+
+    新记录ID的获取方式：
+    - 指定key_fields（唯一键）时，插入后按唯一键回查ID；
+    - 否则在innodb_autoinc_lock_mode为0或1时，同一条多行INSERT生成的自增ID连续，
+      由cursor.lastrowid（首行ID）和auto_increment_increment推算每一行的ID；
+    - lock_mode为2（MySQL 8默认）时并发插入可能使ID不连续，无法推算，改为逐行插入取lastrowid。
+
+    Args:
+        cursor: 数据库游标
+        table: 表名
+        fields: 字段名列表
+        rows: 每行的参数值，顺序与fields一致
+        chunk_size: 每条INSERT语句包含的行数
+        key_fields: 唯一键字段（须包含在fields中），用于回查新记录ID
+
+    Returns:
+        List[int]: 与rows顺序一致的新记录ID
+    """
+    if not rows:
+        return []
+
+    if key_fields:
+        key_indexes = [list(fields).index(field) for field in key_fields]
+    else:
+        cursor.execute("SELECT @@auto_increment_increment AS step, @@innodb_autoinc_lock_mode AS lock_mode")
+        step, lock_mode = (int(value) for value in _row_values(cursor.fetchone(), ['step', 'lock_mode']))
+        if lock_mode not in (0, 1):
+            sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES {_values_sql(len(fields), 1)}"
+            ids = []
+            for row in rows:
+                cursor.execute(sql, list(row))
+                ids.append(cursor.lastrowid)
+            return ids
+
+    ids = []
+    for chunk in chunked(rows, chunk_size):
+        sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES {_values_sql(len(fields), len(chunk))}"
+        cursor.execute(sql, [value for row in chunk for value in row])
+        if key_fields:
+            ids.extend(_select_ids(cursor, table, key_fields,
+                                   [tuple(row[index] for index in key_indexes) for row in chunk]))
+        else:
+            first_id = cursor.lastrowid
+            ids.extend(first_id + index * step for index in range(len(chunk)))
+    return ids
+
+
+def upsert_many(cursor, table: str, fields: Sequence[str], rows: Sequence[Sequence[Any]],
+                key_fields: Sequence[str], update_fields: Optional[Sequence[str]] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+    """
+    使用 INSERT ... ON DUPLICATE KEY UPDATE 批量插入或更新数据
+
+    Args:
+        cursor: 数据库游标
+        table: 表名
+        fields: 字段名列表，必须包含key_fields
+        rows: 每行的参数值，顺序与fields一致
+        key_fields: 主键或唯一键字段，用于判断记录是否已存在并回查ID
+        update_fields: 记录已存在时需要更新的字段，None表示除key_fields外的全部字段，
+                       空列表表示保留已存在的记录不做修改
+        chunk_size: 每条语句包含的行数
+
+    Returns:
+        List[int]: 与rows顺序一致的记录ID，无法确定的记录为-1
+    """
+    if not rows:
+        return []
+
+    if update_fields is None:
+        update_fields = [field for field in fields if field not in key_fields]
+    if update_fields:
+        update_sql = ", ".join(f"{field} = VALUES({field})" for field in update_fields)
+    else:
+        update_sql = "id = id"
+
+    key_indexes = [list(fields).index(field) for field in key_fields]
+    ids = []
+    for chunk in chunked(rows, chunk_size):
+        sql = f"""
+            INSERT INTO {table} ({', '.join(fields)}) VALUES {_values_sql(len(fields), len(chunk))}
+            ON DUPLICATE KEY UPDATE {update_sql}
+        """
+        cursor.execute(sql, [value for row in chunk for value in row])
+
+        keys = [tuple(row[index] for index in key_indexes) for row in chunk]
+        if list(key_fields) == ['id']:
+            ids.extend(key[0] for key in keys)
+            continue
+
+        # 按唯一键回查本批记录的ID
+        ids.extend(_select_ids(cursor, table, key_fields, keys))
+    return ids
+
+
+def save_many(cursor, table: str, fields: Sequence[str], rows: Sequence[Sequence[Any]],
+              row_ids: Sequence[Optional[int]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+    """
+    按主键批量保存：带ID的行按主键插入或更新，不带ID的行批量插入
+
+    Args:
+        cursor: 数据库游标
+        table: 表名
+        fields: 字段名列表（不含id）
+        rows: 每行的参数值，顺序与fields一致
+        row_ids: 每行对应的ID，新记录为None
+        chunk_size: 每条语句包含的行数
+
+    Returns:
+        List[int]: 与rows顺序一致的记录ID
+    """
+    ids: List[Optional[int]] = list(row_ids)
+    existing = [index for index, row_id in enumerate(row_ids) if row_id]
+    new = [index for index, row_id in enumerate(row_ids) if not row_id]
+
+    if existing:
+        upsert_many(cursor, table, ['id'] + list(fields),
+                    [(row_ids[index],) + tuple(rows[index]) for index in existing],
+                    key_fields=['id'], chunk_size=chunk_size)
+    if new:
+        new_ids = insert_many(cursor, table, fields, [rows[index] for index in new], chunk_size=chunk_size)
+        for index, new_id in zip(new, new_ids):
+            ids[index] = new_id
+    return ids
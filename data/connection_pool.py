@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+科研项目管理系统 - 数据库连接池
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _PooledConnection:
+    """连接池中的连接条目"""
+    __slots__ = ('conn', 'generation', 'last_used')
+
+    def __init__(self, conn, generation: int):
+        self.conn = conn
+        self.generation = generation
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """线程安全的有界数据库连接池
+
+    - 同一线程内嵌套获取连接时复用同一连接（引用计数）
+    - 线程归还连接后优先再次取回自己上次使用的连接
+    - 空闲超过 ping_interval 的连接在取出时做存活检测
+    - 空闲超过 idle_timeout 的连接在保留 min_size 个的前提下被回收
+    """
+
+    def __init__(self, creator: Callable[[], Any], min_size: int = 1, max_size: int = 10,
+                 idle_timeout: float = 300, ping_interval: float = 30, wait_timeout: float = 10):
+        """
+        Args:
+            creator: 创建新数据库连接的函数
+            min_size: 回收空闲连接时至少保留的连接数
+            max_size: 连接总数上限
+            idle_timeout: 空闲连接的最长保留时间（秒）
+            ping_interval: 空闲超过该时间（秒）的连接在取出前做存活检测
+            wait_timeout: 连接耗尽时等待的最长时间（秒）
+        """
+        self._creator = creator
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.wait_timeout = wait_timeout
+
+        self._cond = threading.Condition()
+        self._idle: List[_PooledConnection] = []
+        self._entries: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._generation = 0
+        self._local = threading.local()
+        self._stats = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'reuses': 0,
+            'affinity_hits': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'ping_failures': 0,
+        }
+
+    def acquire(self, dedicated: bool = False):
+        """从连接池获取连接
+
+        Args:
+            dedicated: 是否获取独占连接。独占连接不参与同一线程的嵌套复用，
+                       适用于流式读取等需要长时间占用连接的场景
+
+        Returns:
+            数据库连接
+
+        Raises:
+            TimeoutError: 等待超过 wait_timeout 仍无可用连接
+        """
+        local = self._local
+        if not dedicated and getattr(local, 'depth', 0) > 0:
+            # 同一线程嵌套调用，复用已持有的连接
+            local.depth += 1
+            return local.held.conn
+
+        while True:
+            entry = self._checkout()
+            if entry is None:
+                entry = self._create_entry()
+            elif not self._is_alive(entry):
+                self._discard(entry)
+                continue
+            break
+
+        if not dedicated:
+            local.held = entry
+            local.depth = 1
+        return entry.conn
+
+    def release(self, conn) -> None:
+        """归还连接到连接池"""
+        local = self._local
+        held = getattr(local, 'held', None)
+        if held is not None and held.conn is conn:
+            local.depth -= 1
+            if local.depth > 0:
+                return
+            local.held = None
+
+        to_close = []
+        with self._cond:
+            entry = self._entries.get(id(conn))
+            if entry is None:
+                return
+            if entry.generation != self._generation or not conn.open:
+                self._remove_locked(entry)
+                to_close.append(entry)
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+                local.preferred = entry
+            to_close.extend(self._reap_locked())
+            self._cond.notify()
+
+        self._close_entries(to_close)
+
+    def holds_connection(self) -> bool:
+        """当前线程是否持有连接"""
+        return getattr(self._local, 'depth', 0) > 0
+
+    def warm_up(self) -> None:
+        """预先创建连接直到达到 min_size"""
+        entries = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size:
+                        break
+                    self._size += 1
+                entries.append(self._new_entry())
+        finally:
+            for entry in entries:
+                self.release(entry.conn)
+
+    def reset(self) -> None:
+        """关闭所有空闲连接，使用中的连接在归还时关闭"""
+        with self._cond:
+            self._generation += 1
+            to_close = list(self._idle)
+            for entry in to_close:
+                self._remove_locked(entry)
+            self._cond.notify_all()
+        self._close_entries(to_close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            stats['max_size'] = self.max_size
+            stats['min_size'] = self.min_size
+        return stats
+
+    def _checkout(self) -> Optional[_PooledConnection]:
+        """取出一个空闲连接；需要新建连接时返回None并预占名额"""
+        deadline = None
+        with self._cond:
+            self._stats['checkouts'] += 1
+            while True:
+                if self._idle:
+                    preferred = getattr(self._local, 'preferred', None)
+                    if preferred is not None and preferred in self._idle:
+                        self._idle.remove(preferred)
+                        self._stats['affinity_hits'] += 1
+                        entry = preferred
+                    else:
+                        entry = self._idle.pop()
+                    self._stats['reuses'] += 1
+                    return entry
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+
+                now = time.monotonic()
+                if deadline is None:
+                    deadline = now + self.wait_timeout
+                    self._stats['waits'] += 1
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise TimeoutError(f"等待数据库连接超时（{self.wait_timeout}秒），连接池已满: {self.max_size}")
+                self._cond.wait(remaining)
+                self._stats['wait_time'] += time.monotonic() - now
+
+    def _create_entry(self) -> _PooledConnection:
+        """创建新连接（调用前已预占名额）"""
+        try:
+            return self._new_entry()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _new_entry(self) -> _PooledConnection:
+        conn = self._creator()
+        with self._cond:
+            entry = _PooledConnection(conn, self._generation)
+            self._entries[id(conn)] = entry
+            self._stats['created'] += 1
+        return entry
+
+    def _is_alive(self, entry: _PooledConnection) -> bool:
+        """检查连接是否可用"""
+        if entry.generation != self._generation or not entry.conn.open:
+            return False
+        if time.monotonic() - entry.last_used < self.ping_interval:
+            return True
+        try:
+            entry.conn.ping(reconnect=False)
+            return True
+        except Exception as e:
+            logger.warning(f"数据库连接存活检测失败，将重新创建连接: {e}")
+            with self._cond:
+                self._stats['ping_failures'] += 1
+            return False
+
+    def _discard(self, entry: _PooledConnection) -> None:
+        """丢弃已取出的连接"""
+        with self._cond:
+            self._remove_locked(entry)
+            self._cond.notify()
+        self._close_entries([entry])
+
+    def _remove_locked(self, entry: _PooledConnection) -> None:
+        if self._entries.pop(id(entry.conn), None) is not None:
+            self._size -= 1
+        if entry in self._idle:
+            self._idle.remove(entry)
+
+    def _reap_locked(self) -> List[_PooledConnection]:
+        """回收空闲超时的连接"""
+        reaped = []
+        now = time.monotonic()
+        for entry in list(self._idle):
+            if self._size <= self.min_size:
+                break
+            if now - entry.last_used >= self.idle_timeout:
+                self._remove_locked(entry)
+                reaped.append(entry)
+        return reaped
+
+    def _close_entries(self, entries: List[_PooledConnection]) -> None:
+        for entry in entries:
+            try:
+                if entry.conn.open:
+                    entry.conn.close()
+            except Exception as e:
+                logger.warning(f"关闭数据库连接失败: {e}")
+        if entries:
+            with self._cond:
+                self._stats['closed'] += len(entries)
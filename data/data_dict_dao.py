@@ -7,9 +7,12 @@ from typing import List, Optional, Dict
 
 from pymysql.cursors import Cursor, DictCursor
 
-from data.db_connection import with_db_connection
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, insert_many, upsert_many
+from data.db_connection import with_db_connection, RESULT_FORMAT_NONE
 from models.data_dict import DataDict, DataDictCreate, DataDictUpdate
 
+DATA_DICT_FIELDS = ["dict_type", "dict_key", "dict_value", "sort_order", "is_active", "description"]
+
 
 class DataDictDAO:
     """数据字典数据访问对象"""
@@ -18,7 +21,7 @@ class DataDictDAO:
         self.table_name = "data_dicts"
         self.model = DataDict
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('data_dicts',))
     def insert(self, dict_data: DataDictCreate, cursor: Cursor) -> int:
         """插入新数据字典项"""
         sql = f"""
@@ -36,7 +39,35 @@ class DataDictDAO:
         ))
         return cursor.lastrowid if cursor.lastrowid is not None else -1
 
-    @with_db_connection()
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('data_dicts',))
+    def insert_many(self, dict_items: List[DataDictCreate], cursor: Cursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量插入数据字典项，返回与输入顺序一致的新字典项ID"""
+        fields = DATA_DICT_FIELDS
+        rows = [tuple(getattr(item, field) for field in fields) for item in dict_items]
+        return insert_many(cursor, self.table_name, fields, rows, chunk_size, key_fields=['dict_type', 'dict_key'])
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('data_dicts',))
+    def upsert_many(self, dict_items: List[DataDictCreate], cursor: Cursor,
+                    update_fields: Optional[List[str]] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """
+        按(dict_type, dict_key)批量插入或更新数据字典项
+
+        Args:
+            dict_items: 数据字典项列表
+            update_fields: 已存在时需要更新的字段，None表示全部更新，空列表表示保留已存在的记录
+            chunk_size: 每条语句包含的行数
+
+        Returns:
+            List[int]: 与输入顺序一致的字典项ID
+        """
+        fields = DATA_DICT_FIELDS
+        rows = [tuple(getattr(item, field) for field in fields) for item in dict_items]
+        return upsert_many(cursor, self.table_name, fields, rows, ['dict_type', 'dict_key'],
+                           update_fields, chunk_size)
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_id(self, dict_id: int, cursor: DictCursor) -> Optional[DataDict]:
         """根据ID获取数据字典项"""
         sql = f"SELECT * FROM {self.table_name} WHERE id = %s"
@@ -46,7 +77,7 @@ class DataDictDAO:
             return DataDict(**result)
         return None
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_type_and_key(self, dict_type: str, dict_key: str, cursor: DictCursor) -> List[DataDict]:
         """根据类型获取数据字典列表"""
         sql = f"""
@@ -58,7 +89,7 @@ class DataDictDAO:
         results = cursor.fetchall()
         return [DataDict(**row) for row in results]
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_type(self, dict_type: str, cursor: DictCursor) -> List[DataDict]:
         """根据类型获取数据字典列表"""
         sql = f"""
@@ -70,7 +101,7 @@ class DataDictDAO:
         results = cursor.fetchall()
         return [DataDict(**row) for row in results]
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_all_types(self, cursor: DictCursor) -> List[str]:
         """获取所有字典类型"""
         sql = f"SELECT DISTINCT dict_type FROM {self.table_name} ORDER BY dict_type"
@@ -78,7 +109,19 @@ class DataDictDAO:
         results = cursor.fetchall()
         return [row['dict_type'] for row in results]
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def get_all_active(self, cursor: DictCursor) -> List[DataDict]:
+        """获取所有启用的数据字典项，同一类型内的顺序与get_by_type一致"""
+        sql = f"""
+            SELECT * FROM {self.table_name}
+            WHERE is_active = 1
+            ORDER BY dict_type ASC, sort_order ASC, dict_key ASC
+        """
+        cursor.execute(sql)
+        results = cursor.fetchall()
+        return [DataDict(**row) for row in results]
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_all(self, cursor: DictCursor) -> List[DataDict]:
         """获取所有数据字典项"""
         sql = f"SELECT * FROM {self.table_name} ORDER BY dict_type ASC, sort_order ASC"
@@ -86,7 +129,7 @@ class DataDictDAO:
         results = cursor.fetchall()
         return [DataDict(**row) for row in results]
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('data_dicts',))
     def update(self, dict_id: int, dict_data: DataDictUpdate, cursor: Cursor) -> bool:
         """更新数据字典项"""
         update_data = dict_data.dict(exclude_unset=True)
@@ -105,14 +148,14 @@ class DataDictDAO:
         cursor.execute(sql, tuple(values))
         return cursor.rowcount > 0
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('data_dicts',))
     def delete(self, dict_id: int, cursor: Cursor) -> bool:
         """删除数据字典项"""
         sql = f"DELETE FROM {self.table_name} WHERE id = %s"
         cursor.execute(sql, (dict_id,))
         return cursor.rowcount > 0
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_dict_map(self, dict_type: str, cursor: DictCursor) -> Dict[str, str]:
         """获取指定类型的字典映射"""
         sql = f"""
@@ -167,7 +210,5 @@ class DataDictDAO:
             {"dict_type": "result_type", "dict_key": "REPORT", "dict_value": "研究报告", "sort_order": 5},
         ]
 
-        for item in default_data:
-            if not self.get_by_type_and_key(item["dict_type"], item["dict_key"]):
-                dict_data = DataDictCreate(**item)
-                self.insert(dict_data)
+        # 已存在的字典项保持不变，只补充缺失项
+        self.upsert_many([DataDictCreate(**item) for item in default_data], update_fields=[])
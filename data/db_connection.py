@@ -4,13 +4,20 @@
 """
 科研项目管理系统 - 数据库连接管理
 """
+import contextlib
 import functools
+import inspect
+import threading
+from datetime import date, datetime
+from decimal import Decimal
 
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.constants import FIELD_TYPE
+from pymysql.cursors import DictCursor, SSDictCursor
 
-from config.settings import DB_CONFIG
-from utils.decorators import format_datetime_in_result
+from config.settings import DB_CONFIG, DB_POOL_CONFIG
+from data.connection_pool import ConnectionPool
+from models.base import DateTimeFormatterMixin
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -31,92 +38,387 @@ class DatabaseConnection:
             self.initialized = True
             self.config = DB_CONFIG
             self._connection = None
+            self._pool = ConnectionPool(self._create_connection, **DB_POOL_CONFIG)
+            self._pool_config_key = None
+
+    def _config_key(self):
+        """连接参数快照，配置变化时用于重建连接池"""
+        return (
+            self.config['host'],
+            self.config.get('port', 3306),
+            self.config['user'],
+            self.config['password'],
+            self.config['db_name'],
+            self.config['charset']
+        )
+
+    def _create_connection(self):
+        """创建新的数据库连接"""
+        return pymysql.connect(
+            host=self.config['host'],
+            port=self.config.get('port', 3306),
+            user=self.config['user'],
+            password=self.config['password'],
+            db=self.config['db_name'],
+            charset=self.config['charset'],
+            cursorclass=DictCursor
+        )
 
     def connect(self):
-        """建立数据库连接"""
+        """建立独立的数据库连接（不经过连接池）"""
         if self._connection is None or not self._connection.open:
             try:
-                self._connection = pymysql.connect(
-                    host=self.config['host'],
-                    port=self.config.get('port', 3306),
-                    user=self.config['user'],
-                    password=self.config['password'],
-                    db=self.config['db_name'],
-                    charset=self.config['charset'],
-                    cursorclass=DictCursor
-                )
+                self._connection = self._create_connection()
             except Exception as e:
                 logger.error(f"数据库连接失败: {e}")
                 self._connection = None
         return self._connection
 
     def close(self):
-        """关闭数据库连接"""
+        """关闭独立连接及连接池中的空闲连接"""
         if self._connection and self._connection.open:
             self._connection.close()
             self._connection = None
             logger.info("数据库连接已关闭")
+        self._pool.reset()
 
-    def get_connection(self):
-        """获取数据库连接"""
-        return self.connect()
+    def get_connection(self, dedicated=False):
+        """从连接池获取数据库连接，失败返回None
+
+        Args:
+            dedicated: 是否获取独占连接（不与当前线程已持有的连接复用）
+        """
+        config_key = self._config_key()
+        if config_key != self._pool_config_key:
+            # 数据库配置发生变化，丢弃旧配置下的连接
+            if self._pool_config_key is not None:
+                self._pool.reset()
+            self._pool_config_key = config_key
+        try:
+            return self._pool.acquire(dedicated)
+        except Exception as e:
+            logger.error(f"数据库连接失败: {e}")
+            return None
+
+    def release_connection(self, conn):
+        """归还数据库连接到连接池"""
+        if conn is not None:
+            self._pool.release(conn)
+
+    def get_pool_stats(self):
+        """获取连接池统计信息"""
+        return self._pool.get_stats()
 
 
 # 全局数据库连接实例
 _db_instance = DatabaseConnection()
 
 
-def get_connection():
-    """获取数据库连接"""
-    return _db_instance.get_connection()
+def get_connection(dedicated=False):
+    """从连接池获取数据库连接，使用完毕后需调用release_connection归还"""
+    return _db_instance.get_connection(dedicated)
+
+
+def release_connection(conn):
+    """归还数据库连接到连接池"""
+    _db_instance.release_connection(conn)
+
+
+def get_pool_stats():
+    """获取连接池统计信息（创建数、取出数、等待数等）"""
+    return _db_instance.get_pool_stats()
+
+
+# 表数据版本号，表数据被修改并提交后递增，用于缓存失效
+_table_versions = {}
+_table_versions_lock = threading.Lock()
+
+
+def get_table_version(table):
+    """获取表的数据版本号，缓存可以据此判断数据是否已被修改"""
+    return _table_versions.get(table, 0)
+
+
+def bump_table_versions(tables):
+    """递增表的数据版本号，使依赖这些表的缓存失效"""
+    if not tables:
+        return
+    with _table_versions_lock:
+        for table in tables:
+            _table_versions[table] = _table_versions.get(table, 0) + 1
+
+
+# 当前线程的事务状态
+_transaction_state = threading.local()
+
+
+def in_transaction():
+    """当前线程是否处于transaction()事务范围内"""
+    return getattr(_transaction_state, 'depth', 0) > 0
+
+
+@contextlib.contextmanager
+def transaction():
+    """
+    事务上下文，范围内的所有DAO调用共用同一个连接，退出时统一提交
+
+    - 范围内DAO方法不再各自提交，发生异常时直接抛出而不是返回None
+    - 范围内任何异常都会回滚整个事务
+    - 嵌套使用时并入最外层事务
+
+    用法:
+        with transaction():
+            project_dao.update(...)
+            project_result_dao.insert(...)
+
+    Raises:
+        ConnectionError: 无法获取数据库连接
+    """
+    if in_transaction():
+        _transaction_state.depth += 1
+        try:
+            yield _transaction_state.conn
+        finally:
+            _transaction_state.depth -= 1
+        return
+
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("无法获取数据库连接")
+
+    _transaction_state.conn = conn
+    _transaction_state.depth = 1
+    _transaction_state.modified_tables = set()
+    try:
+        yield conn
+        conn.commit()
+        bump_table_versions(_transaction_state.modified_tables)
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _transaction_state.depth = 0
+        _transaction_state.conn = None
+        _transaction_state.modified_tables = set()
+        release_connection(conn)
+
+
+def _mark_tables_modified(tables):
+    """记录被修改的表：事务中在提交后统一递增版本号，否则立即递增"""
+    if not tables:
+        return
+    if in_transaction():
+        _transaction_state.modified_tables.update(tables)
+    else:
+        bump_table_versions(tables)
+
+
+# 结果格式化方式
+RESULT_FORMAT_DEEP = 'deep'  # 递归格式化整个返回值（默认，兼容旧行为）
+RESULT_FORMAT_COLUMNS = 'columns'  # 按游标列类型只格式化日期/时间/小数列
+RESULT_FORMAT_NONE = None  # 不格式化，适用于返回模型对象或标量的方法
+
+def _format_date(value):
+    """DATE列: date -> 'xxxx-xx-xx'"""
+    if type(value) is date:
+        return value.isoformat()
+    return DateTimeFormatterMixin.format_value(value)
+
+
+def _format_datetime(value):
+    """DATETIME/TIMESTAMP列: datetime -> 'xxxx-xx-xx xx:xx:xx'"""
+    if type(value) is datetime:
+        return value.isoformat(' ', 'seconds')
+    return DateTimeFormatterMixin.format_value(value)
+
+
+def _format_decimal(value):
+    """DECIMAL列: Decimal -> float字符串"""
+    if type(value) is Decimal:
+        return str(float(value))
+    return DateTimeFormatterMixin.format_value(value)
+
+
+# 需要格式化的MySQL列类型及对应的转换函数
+_FIELD_TYPE_FORMATTERS = {
+    FIELD_TYPE.DATE: _format_date,
+    FIELD_TYPE.NEWDATE: _format_date,
+    FIELD_TYPE.DATETIME: _format_datetime,
+    FIELD_TYPE.TIMESTAMP: _format_datetime,
+    FIELD_TYPE.DECIMAL: _format_decimal,
+    FIELD_TYPE.NEWDECIMAL: _format_decimal,
+}
+
+
+def compile_row_formatter(description):
+    """
+    根据游标的列描述生成行格式化函数，只处理日期、时间和小数列
 
+    Args:
+        description: cursor.description
 
-def with_db_connection(cursor_type=DictCursor, commit=True):
+    Returns:
+        格式化单行数据的函数（原地修改字典行），没有需要格式化的列时返回None
+    """
+    if not description:
+        return None
+
+    columns = [(index, column[0], _FIELD_TYPE_FORMATTERS[column[1]])
+               for index, column in enumerate(description)
+               if column[1] in _FIELD_TYPE_FORMATTERS]
+    if not columns:
+        return None
+
+    def format_row(row):
+        if isinstance(row, dict):
+            for _, name, convert in columns:
+                value = row.get(name)
+                if value is not None:
+                    row[name] = convert(value)
+            return row
+        if isinstance(row, (tuple, list)):
+            row = list(row)
+            for index, _, convert in columns:
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+            return tuple(row)
+        return row
+
+    return format_row
+
+
+def _format_result(result, result_format, cursor):
+    """按指定方式格式化数据库操作结果"""
+    if result_format is RESULT_FORMAT_NONE or result is None:
+        return result
+    if result_format == RESULT_FORMAT_COLUMNS:
+        is_rows = isinstance(result, (list, tuple)) and result and isinstance(result[0], (dict, tuple, list))
+        if not is_rows and not isinstance(result, (dict, tuple)):
+            return result
+        format_row = compile_row_formatter(cursor.description)
+        if format_row is None:
+            return result
+        if is_rows:
+            return [format_row(row) for row in result]
+        return format_row(result)
+    return DateTimeFormatterMixin.format_value(result)
+
+
+def with_db_connection(cursor_type=DictCursor, commit=True, result_format=RESULT_FORMAT_DEEP, modifies=()):
     """
     数据库连接装饰器，自动管理数据库连接、游标、事务和异常处理
     
     Args:
         cursor_type: 游标的类型，默认为DictCursor
         commit: 是否需要commit
+        result_format: 结果格式化方式，RESULT_FORMAT_DEEP / RESULT_FORMAT_COLUMNS / RESULT_FORMAT_NONE
+        modifies: 方法会修改的表，成功提交后递增这些表的数据版本号（见get_table_version）
 
     Returns:
         装饰器函数
     """
 
     def decorator(func):
+        # 在装饰时检查函数是否需要cursor参数，避免每次调用都做反射
+        needs_cursor = 'cursor' in inspect.signature(func).parameters
+
         @functools.wraps(func)
-        @format_datetime_in_result
         def wrapper(*args, **kwargs):
             conn = get_connection()
             cursor = conn.cursor(cursor_type)
+            # 处于事务范围内时由transaction()统一提交或回滚
+            managed = in_transaction()
             try:
-                # 检查函数是否需要cursor参数
-                import inspect
-                sig = inspect.signature(func)
-                if 'cursor' in sig.parameters:
+                if needs_cursor:
                     kwargs['cursor'] = cursor
-                    result = func(*args, **kwargs)
-                else:
-                    result = func(*args, **kwargs)
-
+                result = func(*args, **kwargs)
+
+                if not managed:
+                    if commit:
+                        conn.commit()
+                    else:
+                        # 连接会被复用，不提交时需结束当前事务
+                        conn.rollback()
                 if commit:
-                    conn.commit()
-                return result
+                    _mark_tables_modified(modifies)
+                return _format_result(result, result_format, cursor)
             except Exception as e:
                 logger.error(f"数据库操作失败: {e}")
+                if managed:
+                    raise
                 if conn: conn.rollback()
                 return None
             finally:
                 if cursor: cursor.close()
-                if conn: conn.close()
+                release_connection(conn)
 
         return wrapper
 
     return decorator
 
 
+def with_db_stream(cursor_type=SSDictCursor):
+    """
+    流式查询装饰器，用于生成器形式的DAO方法
+
+    使用非缓冲游标（SSCursor/SSDictCursor）逐行读取，结果不会一次性加载到内存。
+    生成器运行期间独占一个连接池连接，迭代结束或生成器关闭时归还；
+    提前结束迭代时直接断开该连接，避免读完剩余的结果集。
+    流式查询不参与transaction()，看不到当前事务中未提交的修改。
+
+    Args:
+        cursor_type: 游标的类型，默认为SSDictCursor
+
+    Returns:
+        装饰器函数
+
+    Raises:
+        ConnectionError: 无法获取数据库连接
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            conn = get_connection(dedicated=True)
+            if conn is None:
+                raise ConnectionError("无法获取数据库连接")
+            cursor = conn.cursor(cursor_type)
+            exhausted = False
+            try:
+                kwargs['cursor'] = cursor
+                yield from func(*args, **kwargs)
+                exhausted = True
+            except Exception as e:
+                logger.error(f"数据库流式查询失败: {e}")
+                raise
+            finally:
+                try:
+                    if exhausted:
+                        cursor.close()
+                        # 结束只读事务，避免归还的连接保留旧的一致性快照
+                        conn.rollback()
+                    else:
+                        conn.close()
+                except Exception as e:
+                    logger.warning(f"关闭流式查询连接失败: {e}")
+                release_connection(conn)
+
+        return wrapper
+
+    return decorator
+
+
+def fetch_batches(cursor, batch_size=500):
+    """按批读取游标结果，每次产出一个行列表"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+
 # 兼容旧版本的函数调用方式
-def with_db_connection_old(operation, cursor_type=DictCursor, commit=True):
+def with_db_connection_old(operation, cursor_type=DictCursor, commit=True, result_format=RESULT_FORMAT_DEEP):
     """
     执行数据库操作的公共函数，封装连接创建、游标初始化、异常处理和资源释放
     
@@ -124,29 +426,33 @@ def with_db_connection_old(operation, cursor_type=DictCursor, commit=True):
         operation: 一个函数，接受cursor参数，包含具体的数据库操作
         cursor_type: 游标的类型，默认为DictCursor
         commit: 是否需要commit
+        result_format: 结果格式化方式，同with_db_connection
 
     Returns:
         数据库操作的结果
     """
-
-    @format_datetime_in_result
-    def execute_operation():
-        conn = get_connection()
-        cursor = conn.cursor(cursor_type)
-        try:
-            result = operation(cursor)
+    conn = get_connection()
+    cursor = conn.cursor(cursor_type)
+    # 处于事务范围内时由transaction()统一提交或回滚
+    managed = in_transaction()
+    try:
+        result = operation(cursor)
+        if not managed:
             if commit:
                 conn.commit()
-            return result
-        except Exception as e:
-            logger.error(f"数据库操作失败: {e}")
-            if conn: conn.rollback()
-            return None
-        finally:
-            if cursor: cursor.close()
-            if conn: conn.close()
-
-    return execute_operation()
+            else:
+                # 连接会被复用，不提交时需结束当前事务
+                conn.rollback()
+        return _format_result(result, result_format, cursor)
+    except Exception as e:
+        logger.error(f"数据库操作失败: {e}")
+        if managed:
+            raise
+        if conn: conn.rollback()
+        return None
+    finally:
+        if cursor: cursor.close()
+        release_connection(conn)
 
 
 def init_database():
@@ -299,6 +605,10 @@ def init_database():
         cursor.execute(create_default_admin, (admin_password,))
 
         conn.commit()
+
+        # 执行数据库结构迁移（索引等）
+        from data.migrations import apply_migrations
+        apply_migrations(cursor)
         logger.info("数据库初始化成功")
         return True
     except Exception as e:
@@ -307,4 +617,4 @@ def init_database():
         return False
     finally:
         if cursor: cursor.close()
-        if conn: conn.close()
+        release_connection(conn)
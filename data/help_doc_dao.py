@@ -7,7 +7,7 @@ from typing import Optional
 
 from pymysql.cursors import Cursor, DictCursor
 
-from data.db_connection import with_db_connection
+from data.db_connection import with_db_connection, RESULT_FORMAT_NONE
 from models.help_doc import HelpDoc, HelpDocCreate, HelpDocUpdate
 
 
@@ -18,7 +18,7 @@ class HelpDocDAO:
         self.table_name = "help_docs"
         self.model = HelpDoc
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def insert(self, help_doc_data: HelpDocCreate, cursor: Cursor) -> int:
         """插入新帮助文档"""
         # 使用模型的字段名和占位符
@@ -38,7 +38,7 @@ class HelpDocDAO:
         cursor.execute(sql, params)
         return cursor.lastrowid if cursor.lastrowid is not None else -1
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_id(self, doc_id: int, cursor: DictCursor) -> Optional[HelpDoc]:
         """根据ID获取帮助文档"""
         sql = f"SELECT * FROM {self.table_name} WHERE id = %s"
@@ -48,7 +48,7 @@ class HelpDocDAO:
             return HelpDoc(**result)
         return None
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_latest(self, cursor: DictCursor) -> Optional[HelpDoc]:
         """获取最新的帮助文档"""
         sql = f"SELECT * FROM {self.table_name} ORDER BY update_time DESC LIMIT 1"
@@ -58,7 +58,7 @@ class HelpDocDAO:
             return HelpDoc(**result)
         return None
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def update(self, doc_id: int, help_doc_data: HelpDocUpdate, cursor: Cursor) -> bool:
         """更新帮助文档"""
         # 只更新非空字段
@@ -79,7 +79,7 @@ class HelpDocDAO:
         cursor.execute(sql, tuple(values))
         return cursor.rowcount >= 0
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def delete(self, doc_id: int, cursor: Cursor) -> bool:
         """删除帮助文档"""
         sql = f"DELETE FROM {self.table_name} WHERE id = %s"
@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+科研项目管理系统 - 数据库结构版本迁移
+"""
+from typing import Callable, Dict, List, Optional, Sequence
+
+from pymysql.cursors import DictCursor
+
+from data.db_connection import get_connection, release_connection
+from data.project_stats_dao import rebuild_stats
+from data.reminder_rule_dao import CREATE_RULES_TABLE_SQL, RULES_TABLE, RULES_TABLE_COLLATION
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+class Migration:
+    """一个数据库结构迁移步骤，apply必须可重复执行（幂等）"""
+
+    def __init__(self, version: int, description: str, apply: Callable[[DictCursor], None]):
+        self.version = version
+        self.description = description
+        self.apply = apply
+
+
+def index_exists(cursor, table: str, index_name: str) -> bool:
+    """检查当前数据库中表上是否已存在指定索引"""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cursor.fetchone() is not None
+
+
+def add_index(cursor, table: str, index_name: str, columns: Sequence[str]) -> None:
+    """索引不存在时创建索引"""
+    if index_exists(cursor, table, index_name):
+        return
+    cursor.execute(f"CREATE INDEX {index_name} ON {table} ({', '.join(columns)})")
+    logger.info(f"已创建索引 {table}.{index_name} ({', '.join(columns)})")
+
+
+# 项目查询界面的筛选/排序条件对应的索引
+# 等值筛选列在前，(start_date, id) 在后，与 ORDER BY start_date DESC, id DESC 及键集分页一致
+PROJECT_INDEXES = {
+    'idx_projects_start_date_id': ['start_date', 'id'],
+    'idx_projects_status_start': ['status', 'start_date', 'id'],
+    'idx_projects_level_start': ['level', 'start_date', 'id'],
+    'idx_projects_department_start': ['department', 'start_date', 'id'],
+    'idx_projects_funding_unit_start': ['funding_unit', 'start_date', 'id'],
+    'idx_projects_source_start': ['project_source', 'start_date', 'id'],
+    'idx_projects_type_start': ['project_type', 'start_date', 'id'],
+    'idx_projects_end_date': ['end_date'],
+    'idx_projects_approval_year': ['approval_year'],
+}
+
+# 提醒按状态筛选、按开始日期排序/范围查询
+REMINDER_INDEXES = {
+    'idx_reminders_status_start': ['status', 'start_date'],
+    'idx_reminders_start_date': ['start_date'],
+}
+
+
+def _add_query_indexes(cursor) -> None:
+    for index_name, columns in PROJECT_INDEXES.items():
+        add_index(cursor, 'projects', index_name, columns)
+    for index_name, columns in REMINDER_INDEXES.items():
+        add_index(cursor, 'reminders', index_name, columns)
+
+
+# 项目名称、负责人的中文全文索引（ngram分词），字段 -> 索引名
+FULLTEXT_INDEXES = {
+    'project_name': 'ft_projects_name',
+    'leader': 'ft_projects_leader',
+}
+
+
+# 全文索引所在的迁移版本；创建失败不阻止迁移，之后每次启动都会补建缺少的全文索引
+FULLTEXT_MIGRATION_VERSION = 2
+
+
+def ensure_fulltext_indexes(cursor) -> List[str]:
+    """
+    创建缺少的全文索引，已存在的跳过
+
+    Returns:
+        List[str]: 仍未能创建的索引名（数据库不支持ngram分词时查询退回LIKE匹配）
+    """
+    missing = []
+    for column, index_name in FULLTEXT_INDEXES.items():
+        if index_exists(cursor, 'projects', index_name):
+            continue
+        try:
+            cursor.execute(f"ALTER TABLE projects ADD FULLTEXT INDEX {index_name} ({column}) WITH PARSER ngram")
+            logger.info(f"已创建全文索引 projects.{index_name} ({column})")
+        except Exception as e:
+            logger.warning(f"创建全文索引 projects.{index_name} 失败，将使用LIKE匹配: {e}")
+            missing.append(index_name)
+    return missing
+
+
+def _add_fulltext_indexes(cursor) -> None:
+    ensure_fulltext_indexes(cursor)
+
+
+def _create_project_stats(cursor) -> None:
+    groups = rebuild_stats(cursor)
+    logger.info(f"已创建项目统计汇总表，共 {groups} 个分组")
+
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    """检查当前数据库中表上是否已存在指定列"""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def _add_reminder_window(cursor) -> None:
+    # 提醒区间的结束日期 start_date + days_before 存为生成列，使“区间包含今天”可以走索引
+    if not column_exists(cursor, 'reminders', 'remind_until'):
+        cursor.execute("""
+            ALTER TABLE reminders ADD COLUMN remind_until DATE
+            AS (DATE_ADD(start_date, INTERVAL days_before DAY)) STORED
+        """)
+        logger.info("已添加提醒区间结束日期列 reminders.remind_until")
+    add_index(cursor, 'reminders', 'idx_reminders_status_until', ['status', 'remind_until', 'start_date'])
+
+
+def foreign_key_exists(cursor, table: str, constraint_name: str) -> bool:
+    """检查当前数据库中表上是否已存在指定外键"""
+    cursor.execute("""
+        SELECT 1 FROM information_schema.REFERENTIAL_CONSTRAINTS
+        WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = %s
+        LIMIT 1
+    """, (table, constraint_name))
+    return cursor.fetchone() is not None
+
+
+def _create_reminder_rules(cursor) -> None:
+    cursor.execute(CREATE_RULES_TABLE_SQL)
+    if not column_exists(cursor, 'reminders', 'rule_id'):
+        cursor.execute("ALTER TABLE reminders ADD COLUMN rule_id INT NULL")
+        logger.info("已添加提醒规则ID列 reminders.rule_id")
+    # 同一规则对同一项目只生成一条提醒，手动创建的提醒rule_id为NULL不受限制
+    if not index_exists(cursor, 'reminders', 'uk_reminders_project_rule'):
+        cursor.execute("ALTER TABLE reminders ADD UNIQUE KEY uk_reminders_project_rule (project_id, rule_id)")
+    if not foreign_key_exists(cursor, 'reminders', 'fk_reminders_rule'):
+        cursor.execute("""
+            ALTER TABLE reminders ADD CONSTRAINT fk_reminders_rule
+            FOREIGN KEY (rule_id) REFERENCES reminder_rules(id) ON DELETE SET NULL
+        """)
+    logger.info("已创建提醒规则表")
+
+
+def _fix_reminder_rules_collation(cursor) -> None:
+    # 早期版本建表时未指定字符集，使用了服务器默认排序规则（MySQL 8为utf8mb4_0900_ai_ci）
+    cursor.execute("""
+        SELECT TABLE_COLLATION AS collation FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (RULES_TABLE,))
+    row = cursor.fetchone()
+    collation = (row['collation'] if isinstance(row, dict) else row[0]) if row else None
+    if collation and collation != RULES_TABLE_COLLATION:
+        cursor.execute(f"ALTER TABLE {RULES_TABLE} CONVERT TO CHARACTER SET utf8mb4 COLLATE {RULES_TABLE_COLLATION}")
+        logger.info(f"已将提醒规则表排序规则由 {collation} 改为 {RULES_TABLE_COLLATION}")
+
+
+# 按版本号顺序排列的迁移列表，新增迁移只能追加在末尾
+MIGRATIONS: List[Migration] = [
+    Migration(1, "为项目查询和提醒查询添加组合索引", _add_query_indexes),
+    Migration(2, "为项目名称和负责人添加ngram全文索引", _add_fulltext_indexes),
+    Migration(3, "创建项目统计汇总表", _create_project_stats),
+    Migration(4, "为提醒添加提醒区间结束日期生成列及索引", _add_reminder_window),
+    Migration(5, "创建提醒规则表", _create_reminder_rules),
+    Migration(6, "统一提醒规则表的字符集和排序规则", _fix_reminder_rules_collation),
+]
+
+
+def _ensure_version_table(cursor) -> None:
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_schema_version(cursor) -> int:
+    """获取数据库当前的结构版本号，未执行过迁移时为0"""
+    _ensure_version_table(cursor)
+    cursor.execute(f"SELECT MAX(version) AS version FROM {SCHEMA_VERSION_TABLE}")
+    row = cursor.fetchone()
+    return (row['version'] if isinstance(row, dict) else row[0]) or 0
+
+
+def apply_migrations(cursor, target_version: Optional[int] = None) -> List[int]:
+    """
+    按顺序执行未应用的迁移
+
+    MySQL的DDL语句会隐式提交，因此每个迁移执行完立即记录版本号；
+    迁移本身是幂等的，中途失败后重新执行即可继续。
+    全文索引迁移已记录但索引未能创建时（如数据库当时不支持ngram），每次执行都会重试创建。
+
+    Args:
+        cursor: 数据库游标
+        target_version: 迁移到的目标版本，None表示最新版本
+
+    Returns:
+        List[int]: 本次应用的迁移版本号
+    """
+    current = get_schema_version(cursor)
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        if target_version is not None and migration.version > target_version:
+            break
+        logger.info(f"执行数据库迁移 {migration.version}: {migration.description}")
+        migration.apply(cursor)
+        cursor.execute(
+            f"INSERT IGNORE INTO {SCHEMA_VERSION_TABLE} (version, description) VALUES (%s, %s)",
+            (migration.version, migration.description)
+        )
+        cursor.connection.commit()
+        applied.append(migration.version)
+
+    if current >= FULLTEXT_MIGRATION_VERSION and FULLTEXT_MIGRATION_VERSION not in applied:
+        ensure_fulltext_indexes(cursor)
+    return applied
+
+
+def migrate(target_version: Optional[int] = None) -> bool:
+    """
+    将数据库结构迁移到最新（或指定）版本
+
+    Returns:
+        bool: 是否成功
+    """
+    conn = get_connection()
+    if not conn:
+        logger.error("无法连接到数据库，数据库迁移失败")
+        return False
+
+    cursor = conn.cursor(DictCursor)
+    try:
+        applied = apply_migrations(cursor, target_version)
+        if applied:
+            logger.info(f"数据库迁移完成，已应用版本: {applied}")
+        return True
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"数据库迁移失败: {e}")
+        return False
+    finally:
+        cursor.close()
+        release_connection(conn)
+
+
+def get_existing_indexes(cursor, table: str, index_names: Sequence[str]) -> set:
+    """返回给定索引名中在表上已存在的索引"""
+    if not index_names:
+        return set()
+    cursor.execute(f"""
+        SELECT DISTINCT INDEX_NAME AS index_name FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        AND INDEX_NAME IN ({', '.join(['%s'] * len(index_names))})
+    """, [table] + list(index_names))
+    return {row['index_name'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()}
+
+
+def explain_query(cursor, sql: str, params=None) -> List[Dict]:
+    """获取查询的执行计划（EXPLAIN）"""
+    cursor.execute(f"EXPLAIN {sql}", params)
+    return list(cursor.fetchall())
+
+
+def check_query_plans(queries: Dict[str, tuple]) -> List[Dict]:
+    """
+    用EXPLAIN检查查询是否使用了索引
+
+    Args:
+        queries: 查询名称 -> (sql, params)
+
+    Returns:
+        List[Dict]: 每个查询的检查结果，包含name、table、type、key、rows、ok；
+                    访问类型为全表扫描（ALL）或未使用索引时ok为False
+    """
+    conn = get_connection()
+    if not conn:
+        logger.error("无法连接到数据库，执行计划检查失败")
+        return []
+
+    cursor = conn.cursor(DictCursor)
+    results = []
+    try:
+        for name, (sql, params) in queries.items():
+            try:
+                # 只检查第一张表（单表查询）的访问方式
+                plan = explain_query(cursor, sql, params)[0]
+            except Exception as e:
+                logger.error(f"执行计划检查失败: {name}: {e}")
+                results.append({'name': name, 'table': None, 'type': None, 'key': None, 'rows': None,
+                                'ok': False})
+                continue
+            ok = plan.get('type') != 'ALL' and plan.get('key') is not None
+            results.append({
+                'name': name,
+                'table': plan.get('table'),
+                'type': plan.get('type'),
+                'key': plan.get('key'),
+                'rows': plan.get('rows'),
+                'ok': ok,
+            })
+            if not ok:
+                logger.warning(f"查询未使用索引: {name}，执行计划: {plan}")
+    finally:
+        conn.rollback()
+        cursor.close()
+        release_connection(conn)
+    return results
@@ -3,11 +3,13 @@
 """
 科研项目管理系统 - 项目数据访问对象
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Set
 
-from pymysql.cursors import Cursor, DictCursor
+from pymysql.cursors import Cursor, DictCursor, SSDictCursor
 
-from data.db_connection import with_db_connection
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, chunked, insert_many, upsert_many
+from data.db_connection import with_db_connection, with_db_stream, fetch_batches, RESULT_FORMAT_NONE
+from data.project_stats_dao import STATS_DIMENSIONS, apply_stats_change, snapshot_stats_by_ids, snapshot_stats_in
 from models.project import Project, ProjectCreate, ProjectUpdate
 
 
@@ -18,7 +20,7 @@ class ProjectDAO:
         self.table_name = "projects"
         self.model = Project
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('projects',))
     def insert(self, project_data: ProjectCreate, cursor: Cursor) -> int:
         """插入新项目"""
         # 使用模型的字段名和占位符
@@ -36,9 +38,46 @@ class ProjectDAO:
         # 从模型获取参数值
         params = tuple(getattr(project_data, field) for field in fields)
         cursor.execute(sql, params)
-        return cursor.lastrowid if cursor.lastrowid is not None else -1
-
-    @with_db_connection()
+        project_id = cursor.lastrowid
+        if project_id is None:
+            return -1
+        apply_stats_change(cursor, {}, snapshot_stats_by_ids(cursor, [project_id]))
+        return project_id
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('projects',))
+    def insert_many(self, projects: List[ProjectCreate], cursor: Cursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量插入项目，返回与输入顺序一致的新项目ID"""
+        fields = ProjectCreate.get_field_names()
+        rows = [tuple(getattr(project, field) for field in fields) for project in projects]
+        project_ids = insert_many(cursor, self.table_name, fields, rows, chunk_size, key_fields=['project_name'])
+        apply_stats_change(cursor, {}, snapshot_stats_by_ids(cursor, project_ids, chunk_size=chunk_size))
+        return project_ids
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('projects',))
+    def upsert_many(self, projects: List[ProjectCreate], cursor: Cursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """按项目名称批量插入或更新项目，返回与输入顺序一致的项目ID"""
+        fields = ProjectCreate.get_field_names()
+        rows = [tuple(getattr(project, field) for field in fields) for project in projects]
+        names = [project.project_name for project in projects]
+        before = snapshot_stats_in(cursor, 'project_name', names, for_update=True, chunk_size=chunk_size)
+        project_ids = upsert_many(cursor, self.table_name, fields, rows, ['project_name'], chunk_size=chunk_size)
+        apply_stats_change(cursor, before, snapshot_stats_in(cursor, 'project_name', names, chunk_size=chunk_size))
+        return project_ids
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def get_names_in(self, project_names: List[str], cursor: Cursor,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Set[str]:
+        """返回给定名称中已存在的项目名称"""
+        existing = set()
+        for chunk in chunked(list(project_names), chunk_size):
+            sql = f"SELECT project_name FROM {self.table_name} WHERE project_name IN ({', '.join(['%s'] * len(chunk))})"
+            cursor.execute(sql, tuple(chunk))
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_id(self, project_id: int, cursor: DictCursor) -> Optional[Project]:
         """根据ID获取项目"""
         sql = f"SELECT * FROM {self.table_name} WHERE id = %s"
@@ -48,7 +87,18 @@ class ProjectDAO:
             return Project(**result)
         return None
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def get_by_ids(self, project_ids: List[int], cursor: DictCursor,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[int, Project]:
+        """根据ID批量获取项目，返回项目ID -> 项目，不存在的ID不在结果中"""
+        projects = {}
+        for chunk in chunked(list(project_ids), chunk_size):
+            sql = f"SELECT * FROM {self.table_name} WHERE id IN ({', '.join(['%s'] * len(chunk))})"
+            cursor.execute(sql, tuple(chunk))
+            projects.update((row['id'], Project(**row)) for row in cursor.fetchall())
+        return projects
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_name(self, project_name: str, cursor: DictCursor) -> Optional[Project]:
         """根据名称获取项目"""
         sql = f"SELECT * FROM {self.table_name} WHERE project_name = %s"
@@ -58,7 +108,7 @@ class ProjectDAO:
             return Project(**result)
         return None
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('projects',))
     def update(self, project_id: int, project_data: ProjectUpdate, cursor: Cursor) -> bool:
         """更新项目"""
         # 只更新非空字段
@@ -76,17 +126,26 @@ class ProjectDAO:
             WHERE id = %s
         """
 
+        # 修改了统计维度或资助金额时同步更新统计汇总表
+        affects_stats = any(field in STATS_DIMENSIONS or field == 'funding_amount' for field in update_data)
+        before = snapshot_stats_by_ids(cursor, [project_id], for_update=True) if affects_stats else None
         cursor.execute(sql, tuple(values))
-        return cursor.rowcount >= 0
+        updated = cursor.rowcount >= 0
+        if affects_stats:
+            apply_stats_change(cursor, before, snapshot_stats_by_ids(cursor, [project_id]))
+        return updated
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('projects',))
     def delete(self, project_id: int, cursor: Cursor) -> bool:
         """删除项目"""
+        before = snapshot_stats_by_ids(cursor, [project_id], for_update=True)
         sql = f"DELETE FROM {self.table_name} WHERE id = %s"
         cursor.execute(sql, (project_id,))
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+        apply_stats_change(cursor, before, {})
+        return deleted
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_all(self, cursor: DictCursor = None) -> List[Project]:
         """获取所有项目"""
         sql = f"SELECT * FROM {self.table_name} ORDER BY id DESC"
@@ -96,7 +155,15 @@ class ProjectDAO:
             return [Project(**item) for item in results]
         return []
 
-    @with_db_connection()
+    @with_db_stream()
+    def iter_all(self, cursor: SSDictCursor = None, batch_size: int = 500) -> Iterator[List[Project]]:
+        """流式获取所有项目，每次产出一批项目，内存占用与表大小无关"""
+        sql = f"SELECT * FROM {self.table_name} ORDER BY id DESC"
+        cursor.execute(sql)
+        for rows in fetch_batches(cursor, batch_size):
+            yield [Project(**item) for item in rows]
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def search(self, criteria: Dict[str, Any], cursor: DictCursor) -> List[Project]:
         """根据条件搜索项目"""
         # 构建查询条件
@@ -123,7 +190,7 @@ class ProjectDAO:
             return [Project(**item) for item in results]
         return []
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def count_by_status(self, cursor: DictCursor) -> Dict[str, int]:
         """统计各状态项目数量"""
         sql = f"SELECT status, COUNT(*) as count FROM {self.table_name} GROUP BY status"
@@ -4,17 +4,24 @@
 """
 科研项目管理系统 - 项目成果附件数据访问对象
 """
+from typing import List, Union
+
 from pymysql.cursors import DictCursor
 
-from data.db_connection import with_db_connection
-from models.project_result_attachment import ProjectResultAttachmentCreate, ProjectResultAttachmentUpdate
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, insert_many, save_many
+from data.db_connection import with_db_connection, RESULT_FORMAT_COLUMNS, RESULT_FORMAT_NONE
+from models.project_result_attachment import ProjectResultAttachment, ProjectResultAttachmentCreate, \
+    ProjectResultAttachmentUpdate
+
+ATTACHMENT_FIELDS = ["project_result_id", "file_name", "file_path", "file_server_host", "file_server_port",
+                     "file_storage_directory"]
 
 
 class ProjectResultAttachmentDAO:
     """项目成果附件数据访问对象"""
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def insert(attachment: ProjectResultAttachmentCreate, cursor: DictCursor):
         """插入新的项目成果附件"""
         sql = "INSERT INTO project_result_attachment (project_result_id, file_name, file_path, file_server_host, file_server_port, file_storage_directory) VALUES (%s, %s, %s, %s, %s, %s)"
@@ -29,7 +36,24 @@ class ProjectResultAttachmentDAO:
         return cursor.lastrowid
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def insert_many(attachments: List[ProjectResultAttachmentCreate], cursor: DictCursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量插入项目成果附件，返回与输入顺序一致的新附件ID"""
+        rows = [tuple(getattr(attachment, field) for field in ATTACHMENT_FIELDS) for attachment in attachments]
+        return insert_many(cursor, "project_result_attachment", ATTACHMENT_FIELDS, rows, chunk_size)
+
+    @staticmethod
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def upsert_many(attachments: List[Union[ProjectResultAttachment, ProjectResultAttachmentCreate]],
+                    cursor: DictCursor, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量保存项目成果附件：带ID的按主键插入或更新，不带ID的新建，返回与输入顺序一致的附件ID"""
+        rows = [tuple(getattr(attachment, field) for field in ATTACHMENT_FIELDS) for attachment in attachments]
+        row_ids = [getattr(attachment, 'id', None) for attachment in attachments]
+        return save_many(cursor, "project_result_attachment", ATTACHMENT_FIELDS, rows, row_ids, chunk_size)
+
+    @staticmethod
+    @with_db_connection(result_format=RESULT_FORMAT_COLUMNS)
     def get_by_id(attachment_id: int, cursor: DictCursor):
         """根据ID获取项目成果附件"""
         sql = "SELECT * FROM project_result_attachment WHERE id = %s"
@@ -37,7 +61,7 @@ class ProjectResultAttachmentDAO:
         return cursor.fetchone()
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_COLUMNS)
     def get_by_project_result_id(project_result_id: int, cursor: DictCursor):
         """根据项目成果ID获取所有附件"""
         sql = "SELECT * FROM project_result_attachment WHERE project_result_id = %s"
@@ -45,7 +69,7 @@ class ProjectResultAttachmentDAO:
         return cursor.fetchall()
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def update(attachment_id: int, attachment: ProjectResultAttachmentUpdate, cursor: DictCursor):
         """更新项目成果附件信息"""
         sql = "UPDATE project_result_attachment SET file_name=%s, file_path=%s, file_server_host=%s, file_server_port=%s, file_storage_directory=%s WHERE id=%s"
@@ -60,7 +84,7 @@ class ProjectResultAttachmentDAO:
         return cursor.rowcount > 0
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def delete(attachment_id: int, cursor: DictCursor):
         """删除项目成果附件"""
         sql = "DELETE FROM project_result_attachment WHERE id = %s"
@@ -68,7 +92,7 @@ class ProjectResultAttachmentDAO:
         return cursor.rowcount > 0
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def delete_by_project_result_id(project_result_id: int, cursor: DictCursor):
         """根据项目成果ID删除所有附件"""
         sql = "DELETE FROM project_result_attachment WHERE project_result_id = %s"
@@ -4,11 +4,12 @@
 """
 科研项目管理系统 - 项目成果数据访问对象
 """
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from pymysql.cursors import DictCursor
 
-from data.db_connection import with_db_connection
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, insert_many, save_many
+from data.db_connection import with_db_connection, RESULT_FORMAT_NONE
 from models.project_result import ProjectResult, ProjectResultCreate, ProjectResultUpdate
 
 
@@ -19,7 +20,7 @@ class ProjectResultDAO:
         self.table_name = "project_result"
         self.model = ProjectResult
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def insert(self, result_data: ProjectResultCreate, cursor: DictCursor) -> int:
         """插入新项目成果"""
         # 使用模型的字段名和占位符
@@ -44,7 +45,24 @@ class ProjectResultDAO:
         cursor.execute(sql, params)
         return cursor.lastrowid if cursor.lastrowid is not None else -1
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def insert_many(self, results: List[ProjectResultCreate], cursor: DictCursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量插入项目成果，返回与输入顺序一致的新成果ID"""
+        fields = ["project_id", "type", "name", "date"]
+        rows = [tuple(getattr(item, field) for field in fields) for item in results]
+        return insert_many(cursor, self.table_name, fields, rows, chunk_size)
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def upsert_many(self, results: List[Union[ProjectResult, ProjectResultCreate]], cursor: DictCursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量保存项目成果：带ID的按主键插入或更新，不带ID的新建，返回与输入顺序一致的成果ID"""
+        fields = ["project_id", "type", "name", "date"]
+        rows = [tuple(getattr(item, field) for field in fields) for item in results]
+        row_ids = [getattr(item, 'id', None) for item in results]
+        return save_many(cursor, self.table_name, fields, rows, row_ids, chunk_size)
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_id(self, result_id: int, cursor: DictCursor) -> Optional[ProjectResult]:
         """根据ID获取项目成果"""
         sql = f"SELECT * FROM {self.table_name} WHERE id = %s"
@@ -54,7 +72,7 @@ class ProjectResultDAO:
             return ProjectResult(**result)
         return None
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_project_id(self, project_id: int, cursor: DictCursor) -> List[ProjectResult]:
         """根据项目ID获取项目成果"""
         sql = f"SELECT * FROM {self.table_name} WHERE project_id = %s ORDER BY date DESC"
@@ -64,7 +82,7 @@ class ProjectResultDAO:
             return [ProjectResult(**item) for item in results]
         return []
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def update(self, result_id: int, result_data: ProjectResultUpdate, cursor: DictCursor) -> bool:
         """更新项目成果"""
         # 获取非空字段和值
@@ -103,14 +121,14 @@ class ProjectResultDAO:
         cursor.execute(sql, tuple(params))
         return cursor.rowcount >= 0
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def delete(self, result_id: int, cursor: DictCursor) -> bool:
         """删除项目成果"""
         sql = f"DELETE FROM {self.table_name} WHERE id = %s"
         cursor.execute(sql, (result_id,))
         return cursor.rowcount > 0
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def delete_by_project_id(self, project_id: int, cursor: DictCursor) -> bool:
         """根据项目ID删除所有项目成果"""
         sql = f"DELETE FROM {self.table_name} WHERE project_id = %s"
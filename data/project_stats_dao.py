@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 项目统计汇总数据访问对象
+
+project_stats表按(approval_year, level, status, department, funding_unit)保存项目数量和资助金额，
+由ProjectDAO的写操作在同一事务中增量维护，统计查询只需扫描分组数量级的数据。
+"""
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymysql.cursors import Cursor
+
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, chunked
+from data.db_connection import with_db_connection, RESULT_FORMAT_NONE
+
+STATS_TABLE = "project_stats"
+
+# 汇总表的分组维度（均为projects表中的NOT NULL列）
+STATS_DIMENSIONS = ('approval_year', 'level', 'status', 'department', 'funding_unit')
+
+# 汇总表结构，列定义与projects表一致
+CREATE_STATS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+        approval_year VARCHAR(20) NOT NULL,
+        level VARCHAR(20) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        department VARCHAR(50) NOT NULL,
+        funding_unit VARCHAR(100) NOT NULL,
+        project_count INT NOT NULL DEFAULT 0,
+        total_funding DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (approval_year, level, status, department, funding_unit)
+    )
+"""
+
+# 分组键 -> [项目数量, 资助金额]
+StatsGroups = Dict[Tuple, List[Any]]
+
+
+def snapshot_stats(cursor, where_sql: str, params: Sequence[Any] = (), for_update: bool = False) -> StatsGroups:
+    """
+    按汇总维度统计projects表中满足条件的项目
+
+    Args:
+        cursor: 数据库游标
+        where_sql: WHERE条件（不含WHERE关键字）
+        params: 条件参数
+        for_update: 是否对匹配的项目加锁，修改前统计时使用，避免并发修改导致增量错误
+
+    Returns:
+        StatsGroups: 分组键 -> [项目数量, 资助金额]
+    """
+    dimensions = ', '.join(STATS_DIMENSIONS)
+    sql = f"""
+        SELECT {dimensions}, COUNT(*) AS project_count, SUM(funding_amount) AS total_funding
+        FROM projects WHERE {where_sql}
+        GROUP BY {dimensions}
+    """
+    if for_update:
+        sql += " FOR UPDATE"
+    cursor.execute(sql, params)
+
+    groups = {}
+    for row in cursor.fetchall():
+        values = tuple(row.values()) if isinstance(row, dict) else tuple(row)
+        groups[values[:len(STATS_DIMENSIONS)]] = [values[-2], values[-1] or Decimal(0)]
+    return groups
+
+
+def snapshot_stats_by_ids(cursor, project_ids: Sequence[int], for_update: bool = False,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> StatsGroups:
+    """按项目ID统计，ID较多时分批查询后合并"""
+    return snapshot_stats_in(cursor, 'id', project_ids, for_update, chunk_size)
+
+
+def snapshot_stats_in(cursor, field: str, values: Sequence[Any], for_update: bool = False,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> StatsGroups:
+    """按某个字段的取值列表统计，取值较多时分批查询后合并"""
+    groups: StatsGroups = {}
+    for chunk in chunked(list(values), chunk_size):
+        part = snapshot_stats(cursor, f"{field} IN ({', '.join(['%s'] * len(chunk))})", chunk, for_update)
+        for key, (count, funding) in part.items():
+            total = groups.setdefault(key, [0, Decimal(0)])
+            total[0] += count
+            total[1] += funding
+    return groups
+
+
+def apply_stats_change(cursor, before: StatsGroups, after: StatsGroups) -> None:
+    """
+    把修改前后的统计差值累加到汇总表
+
+    Args:
+        cursor: 数据库游标，须与修改projects表的操作处于同一事务
+        before: 修改前受影响项目的统计（新增项目时为空）
+        after: 修改后受影响项目的统计（删除项目时为空）
+    """
+    deltas = []
+    removed = []
+    for key in set(before) | set(after):
+        old_count, old_funding = before.get(key, (0, Decimal(0)))
+        new_count, new_funding = after.get(key, (0, Decimal(0)))
+        count, funding = new_count - old_count, new_funding - old_funding
+        if count or funding:
+            deltas.append(key + (count, funding))
+            if count < 0:
+                removed.append(key)
+    if not deltas:
+        return
+
+    columns = STATS_DIMENSIONS + ('project_count', 'total_funding')
+    row_sql = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for chunk in chunked(deltas, DEFAULT_CHUNK_SIZE):
+        cursor.execute(f"""
+            INSERT INTO {STATS_TABLE} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))}
+            ON DUPLICATE KEY UPDATE
+                project_count = project_count + VALUES(project_count),
+                total_funding = total_funding + VALUES(total_funding)
+        """, [value for row in chunk for value in row])
+
+    # 删除已没有项目的分组，保持汇总表只包含有效分组；只按主键检查数量减少的分组，
+    # 避免扫描并锁定整张汇总表而阻塞其他项目的写操作
+    key_sql = "(" + ", ".join(["%s"] * len(STATS_DIMENSIONS)) + ")"
+    for chunk in chunked(removed, DEFAULT_CHUNK_SIZE):
+        cursor.execute(f"""
+            DELETE FROM {STATS_TABLE}
+            WHERE ({', '.join(STATS_DIMENSIONS)}) IN ({', '.join([key_sql] * len(chunk))})
+            AND project_count <= 0
+        """, [value for key in chunk for value in key])
+
+
+def rebuild_stats(cursor) -> int:
+    """
+    根据projects表全量重建汇总表
+
+    Returns:
+        int: 重建后的分组数量
+    """
+    dimensions = ', '.join(STATS_DIMENSIONS)
+    cursor.execute(CREATE_STATS_TABLE_SQL)
+    cursor.execute(f"DELETE FROM {STATS_TABLE}")
+    cursor.execute(f"""
+        INSERT INTO {STATS_TABLE} ({dimensions}, project_count, total_funding)
+        SELECT {dimensions}, COUNT(*), SUM(funding_amount)
+        FROM projects
+        GROUP BY {dimensions}
+    """)
+    return cursor.rowcount
+
+
+class ProjectStatsDAO:
+    """项目统计汇总数据访问对象"""
+
+    def __init__(self):
+        self.table_name = STATS_TABLE
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=(STATS_TABLE,))
+    def rebuild(self, cursor: Cursor) -> int:
+        """全量重建汇总表，返回分组数量"""
+        return rebuild_stats(cursor)
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def get_totals(self, cursor: Cursor) -> Dict[str, Any]:
+        """
+        获取项目总数、资助总额及各状态项目数量
+
+        Returns:
+            Dict[str, Any]: total_count、total_funding、status_count
+        """
+        cursor.execute(f"""
+            SELECT status, SUM(project_count), SUM(total_funding)
+            FROM {self.table_name}
+            GROUP BY status
+        """)
+        status_count = {}
+        total_funding = Decimal(0)
+        for status, count, funding in cursor.fetchall():
+            status_count[status] = int(count)
+            total_funding += funding or Decimal(0)
+        return {
+            "total_count": sum(status_count.values()),
+            "status_count": status_count,
+            "total_funding": float(total_funding),
+        }
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def aggregate(self, dimension: str, filters: Optional[Dict[str, Any]] = None,
+                  cursor: Cursor = None) -> List[Tuple[Any, int, float]]:
+        """
+        按一个汇总维度分组统计
+
+        Args:
+            dimension: STATS_DIMENSIONS中的维度
+            filters: 维度等值条件，另支持approval_year_ge/approval_year_le范围条件
+
+        Returns:
+            List[Tuple[Any, int, float]]: [(分组取值, 项目数量, 资助金额)]，按分组取值排序
+        """
+        if dimension not in STATS_DIMENSIONS:
+            raise ValueError(f"不支持的统计维度: {dimension}")
+
+        sql = " WHERE 1=1"
+        params = []
+        for field, value in (filters or {}).items():
+            if not value:
+                continue
+            if field == 'approval_year_ge':
+                sql += " AND approval_year >= %s"
+            elif field == 'approval_year_le':
+                sql += " AND approval_year <= %s"
+            elif field in STATS_DIMENSIONS:
+                sql += f" AND {field} = %s"
+            else:
+                raise ValueError(f"汇总表不支持的统计条件: {field}")
+            params.append(value)
+
+        cursor.execute(f"""
+            SELECT {dimension}, SUM(project_count), SUM(total_funding)
+            FROM {self.table_name}{sql}
+            GROUP BY {dimension}
+            ORDER BY {dimension}
+        """, params)
+        return [(key, int(count), float(funding or 0)) for key, count, funding in cursor.fetchall()]
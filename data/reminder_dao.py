@@ -3,11 +3,13 @@
 """
 科研项目管理系统 - 提醒数据访问对象
 """
-from typing import List, Optional
+from datetime import date
+from typing import List, Optional, Iterator, Union
 
-from pymysql.cursors import Cursor, DictCursor
+from pymysql.cursors import Cursor, DictCursor, SSDictCursor
 
-from data.db_connection import with_db_connection
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, insert_many, save_many
+from data.db_connection import with_db_connection, with_db_stream, fetch_batches, RESULT_FORMAT_NONE
 from models.reminder import Reminder, ReminderCreate, ReminderUpdate, ReminderStatus
 
 
@@ -18,7 +20,7 @@ class ReminderDAO:
         self.table_name = "reminders"
         self.model = Reminder
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def insert(self, reminder_data: ReminderCreate, cursor: Cursor) -> int:
         """插入新提醒"""
         # 使用模型的字段名和占位符
@@ -38,7 +40,24 @@ class ReminderDAO:
         cursor.execute(sql, params)
         return cursor.lastrowid if cursor.lastrowid is not None else -1
 
-    @with_db_connection()
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def insert_many(self, reminders: List[ReminderCreate], cursor: Cursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量插入提醒，返回与输入顺序一致的新提醒ID"""
+        fields = ReminderCreate.get_field_names()
+        rows = [tuple(getattr(reminder, field) for field in fields) for reminder in reminders]
+        return insert_many(cursor, self.table_name, fields, rows, chunk_size)
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def upsert_many(self, reminders: List[Union[Reminder, ReminderCreate]], cursor: Cursor,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[int]:
+        """批量保存提醒：带ID的按主键插入或更新，不带ID的新建，返回与输入顺序一致的提醒ID"""
+        fields = ReminderCreate.get_field_names()
+        rows = [tuple(getattr(reminder, field) for field in fields) for reminder in reminders]
+        row_ids = [getattr(reminder, 'id', None) for reminder in reminders]
+        return save_many(cursor, self.table_name, fields, rows, row_ids, chunk_size)
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_id(self, reminder_id: int, cursor: DictCursor) -> Optional[Reminder]:
         """根据ID获取提醒"""
         sql = f"SELECT * FROM {self.table_name} WHERE id = %s"
@@ -48,7 +67,7 @@ class ReminderDAO:
             return Reminder(**result)
         return None
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_all(self, cursor: DictCursor) -> List[Reminder]:
         """获取所有提醒"""
         sql = f"SELECT * FROM {self.table_name} ORDER BY start_date ASC"
@@ -58,7 +77,15 @@ class ReminderDAO:
             return [Reminder(**item) for item in results]
         return []
 
-    @with_db_connection()
+    @with_db_stream()
+    def iter_all(self, cursor: SSDictCursor = None, batch_size: int = 500) -> Iterator[List[Reminder]]:
+        """流式获取所有提醒，每次产出一批提醒，内存占用与表大小无关"""
+        sql = f"SELECT * FROM {self.table_name} ORDER BY start_date ASC"
+        cursor.execute(sql)
+        for rows in fetch_batches(cursor, batch_size):
+            yield [Reminder(**item) for item in rows]
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_unread(self, cursor: DictCursor) -> List[Reminder]:
         """获取未读提醒"""
         sql = f"SELECT * FROM {self.table_name} WHERE status = %s ORDER BY start_date ASC"
@@ -68,7 +95,31 @@ class ReminderDAO:
             return [Reminder(**item) for item in results]
         return []
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def get_active_unread(self, day: date, cursor: DictCursor) -> List[Reminder]:
+        """
+        获取提醒区间 [start_date, start_date + days_before] 包含指定日期的未读提醒
+
+        区间结束日期为生成列remind_until，查询走 (status, remind_until, start_date) 索引，
+        已过期的提醒不会被扫描。
+        """
+        sql = f"""
+            SELECT * FROM {self.table_name}
+            WHERE status = %s AND remind_until >= %s AND start_date <= %s
+            ORDER BY start_date ASC
+        """
+        cursor.execute(sql, (ReminderStatus.UNREAD.value, day, day))
+        return [Reminder(**item) for item in cursor.fetchall()]
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def get_next_start_date(self, after: date, cursor: Cursor) -> Optional[date]:
+        """获取指定日期之后最早开始提醒的未读提醒的开始日期，没有时返回None"""
+        sql = f"SELECT MIN(start_date) FROM {self.table_name} WHERE status = %s AND start_date > %s"
+        cursor.execute(sql, (ReminderStatus.UNREAD.value, after))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def update(self, reminder_id: int, reminder_data: ReminderUpdate, cursor: Cursor) -> bool:
         """更新提醒"""
         # 只更新非空字段
@@ -89,14 +140,14 @@ class ReminderDAO:
         cursor.execute(sql, tuple(values))
         return cursor.rowcount > 0
 
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def delete(self, reminder_id: int, cursor: Cursor) -> bool:
         """删除提醒"""
         sql = f"DELETE FROM {self.table_name} WHERE id = %s"
         cursor.execute(sql, (reminder_id,))
         return cursor.rowcount > 0
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_by_project_id(self, project_id: int, cursor: DictCursor) -> List[Reminder]:
         """根据项目ID获取提醒"""
         sql = f"SELECT * FROM {self.table_name} WHERE project_id = %s ORDER BY start_date ASC"
@@ -106,7 +157,7 @@ class ReminderDAO:
             return [Reminder(**item) for item in results]
         return []
 
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_upcoming_reminders(self, cursor: DictCursor, days: int = 7) -> List[Reminder]:
         """获取即将开始日期的提醒"""
         sql = f"""
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 提醒规则数据访问对象
+
+提醒规则为满足筛选条件的项目生成提醒。规则的执行是集合操作：
+一条 INSERT ... SELECT 为所有匹配的 (项目, 规则) 生成提醒，已存在的组合跳过；
+项目或规则变更后先删除已过时的规则提醒，原地更新名称、内容等字段，再补充缺少的提醒。
+"""
+from typing import Any, List, Optional, Sequence, Tuple
+
+from pymysql.cursors import Cursor, DictCursor
+
+from data.bulk_insert import DEFAULT_CHUNK_SIZE, chunked
+from data.db_connection import with_db_connection, RESULT_FORMAT_NONE
+from models.reminder import ReminderStatus, ReminderType
+from models.reminder_rule import ReminderRule, ReminderRuleCreate, ReminderRuleUpdate
+
+RULES_TABLE = "reminder_rules"
+
+CREATE_RULES_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {RULES_TABLE} (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        reminder_type VARCHAR(20) NOT NULL,
+        days_before INT NOT NULL DEFAULT 0,
+        reminder_way VARCHAR(20) NOT NULL,
+        content TEXT,
+        project_status VARCHAR(20) NULL,
+        project_level VARCHAR(20) NULL,
+        department VARCHAR(50) NULL,
+        project_source VARCHAR(50) NULL,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        create_time TIMESTAMP NOT NULL
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+# 规则表的排序规则须与projects、reminders表一致，否则跨表比较字符串列会报 Illegal mix of collations
+RULES_TABLE_COLLATION = "utf8mb4_unicode_ci"
+
+# 规则筛选字段 -> 项目字段
+RULE_FILTERS = {
+    'project_status': 'status',
+    'project_level': 'level',
+    'department': 'department',
+    'project_source': 'project_source',
+}
+
+# 修改后需要重新执行规则的项目字段
+RULE_PROJECT_FIELDS = frozenset(('project_name', 'start_date', 'end_date') + tuple(RULE_FILTERS.values()))
+
+# 规则与项目匹配的条件（r为规则表，p为项目表），筛选字段为空表示不限
+_MATCH_SQL = " AND ".join(f"(r.{rule_field} IS NULL OR p.{project_field} <=> r.{rule_field})"
+                          for rule_field, project_field in RULE_FILTERS.items())
+
+# 提醒的基准日期：项目结束提醒取结束日期，项目开始提醒取开始日期（参数：ReminderType.PROJECT_END）
+_TARGET_SQL = "(CASE r.reminder_type WHEN %s THEN p.end_date ELSE p.start_date END)"
+
+# 提醒开始日期（参数同_TARGET_SQL）
+_START_SQL = f"DATE_SUB({_TARGET_SQL}, INTERVAL r.days_before DAY)"
+
+
+def _in_sql(column: str, values: Optional[Sequence[Any]]) -> Tuple[str, List[Any]]:
+    if values is None:
+        return "", []
+    return f" AND {column} IN ({', '.join(['%s'] * len(values))})", list(values)
+
+
+def _chunks(values: Optional[Sequence[Any]], chunk_size: int):
+    """values为None表示不限，只产出一次None"""
+    if values is None:
+        yield None
+    else:
+        yield from chunked(list(values), chunk_size)
+
+
+class ReminderRuleDAO:
+    """提醒规则数据访问对象"""
+
+    def __init__(self):
+        self.table_name = RULES_TABLE
+        self.model = ReminderRule
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=(RULES_TABLE,))
+    def insert(self, rule_data: ReminderRuleCreate, cursor: Cursor) -> int:
+        """插入新规则"""
+        fields = ReminderRuleCreate.get_field_names()
+        sql = f"INSERT INTO {self.table_name} ({', '.join(fields)}) VALUES ({', '.join(['%s'] * len(fields))})"
+        params = [getattr(rule_data, field) for field in fields]
+        # 筛选条件为空字符串时按不限保存
+        params = [None if field in RULE_FILTERS and value == "" else value for field, value in zip(fields, params)]
+        cursor.execute(sql, params)
+        return cursor.lastrowid if cursor.lastrowid is not None else -1
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def get_by_id(self, rule_id: int, cursor: DictCursor) -> Optional[ReminderRule]:
+        """根据ID获取规则"""
+        cursor.execute(f"SELECT * FROM {self.table_name} WHERE id = %s", (rule_id,))
+        result = cursor.fetchone()
+        if result is not None:
+            return ReminderRule(**result)
+        return None
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def get_all(self, cursor: DictCursor) -> List[ReminderRule]:
+        """获取所有规则"""
+        cursor.execute(f"SELECT * FROM {self.table_name} ORDER BY id ASC")
+        return [ReminderRule(**item) for item in cursor.fetchall()]
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=(RULES_TABLE,))
+    def update(self, rule_id: int, rule_data: ReminderRuleUpdate, cursor: Cursor) -> bool:
+        """更新规则，筛选字段为空字符串时清空该条件"""
+        update_data = rule_data.dict(exclude_unset=True, exclude_none=True)
+        if not update_data:
+            return False
+        for field in RULE_FILTERS:
+            if field in update_data and update_data[field] == "":
+                update_data[field] = None
+
+        set_clause = ", ".join(f"{field} = %s" for field in update_data)
+        cursor.execute(f"UPDATE {self.table_name} SET {set_clause} WHERE id = %s",
+                       tuple(update_data.values()) + (rule_id,))
+        return cursor.rowcount > 0
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=(RULES_TABLE, 'reminders'))
+    def delete(self, rule_id: int, cursor: Cursor) -> bool:
+        """删除规则及其生成的未读提醒，已读的提醒保留（rule_id置空）"""
+        cursor.execute("DELETE FROM reminders WHERE rule_id = %s AND status = %s",
+                       (rule_id, ReminderStatus.UNREAD.value))
+        cursor.execute(f"DELETE FROM {self.table_name} WHERE id = %s", (rule_id,))
+        return cursor.rowcount > 0
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE, modifies=('reminders',))
+    def apply_rules(self, rule_ids: Optional[Sequence[int]] = None, project_ids: Optional[Sequence[int]] = None,
+                    cursor: Cursor = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, int, int]:
+        """
+        执行规则，使规则生成的提醒与当前的项目和规则一致
+
+        只有规则已停用或已不匹配、提醒类型或提醒日期变化时才删除提醒并重新生成（重新生成的提醒为未读）；
+        项目名称、提醒内容、提醒方式等变化原地更新，保留提醒的已读状态，已选择“不再提醒”的提醒不会再次弹出。
+        最后用 INSERT ... SELECT 为匹配但还没有提醒的 (项目, 规则) 生成提醒。
+        基准日期已过的项目不生成提醒。所有操作在同一个事务中完成。
+
+        Args:
+            rule_ids: 只执行这些规则，None表示所有规则
+            project_ids: 只处理这些项目，None表示所有项目
+
+        Returns:
+            Tuple[int, int, int]: (删除的过时提醒数, 原地更新的提醒数, 新生成的提醒数)
+        """
+        end_type = ReminderType.PROJECT_END.value
+        unread = ReminderStatus.UNREAD.value
+        removed = updated = created = 0
+        for project_chunk in _chunks(project_ids, chunk_size):
+            project_sql, project_params = _in_sql('p.id', project_chunk)
+            rule_sql, rule_params = _in_sql('r.id', rule_ids)
+
+            cursor.execute(f"""
+                DELETE e FROM reminders e
+                JOIN {self.table_name} r ON r.id = e.rule_id
+                JOIN projects p ON p.id = e.project_id
+                WHERE (r.is_active = 0 OR NOT ({_MATCH_SQL})
+                       OR e.start_date <> {_START_SQL}
+                       OR e.reminder_type <> r.reminder_type){project_sql}{rule_sql}
+            """, [end_type] + project_params + rule_params)
+            removed += cursor.rowcount
+
+            cursor.execute(f"""
+                UPDATE reminders e
+                JOIN {self.table_name} r ON r.id = e.rule_id
+                JOIN projects p ON p.id = e.project_id
+                SET e.project_name = p.project_name, e.days_before = r.days_before,
+                    e.reminder_way = r.reminder_way, e.content = r.content
+                WHERE (e.project_name <> p.project_name
+                       OR e.days_before <> r.days_before
+                       OR e.reminder_way <> r.reminder_way
+                       OR NOT (e.content <=> r.content)){project_sql}{rule_sql}
+            """, project_params + rule_params)
+            updated += cursor.rowcount
+
+            cursor.execute(f"""
+                INSERT INTO reminders (
+                    project_id, project_name, reminder_type, days_before, reminder_way,
+                    content, start_date, status, create_time, rule_id
+                )
+                SELECT p.id, p.project_name, r.reminder_type, r.days_before, r.reminder_way,
+                       r.content, {_START_SQL}, %s, NOW(), r.id
+                FROM {self.table_name} r
+                JOIN projects p ON {_MATCH_SQL}
+                WHERE r.is_active = 1 AND {_TARGET_SQL} >= CURDATE()
+                AND NOT EXISTS (SELECT 1 FROM reminders e WHERE e.project_id = p.id AND e.rule_id = r.id)
+                {project_sql}{rule_sql}
+            """, [end_type, unread, end_type] + project_params + rule_params)
+            created += cursor.rowcount
+        return removed, updated, created
@@ -9,7 +9,7 @@ from typing import List, Optional
 
 from pymysql.cursors import Cursor, DictCursor
 
-from data.db_connection import with_db_connection
+from data.db_connection import with_db_connection, RESULT_FORMAT_NONE
 from models.user import User, UserCreate, UserUpdate
 from utils.logger import get_logger
 
@@ -20,7 +20,7 @@ class UserDAO:
     """用户数据访问对象"""
 
     @staticmethod
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def create_user(user_data: UserCreate, cursor: Cursor) -> Optional[int]:
         """创建用户
         
@@ -54,7 +54,7 @@ class UserDAO:
             return None
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_user_by_username(username: str, cursor: DictCursor) -> Optional[User]:
         """根据用户名获取用户
         
@@ -88,7 +88,7 @@ class UserDAO:
         return None
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_user_by_id(user_id: int, cursor: DictCursor) -> Optional[User]:
         """根据用户ID获取用户
         
@@ -122,7 +122,7 @@ class UserDAO:
         return None
 
     @staticmethod
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def update_user(user_id: int, user_data: UserUpdate, cursor: Cursor) -> bool:
         """更新用户信息
         
@@ -173,7 +173,7 @@ class UserDAO:
             return False
 
     @staticmethod
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def delete_user(user_id: int, cursor: Cursor) -> bool:
         """删除用户
         
@@ -193,7 +193,7 @@ class UserDAO:
             return False
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def get_all_users(cursor: DictCursor) -> List[User]:
         """获取所有用户
         
@@ -227,7 +227,7 @@ class UserDAO:
         return users
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def authenticate_user(username: str, password: str, cursor: DictCursor) -> Optional[User]:
         """用户认证
         
@@ -279,7 +279,7 @@ class UserDAO:
         )
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def is_username_exists(username: str, cursor: DictCursor) -> bool:
         """检查用户名是否存在
         
@@ -296,7 +296,7 @@ class UserDAO:
         return row['count'] > 0
 
     @staticmethod
-    @with_db_connection()
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
     def verify_password(username: str, password: str, cursor: DictCursor) -> bool:
         """验证用户密码是否正确
         
@@ -319,7 +319,7 @@ class UserDAO:
         return row['password'] == hashed_password
 
     @staticmethod
-    @with_db_connection(cursor_type=Cursor)
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
     def change_password(username: str, new_password: str, cursor: Cursor) -> bool:
         """修改用户密码
         
@@ -3,7 +3,7 @@
 文件服务器包
 """
 
-from .client import FileServerClient, file_server_client
+from .client import FileServerClient, file_server_client, get_client, get_session, close_sessions
 # 从各个模块导入常用类和函数
 from .config import FileServerConfig, file_server_config
 from .server import FileServer, file_server
@@ -35,5 +35,8 @@ __all__ = [
 
     # 客户端相关
     'FileServerClient',
-    'file_server_client'
+    'file_server_client',
+    'get_client',
+    'get_session',
+    'close_sessions'
 ]
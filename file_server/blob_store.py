@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+文件服务器内容寻址存储
+
+启用去重（file_server.dedup）后，上传的文件按内容SHA-256保存为存储根目录下
+.blobs/<前2位>/<前4位>/<sha256>，相同内容只保存一份。逻辑路径（仍为
+sub_dir/时间戳_随机ID_文件名，数据库中的附件路径不变）与内容的对应关系及引用计数
+保存在 .blobs/index.db（SQLite）中：逻辑路径删除时引用计数减一，减到0才删除内容文件。
+"""
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BLOBS_DIR = '.blobs'
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS blobs (
+        sha256 TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        ref_count INTEGER NOT NULL DEFAULT 0,
+        create_time TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        sha256 TEXT NOT NULL REFERENCES blobs (sha256),
+        create_time TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256);
+"""
+
+
+def is_sha256(value: str) -> bool:
+    """是否为小写十六进制的SHA-256摘要"""
+    return len(value) == 64 and all(c in '0123456789abcdef' for c in value)
+
+
+class BlobStore:
+    """内容寻址存储：逻辑路径 -> 内容文件，按引用计数回收"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        # 同一进程内的写操作串行执行，保证移动内容文件与更新引用计数一致
+        self._lock = threading.Lock()
+        self._initialized_dir = None
+
+    @property
+    def base_dir(self) -> str:
+        return os.path.join(self.root_dir, BLOBS_DIR)
+
+    def blob_path(self, sha256: str) -> str:
+        """内容文件的完整路径"""
+        return os.path.join(self.base_dir, sha256[:2], sha256[2:4], sha256)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(os.path.join(self.base_dir, 'index.db'), timeout=30)
+        conn.row_factory = sqlite3.Row
+        if self._initialized_dir != self.base_dir:
+            conn.executescript(_SCHEMA)
+            self._initialized_dir = self.base_dir
+        return conn
+
+    def _ensure_dir(self) -> None:
+        os.makedirs(self.base_dir, exist_ok=True)
+
+    def get_blob(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """按摘要查询内容，不存在返回None"""
+        if not is_sha256(sha256) or not os.path.isdir(self.base_dir):
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT sha256, size, ref_count FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        if row is None or not os.path.exists(self.blob_path(sha256)):
+            return None
+        return dict(row)
+
+    def resolve(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        """
+        查询逻辑路径对应的内容
+
+        Returns:
+            Dict[str, Any]: path（内容文件完整路径）、size、sha256；逻辑路径不存在时返回None
+        """
+        if not os.path.isdir(self.base_dir):
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT b.sha256, b.size FROM files f JOIN blobs b ON b.sha256 = f.sha256 WHERE f.path = ?",
+                (_normalize(rel_path),)).fetchone()
+        if row is None:
+            return None
+        return {'path': self.blob_path(row['sha256']), 'size': row['size'], 'sha256': row['sha256']}
+
+    def add_file(self, rel_path: str, source_path: str, sha256: str) -> bool:
+        """
+        把已写入磁盘的上传文件存入内容存储，并登记为逻辑路径rel_path
+
+        内容已存在时删除source_path，只增加引用计数。
+
+        Returns:
+            bool: 内容是否已存在（即本次上传被去重）
+        """
+        self._ensure_dir()
+        size = os.path.getsize(source_path)
+        blob_path = self.blob_path(sha256)
+        with self._lock, closing(self._connect()) as conn, conn:
+            existed = self._add_ref(conn, sha256, size) and os.path.exists(blob_path)
+            if existed:
+                os.remove(source_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(source_path, blob_path)
+            self._insert_file(conn, rel_path, sha256)
+        return existed
+
+    def link(self, rel_path: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        为已存在的内容登记新的逻辑路径，不需要上传文件内容
+
+        Returns:
+            Dict[str, Any]: 同resolve()；内容不存在时返回None
+        """
+        if not is_sha256(sha256) or not os.path.exists(self.blob_path(sha256)):
+            return None
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT size FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is None:
+                return None
+            self._add_ref(conn, sha256, row['size'])
+            self._insert_file(conn, rel_path, sha256)
+        return {'path': self.blob_path(sha256), 'size': row['size'], 'sha256': sha256}
+
+    def remove(self, rel_path: str) -> bool:
+        """删除逻辑路径，内容的引用计数减到0时删除内容文件；逻辑路径不存在返回False"""
+        if not os.path.isdir(self.base_dir):
+            return False
+        rel_path = _normalize(rel_path)
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT sha256 FROM files WHERE path = ?", (rel_path,)).fetchone()
+            if row is None:
+                return False
+            sha256 = row['sha256']
+            conn.execute("DELETE FROM files WHERE path = ?", (rel_path,))
+            conn.execute("UPDATE blobs SET ref_count = ref_count - 1 WHERE sha256 = ?", (sha256,))
+            if conn.execute("DELETE FROM blobs WHERE sha256 = ? AND ref_count <= 0", (sha256,)).rowcount:
+                blob_path = self.blob_path(sha256)
+                if os.path.exists(blob_path):
+                    os.remove(blob_path)
+                logger.info(f"内容已无引用，删除: {sha256}")
+        return True
+
+    @staticmethod
+    def _add_ref(conn: sqlite3.Connection, sha256: str, size: int) -> bool:
+        """引用计数加一，返回内容是否已存在"""
+        cursor = conn.execute("UPDATE blobs SET ref_count = ref_count + 1 WHERE sha256 = ?", (sha256,))
+        if cursor.rowcount:
+            return True
+        conn.execute("INSERT INTO blobs (sha256, size, ref_count, create_time) VALUES (?, ?, 1, ?)",
+                     (sha256, size, datetime.now().isoformat(timespec='seconds')))
+        return False
+
+    @staticmethod
+    def _insert_file(conn: sqlite3.Connection, rel_path: str, sha256: str) -> None:
+        conn.execute("INSERT INTO files (path, sha256, create_time) VALUES (?, ?, ?)",
+                     (_normalize(rel_path), sha256, datetime.now().isoformat(timespec='seconds')))
+
+
+def _normalize(rel_path: str) -> str:
+    """逻辑路径统一使用正斜杠，与下载URL中的路径一致"""
+    return os.path.normpath(rel_path).replace(os.sep, '/')
@@ -2,16 +2,146 @@
 """
 文件服务器客户端模块
 """
+import hashlib
+import json
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from config.settings import FILE_CLIENT_CONFIG, config_dir
 from file_server.config import file_server_config
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 每个文件服务器 (host, port) 共用一个HTTP会话，复用TCP长连接
+_sessions: Dict[Tuple[str, str], requests.Session] = {}
+_clients: Dict[Tuple[str, str], 'FileServerClient'] = {}
+_registry_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    """创建保持长连接的HTTP会话，连接失败时对幂等请求重试"""
+    retries = Retry(
+        total=FILE_CLIENT_CONFIG['max_retries'],
+        connect=FILE_CLIENT_CONFIG['max_retries'],
+        read=0,
+        status=0,
+        backoff_factor=0.2,
+        allowed_methods=frozenset(['GET', 'HEAD', 'DELETE']),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=FILE_CLIENT_CONFIG['pool_connections'],
+        pool_maxsize=FILE_CLIENT_CONFIG['pool_maxsize'],
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(host: str, port) -> requests.Session:
+    """获取文件服务器 (host, port) 的共享HTTP会话"""
+    key = (str(host), str(port))
+    session = _sessions.get(key)
+    if session is None:
+        with _registry_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = _create_session()
+    return session
+
+
+def get_client(host: str = None, port=None, root_dir: str = None) -> 'FileServerClient':
+    """
+    获取文件服务器 (host, port) 的共享客户端，未指定host/port时返回使用当前系统配置的全局客户端
+
+    附件记录中保存了上传时的文件服务器信息，按记录访问文件时应使用本函数而不是每次新建客户端。
+    """
+    if not (host and port):
+        return file_server_client
+    key = (str(host), str(port))
+    client = _clients.get(key)
+    if client is None:
+        with _registry_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = FileServerClient(host, str(port), root_dir)
+    return client
+
+
+def close_sessions() -> None:
+    """关闭所有HTTP会话（程序退出时调用）"""
+    with _registry_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+# 未完成的断点续传会话：上传标识 -> upload_id，程序重启后再次上传同一文件时继续上传
+UPLOAD_STATE_PATH = os.path.join(config_dir, 'upload_sessions.json')
+_upload_state_lock = threading.Lock()
+
+# 下载时每次写入本地文件的字节数
+DOWNLOAD_BLOCK_SIZE = 64 << 10
+
+# 视为连接中断、可以续传的异常
+_RESUMABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+def _load_upload_state() -> Dict[str, str]:
+    try:
+        with open(UPLOAD_STATE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _set_upload_state(key: str, upload_id: Optional[str]) -> None:
+    """记录或删除（upload_id为None）未完成的上传会话"""
+    with _upload_state_lock:
+        state = _load_upload_state()
+        if upload_id is None:
+            if state.pop(key, None) is None:
+                return
+        else:
+            state[key] = upload_id
+        try:
+            os.makedirs(os.path.dirname(UPLOAD_STATE_PATH), exist_ok=True)
+            with open(UPLOAD_STATE_PATH, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning(f"保存上传会话记录失败: {e}")
+
+
+def _file_sha256(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _expand_ranges(ranges) -> Set[int]:
+    """把 [[0, 2], [5, 5]] 形式的分块区间展开为分块序号集合"""
+    return {index for first, last in ranges for index in range(first, last + 1)}
+
+
+def _timeout() -> Tuple[float, float]:
+    return FILE_CLIENT_CONFIG['connect_timeout'], FILE_CLIENT_CONFIG['read_timeout']
+
 
 class FileServerClient:
     """文件服务器客户端类"""
@@ -41,6 +171,11 @@ class FileServerClient:
             self.port = port
             self.mode = 'remote'
 
+    @property
+    def session(self) -> requests.Session:
+        """当前文件服务器的共享HTTP会话"""
+        return get_session(self.host, self.port)
+
     def upload_file(self, file_path: str, sub_dir: str = '') -> Dict[str, Any]:
         """上传文件到文件服务器（统一通过API上传）
         
@@ -57,23 +192,165 @@ class FileServerClient:
         if not os.path.exists(file_path):
             return {'success': False, 'message': '文件不存在'}
 
-        # 统一通过API上传文件
+        # 统一通过API上传文件：服务器已有相同内容时只登记不上传，大文件使用断点续传
         try:
-            url = f"{self.server_url}/api/files/upload"
-            files = {'file': open(file_path, 'rb')}
-            data = {'sub_dir': sub_dir}
-
-            response = requests.post(url, files=files, data=data)
-            response.raise_for_status()
-            return response.json()
+            sha256 = _file_sha256(file_path)
+            result = self._link_existing(file_path, sub_dir, sha256)
+            size = os.path.getsize(file_path)
+            if result is None and size >= FILE_CLIENT_CONFIG['resumable_threshold']:
+                result = self._resumable_upload(file_path, sub_dir, size, sha256)
+            if result is None:
+                result = self._stream_upload(file_path, sub_dir)
+            if result is None:
+                # 文件服务器版本较旧，不支持流式上传
+                result = self._multipart_upload(file_path, sub_dir)
+            return result
         except requests.RequestException as e:
             return {'success': False, 'message': f'上传失败: {str(e)}'}
         except Exception as e:
             return {'success': False, 'message': f'上传失败: {str(e)}'}
 
+    def _link_existing(self, file_path: str, sub_dir: str, sha256: str) -> Optional[Dict[str, Any]]:
+        """服务器内容存储中已有相同内容（HEAD /api/blobs/<sha256>）时直接登记新文件
+
+        Returns:
+            上传结果字典，服务器没有该内容、未启用去重或版本较旧时返回None
+        """
+        url = f"{self.server_url}/api/blobs/{sha256}"
+        with self.session.head(url, timeout=_timeout()) as response:
+            if response.status_code != 200:
+                return None
+        with self.session.post(f"{url}/link", timeout=_timeout(), json={
+            'file_name': os.path.basename(file_path),
+            'sub_dir': sub_dir,
+        }) as response:
+            if response.status_code == 404:
+                return None
+            result = _json_or_error(response)
+        if result.get('success'):
+            logger.info(f"文件服务器已有相同内容，跳过上传: {file_path}")
+        return result
+
+    def _resumable_upload(self, file_path: str, sub_dir: str, size: int, sha256: str) -> Optional[Dict[str, Any]]:
+        """断点续传分块上传
+
+        创建上传会话后逐块上传，连接中断时查询服务器已收到的分块，只补传缺少的分块；
+        连续upload_retries次没有进展才放弃。会话ID记录在本地，程序重启后再次上传同一文件会继续上传。
+
+        Returns:
+            上传结果字典，服务器不支持断点续传时返回None
+        """
+        key = '|'.join([self.server_url, sub_dir, os.path.abspath(file_path), str(size), sha256])
+        upload_id = _load_upload_state().get(key)
+        failures = 0
+        last_received = -1
+        while True:
+            try:
+                if upload_id is not None:
+                    with self.session.get(f"{self.server_url}/api/uploads/{upload_id}", timeout=_timeout()) as response:
+                        if response.status_code == 404:
+                            # 会话已过期或服务器不支持，重新创建
+                            upload_id = None
+                            _set_upload_state(key, None)
+                            continue
+                        info = _json_or_error(response)
+                else:
+                    with self.session.post(f"{self.server_url}/api/uploads", timeout=_timeout(), json={
+                        'file_name': os.path.basename(file_path),
+                        'sub_dir': sub_dir,
+                        'size': size,
+                        'chunk_size': FILE_CLIENT_CONFIG['chunk_size'],
+                        'sha256': sha256,
+                    }) as response:
+                        if response.status_code in (404, 405):
+                            return None
+                        info = _json_or_error(response)
+                    if not info.get('success'):
+                        return info
+                    upload_id = info['upload_id']
+                    _set_upload_state(key, upload_id)
+
+                received = _expand_ranges(info.get('received', []))
+                if len(received) > last_received:
+                    # 上次中断后服务器收到了新的分块，重新计算重试次数
+                    failures = 0
+                    last_received = len(received)
+                self._upload_missing_chunks(file_path, upload_id, info, received)
+
+                with self.session.post(f"{self.server_url}/api/uploads/{upload_id}/commit",
+                                       json={'sha256': sha256}, timeout=_timeout()) as response:
+                    result = _json_or_error(response)
+                if result.get('success'):
+                    _set_upload_state(key, None)
+                    return result
+                if response.status_code not in (400, 409):
+                    return result
+                error = result.get('message')
+            except _RESUMABLE_ERRORS as e:
+                error = str(e)
+
+            failures += 1
+            if failures > FILE_CLIENT_CONFIG['upload_retries']:
+                return {'success': False, 'message': f'上传失败（可重新上传以继续）: {error}'}
+            logger.warning(f"上传中断，第{failures}次重试: {error}")
+            time.sleep(min(0.5 * failures, 5))
+
+    def _upload_missing_chunks(self, file_path: str, upload_id: str, info: Dict[str, Any],
+                               received: Set[int]) -> None:
+        """上传服务器缺少的分块，分块被拒绝时抛出ConnectionError以便重试"""
+        chunk_size = info['chunk_size']
+        with open(file_path, 'rb') as f:
+            for index in range(info['chunk_count']):
+                if index in received:
+                    continue
+                f.seek(index * chunk_size)
+                chunk = f.read(chunk_size)
+                url = f"{self.server_url}/api/uploads/{upload_id}/chunks/{index}"
+                headers = {'Content-Type': 'application/octet-stream',
+                           'X-Content-SHA256': hashlib.sha256(chunk).hexdigest()}
+                with self.session.put(url, data=chunk, headers=headers, timeout=_timeout()) as response:
+                    result = _json_or_error(response)
+                if not result.get('success'):
+                    raise requests.ConnectionError(f"分块{index}上传失败: {result.get('message')}")
+
+    def _stream_upload(self, file_path: str, sub_dir: str) -> Optional[Dict[str, Any]]:
+        """流式上传：请求体即文件内容，边发送边计算SHA-256并与服务器计算的结果比对
+
+        Returns:
+            上传结果字典，服务器不支持流式上传时返回None
+        """
+        url = f"{self.server_url}/api/files/stream"
+        params = {'file_name': os.path.basename(file_path), 'sub_dir': sub_dir}
+        with open(file_path, 'rb') as f:
+            reader = _HashingReader(f, os.fstat(f.fileno()).st_size)
+            headers = {'Content-Type': 'application/octet-stream'}
+            with self.session.put(url, data=reader, params=params, headers=headers,
+                                  timeout=_timeout()) as response:
+                if response.status_code in (404, 405):
+                    return None
+                result = _json_or_error(response)
+
+        if result.get('success') and result.get('sha256') != reader.hexdigest():
+            # 传输过程中内容被改变（例如文件在上传时被修改），删除服务器上的文件
+            self.delete_file(result['file_path'])
+            return {'success': False, 'message': '上传失败: 文件校验不一致'}
+        return result
+
+    def _multipart_upload(self, file_path: str, sub_dir: str) -> Dict[str, Any]:
+        """multipart表单上传（兼容旧版文件服务器）"""
+        url = f"{self.server_url}/api/files/upload"
+        with open(file_path, 'rb') as f:
+            response = self.session.post(url, files={'file': f}, data={'sub_dir': sub_dir}, timeout=_timeout())
+        response.raise_for_status()
+        return response.json()
+
     def download_file(self, file_path: str, save_dir: str = '') -> (bool, str):
         """从文件服务器下载文件（统一通过API下载）
-        
+
+        本地已有同名文件时发送If-None-Match条件请求，内容一致（304）则不再下载；
+        下载先写入 .part 文件，中断后用Range/If-Range从已下载的位置继续，
+        完成后按ETag（文件SHA-256）校验再改为正式文件名。
+
         Args:
             file_path: 文件在服务器上的相对路径
             save_dir: 保存目录（可选，默认保存到当前目录）
@@ -86,24 +363,35 @@ class FileServerClient:
         # 统一通过API下载文件
         try:
             url = f"{self.server_url}/api/files/download/{file_path}"
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
 
             # 获取文件名
             file_name = os.path.basename(file_path)
             if save_dir:
                 save_dir, save_name = os.path.split(save_dir)
-                os.makedirs(save_dir, exist_ok=True)
+                if save_dir:
+                    os.makedirs(save_dir, exist_ok=True)
                 save_path = os.path.join(save_dir, save_name)
             else:
                 save_path = file_name
 
-            # 保存文件
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            return True, ""
+            part_path = f"{save_path}.part"
+            failures = 0
+            last_size = -1
+            while True:
+                try:
+                    self._download_once(url, save_path, part_path)
+                    return True, ""
+                except _RESUMABLE_ERRORS as e:
+                    size = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                    if size > last_size:
+                        # 本次收到了新数据，重新计算续传次数
+                        failures = 0
+                        last_size = size
+                    failures += 1
+                    if failures > FILE_CLIENT_CONFIG['download_retries']:
+                        raise
+                    logger.warning(f"下载中断，第{failures}次续传（已下载 {size} 字节）: {e}")
+                    time.sleep(min(0.5 * failures, 5))
         except requests.exceptions.RequestException as e:
             logger.error(f"下载失败: {str(e)}")
             return False, str(e)
@@ -111,6 +399,50 @@ class FileServerClient:
             logger.error(f"下载失败: {str(e)}")
             return False, str(e)
 
+    def _download_once(self, url: str, save_path: str, part_path: str) -> None:
+        """发送一次下载请求，续传或完成 .part 文件；连接中断时抛出requests异常，已写入的数据保留"""
+        etag_path = f"{part_path}.etag"
+        headers = {}
+        offset = 0
+        if os.path.exists(save_path):
+            headers['If-None-Match'] = f'"{_file_sha256(save_path)}"'
+        elif os.path.exists(part_path) and os.path.exists(etag_path):
+            with open(etag_path, 'r', encoding='utf-8') as f:
+                etag = f.read().strip()
+            offset = os.path.getsize(part_path)
+            if offset and etag:
+                # 服务器上的文件已变化时If-Range不成立，服务器返回完整内容（200）
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = etag
+
+        # 响应读完或关闭后连接才会回到连接池
+        with self.session.get(url, headers=headers, stream=True, timeout=_timeout()) as response:
+            if response.status_code == 304:
+                logger.info(f"本地文件与服务器一致，跳过下载: {save_path}")
+                return
+            if response.status_code == 416:
+                # 续传位置已超出文件末尾，丢弃 .part 文件重新下载
+                _remove_files(part_path, etag_path)
+                return self._download_once(url, save_path, part_path)
+            response.raise_for_status()
+
+            etag = response.headers.get('ETag', '')
+            if response.status_code != 206:
+                with open(etag_path, 'w', encoding='utf-8') as f:
+                    f.write(etag)
+            with open(part_path, 'ab' if response.status_code == 206 else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_BLOCK_SIZE):
+                    f.write(chunk)
+
+        # ETag为SHA-256时校验下载的内容（旧版服务器的ETag不是内容摘要，不校验）
+        expected = etag.strip('"').lower()
+        if len(expected) == 64 and all(c in '0123456789abcdef' for c in expected) \
+                and _file_sha256(part_path) != expected:
+            _remove_files(part_path, etag_path)
+            raise ValueError('下载的文件校验失败: SHA-256不一致')
+        os.replace(part_path, save_path)
+        _remove_files(etag_path)
+
     def delete_file(self, file_path: str) -> Dict[str, Any]:
         """从文件服务器删除文件（统一通过API删除）
         
@@ -125,7 +457,7 @@ class FileServerClient:
         # 统一通过API删除文件
         try:
             url = f"{self.server_url}/api/files/delete/{file_path}"
-            response = requests.delete(url)
+            response = self.session.delete(url, timeout=_timeout())
             response.raise_for_status()
 
             return {
@@ -150,12 +482,12 @@ class FileServerClient:
         # 统一通过API检查文件是否存在
         try:
             url = f"{self.server_url}/api/files/exists/{file_path}"
-            response = requests.get(url)
+            response = self.session.get(url, timeout=_timeout())
             response.raise_for_status()
             result = response.json()
             return result.get('exists', False)
         except Exception as e:
-            logger.error(f"文件删除失败: {str(e)}")
+            logger.error(f"检查文件是否存在失败: {str(e)}")
             return False
 
     def get_server_status(self) -> Optional[Dict[str, Any]]:
@@ -169,7 +501,7 @@ class FileServerClient:
         # 统一通过API获取服务器状态
         try:
             url = f"{self.server_url}/api/server/status"
-            response = requests.get(url)
+            response = self.session.get(url, timeout=_timeout())
             response.raise_for_status()
             result = response.json()
             result['mode'] = 'remote'
@@ -192,5 +524,37 @@ class FileServerClient:
         return total_size
 
 
+class _HashingReader:
+    """包装文件对象，读取时计算SHA-256；提供长度使requests发送Content-Length而不是分块编码"""
+
+    def __init__(self, f, size: int):
+        self._file = f
+        self._size = size
+        self._sha256 = hashlib.sha256()
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        self._sha256.update(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def _json_or_error(response: requests.Response) -> Dict[str, Any]:
+    """解析文件服务器返回的JSON，错误响应中带有message时返回失败结果而不是抛出异常"""
+    try:
+        result = response.json()
+    except ValueError:
+        response.raise_for_status()
+        raise
+    if not response.ok and 'success' not in result:
+        response.raise_for_status()
+    return result
+
+
 # 创建全局客户端实例
 file_server_client = FileServerClient()
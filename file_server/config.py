@@ -91,6 +91,16 @@ class FileServerConfig:
         self._config['remote_port'] = value
         self._save_config()
 
+    @property
+    def dedup(self) -> bool:
+        """是否按内容去重存储上传的文件"""
+        return bool(self._config.get('dedup', False))
+
+    @dedup.setter
+    def dedup(self, value: bool):
+        self._config['dedup'] = value
+        self._save_config()
+
     def get_server_url(self) -> str:
         """获取文件服务器URL"""
         if self.remote_server and self.remote_host:
@@ -2,18 +2,36 @@
 """
 文件服务器实现
 """
+import hashlib
 import os
+import shutil
+import threading
 import uuid
 from datetime import datetime
 
 from flask import Flask, request, send_file, jsonify, abort
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
 
+from file_server.blob_store import BLOBS_DIR, BlobStore
 from file_server.config import file_server_config
+from file_server.upload_session import UPLOADS_DIR, UploadSessionError, UploadSessionStore
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 流式上传每次读取、写入的字节数
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# 上传后存储目录所在磁盘至少保留的剩余空间（字节）
+MIN_FREE_SPACE = 100 << 20
+
+# 内存中缓存的文件SHA-256（用作ETag）条数上限
+DIGEST_CACHE_SIZE = 4096
+
+# 服务器内部使用的目录（内容存储、断点续传临时文件），不能通过文件接口直接访问
+RESERVED_DIRS = (BLOBS_DIR, UPLOADS_DIR)
+
 
 class FileServer:
     """文件服务器类"""
@@ -21,6 +39,11 @@ class FileServer:
     def __init__(self):
         self.app = Flask(__name__)
         self.root_dir = file_server_config.root_dir
+        self.upload_sessions = UploadSessionStore(self.root_dir)
+        self.blob_store = BlobStore(self.root_dir)
+        # 完整路径 -> (大小, 修改时间, SHA-256)，文件大小或修改时间变化后重新计算
+        self._digests = {}
+        self._digests_lock = threading.Lock()
         self._setup_routes()
 
         # 确保存储目录存在
@@ -40,25 +63,12 @@ class FileServer:
                 return jsonify({'success': False, 'message': '没有选择文件'}), 400
 
             try:
-                # 获取子目录参数
-                sub_dir = request.form.get('sub_dir', '')
-
-                # 生成安全的文件名
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                unique_id = str(uuid.uuid4())[:8]
-                safe_filename = secure_filename(file.filename)
-                new_filename = f"{timestamp}_{unique_id}_{safe_filename}"
-
-                # 构建完整的文件路径
-                if sub_dir:
-                    save_dir = os.path.join(self.root_dir, sub_dir)
-                    os.makedirs(save_dir, exist_ok=True)
-                    file_path = os.path.join(save_dir, new_filename)
-                else:
-                    file_path = os.path.join(self.root_dir, new_filename)
+                file_path, safe_filename = self._new_file_path(request.form.get('sub_dir', ''), file.filename)
 
                 # 保存文件
                 file.save(file_path)
+                if file_server_config.dedup:
+                    self._store_upload(file_path, self._file_digest(file_path))
 
                 # 计算相对路径（相对于root_dir）
                 rel_path = os.path.relpath(file_path, self.root_dir)
@@ -72,19 +82,158 @@ class FileServer:
             except Exception as e:
                 return jsonify({'success': False, 'message': str(e)}), 500
 
+        @self.app.route('/api/files/stream', methods=['PUT'])
+        def stream_upload_file():
+            """流式上传文件接口
+
+            请求体为文件内容，按块直接写入最终路径并同时计算SHA-256，不经过multipart解析和临时文件。
+            查询参数：file_name（文件名）、sub_dir（子目录）；必须提供Content-Length，
+            写入前检查磁盘剩余空间；请求头X-Content-SHA256存在时校验文件内容。
+            """
+            file_name = request.args.get('file_name', '')
+            if not file_name:
+                return jsonify({'success': False, 'message': '没有文件名'}), 400
+            size = request.content_length
+            if size is None:
+                return jsonify({'success': False, 'message': '缺少Content-Length'}), 411
+            if shutil.disk_usage(self.root_dir).free - size < MIN_FREE_SPACE:
+                return jsonify({'success': False, 'message': '文件服务器磁盘空间不足'}), 507
+
+            try:
+                file_path, safe_filename = self._new_file_path(request.args.get('sub_dir', ''), file_name)
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+
+            try:
+                digest, written = self._write_stream(request.stream, file_path, size)
+            except Exception as e:
+                logger.error(f"流式上传失败: {e}")
+                return jsonify({'success': False, 'message': str(e)}), 500
+
+            if written != size:
+                os.remove(file_path)
+                return jsonify({'success': False, 'message': f'文件不完整: 已接收 {written}/{size} 字节'}), 400
+            expected = request.headers.get('X-Content-SHA256')
+            if expected and expected.lower() != digest:
+                os.remove(file_path)
+                return jsonify({'success': False, 'message': '文件校验失败: SHA-256不一致'}), 400
+            self._store_upload(file_path, digest)
+
+            return jsonify({
+                'success': True,
+                'file_path': os.path.relpath(file_path, self.root_dir),
+                'file_name': safe_filename,
+                'full_path': file_path,
+                'size': written,
+                'sha256': digest
+            })
+
+        @self.app.route('/api/uploads', methods=['POST'])
+        def create_upload():
+            """创建断点续传会话
+
+            JSON参数：file_name、sub_dir、size（字节）、chunk_size（可选）、sha256（可选，提交时校验）
+            """
+            params = request.get_json(silent=True) or {}
+            file_name = params.get('file_name', '')
+            if not file_name:
+                return jsonify({'success': False, 'message': '没有文件名'}), 400
+            try:
+                size = int(params.get('size'))
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'message': '缺少文件大小'}), 400
+            if shutil.disk_usage(self.root_dir).free - size < MIN_FREE_SPACE:
+                return jsonify({'success': False, 'message': '文件服务器磁盘空间不足'}), 507
+
+            try:
+                meta = self.upload_sessions.create(file_name, params.get('sub_dir', ''), size,
+                                                   params.get('chunk_size'), params.get('sha256'))
+            except UploadSessionError as e:
+                return jsonify({'success': False, 'message': str(e)}), e.status
+            return jsonify({
+                'success': True,
+                'upload_id': meta['upload_id'],
+                'chunk_size': meta['chunk_size'],
+                'chunk_count': meta['chunk_count'],
+                'received': [],
+            })
+
+        @self.app.route('/api/uploads/<upload_id>', methods=['GET'])
+        def get_upload(upload_id):
+            """查询断点续传会话已接收的分块区间"""
+            try:
+                return jsonify(dict(self.upload_sessions.status(upload_id), success=True))
+            except UploadSessionError as e:
+                return jsonify({'success': False, 'message': str(e)}), e.status
+
+        @self.app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+        def put_upload_chunk(upload_id, index):
+            """上传一个分块，请求体为分块内容，可按任意顺序上传；请求头X-Content-SHA256存在时校验分块"""
+            try:
+                self.upload_sessions.write_chunk(upload_id, index, request.stream, request.content_length,
+                                                 request.headers.get('X-Content-SHA256'))
+            except UploadSessionError as e:
+                return jsonify({'success': False, 'message': str(e)}), e.status
+            except Exception as e:
+                logger.error(f"写入上传分块失败: {e}")
+                return jsonify({'success': False, 'message': str(e)}), 500
+            return jsonify({'success': True, 'index': index})
+
+        @self.app.route('/api/uploads/<upload_id>/commit', methods=['POST'])
+        def commit_upload(upload_id):
+            """所有分块到齐后提交，校验SHA-256（JSON参数sha256或创建会话时提供）并保存文件"""
+            params = request.get_json(silent=True) or {}
+            try:
+                result = self.upload_sessions.commit(
+                    upload_id, lambda meta: self._new_file_path(meta['sub_dir'], meta['file_name'])[0],
+                    params.get('sha256'))
+            except UploadSessionError as e:
+                return jsonify({'success': False, 'message': str(e)}), e.status
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            file_path = result['path']
+            if os.path.exists(file_path):
+                # 重复提交时文件已保存（或已存入内容存储），不再处理
+                self._store_upload(file_path, result['sha256'])
+            return jsonify({
+                'success': True,
+                'file_path': os.path.relpath(file_path, self.root_dir),
+                'file_name': os.path.basename(file_path).split('_', 3)[-1],
+                'full_path': file_path,
+                'size': result['size'],
+                'sha256': result['sha256']
+            })
+
+        @self.app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+        def abort_upload(upload_id):
+            """放弃断点续传会话"""
+            try:
+                self.upload_sessions.abort(upload_id)
+            except UploadSessionError as e:
+                return jsonify({'success': False, 'message': str(e)}), e.status
+            return jsonify({'success': True, 'message': '上传已取消'})
+
         @self.app.route('/api/files/download/<path:file_path>', methods=['GET'])
         def download_file(file_path):
-            """下载文件接口"""
+            """下载文件接口
+
+            ETag为文件内容的SHA-256（强校验），支持If-None-Match/If-Modified-Since条件请求（304）
+            和Range分段下载（206，配合If-Range续传）。
+            """
             try:
-                # 构建完整的文件路径
+                if self._is_reserved_path(file_path):
+                    abort(404)
+                # 构建完整的文件路径，不是普通文件时在内容存储中查找
                 full_path = os.path.join(self.root_dir, file_path)
-
-                # 检查文件是否存在
+                etag = None
                 if not os.path.exists(full_path):
-                    abort(404)
+                    blob = self.blob_store.resolve(file_path)
+                    if blob is None:
+                        abort(404)
+                    full_path, etag = blob['path'], blob['sha256']
 
                 # 获取文件名（用于下载时显示）
-                file_name = os.path.basename(full_path)
+                file_name = os.path.basename(file_path)
                 # 尝试从文件名中提取原始文件名（去掉时间戳和UUID部分）
                 if '_' in file_name:
                     parts = file_name.split('_')
@@ -95,23 +244,33 @@ class FileServer:
                 else:
                     original_name = file_name
 
-                return send_file(full_path, as_attachment=True, download_name=original_name)
+                return send_file(full_path, as_attachment=True, download_name=original_name,
+                                 etag=etag or self._file_digest(full_path), conditional=True)
+            except HTTPException:
+                # 404、416等由Flask按HTTP状态码返回
+                raise
             except Exception as e:
                 return jsonify({'success': False, 'message': str(e)}), 500
 
         @self.app.route('/api/files/delete/<path:file_path>', methods=['DELETE'])
         def delete_file(file_path):
             """删除文件接口"""
+            if self._is_reserved_path(file_path):
+                return jsonify({'success': False, 'message': '文件不存在'}), 404
             try:
                 # 构建完整的文件路径
                 full_path = os.path.join(self.root_dir, file_path)
 
-                # 检查文件是否存在
+                # 检查文件是否存在，内容存储中的文件只删除逻辑路径，内容没有其他引用时才删除
                 if not os.path.exists(full_path):
+                    if self.blob_store.remove(file_path):
+                        return jsonify({'success': True, 'message': '文件已删除'})
                     return jsonify({'success': False, 'message': '文件不存在'}), 404
 
                 # 删除文件
                 os.remove(full_path)
+                with self._digests_lock:
+                    self._digests.pop(full_path, None)
 
                 # 如果目录为空，尝试删除目录
                 dir_path = os.path.dirname(full_path)
@@ -125,10 +284,46 @@ class FileServer:
         @self.app.route('/api/files/exists/<path:file_path>', methods=['GET'])
         def check_file_exists(file_path):
             """检查文件是否存在接口"""
+            if self._is_reserved_path(file_path):
+                return jsonify({'exists': False})
             full_path = os.path.join(self.root_dir, file_path)
-            exists = os.path.exists(full_path)
+            exists = os.path.exists(full_path) or self.blob_store.resolve(file_path) is not None
             return jsonify({'exists': exists})
 
+        @self.app.route('/api/blobs/<sha256>', methods=['GET'])
+        def get_blob(sha256):
+            """按SHA-256查询内容是否已存在（客户端用HEAD请求，200表示存在，可以不上传直接登记）"""
+            blob = self.blob_store.get_blob(sha256.lower()) if file_server_config.dedup else None
+            if blob is None:
+                return jsonify({'success': False, 'message': '内容不存在'}), 404
+            return jsonify({'success': True, 'sha256': blob['sha256'], 'size': blob['size']})
+
+        @self.app.route('/api/blobs/<sha256>/link', methods=['POST'])
+        def link_blob(sha256):
+            """为已存在的内容登记新文件，不传输文件内容；JSON参数：file_name、sub_dir"""
+            params = request.get_json(silent=True) or {}
+            if not params.get('file_name'):
+                return jsonify({'success': False, 'message': '没有文件名'}), 400
+            if not file_server_config.dedup:
+                return jsonify({'success': False, 'message': '内容不存在'}), 404
+            try:
+                file_path, safe_filename = self._new_file_path(params.get('sub_dir', ''), params['file_name'])
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            rel_path = os.path.relpath(file_path, self.root_dir)
+            blob = self.blob_store.link(rel_path, sha256.lower())
+            if blob is None:
+                return jsonify({'success': False, 'message': '内容不存在'}), 404
+            return jsonify({
+                'success': True,
+                'file_path': rel_path,
+                'file_name': safe_filename,
+                'full_path': blob['path'],
+                'size': blob['size'],
+                'sha256': blob['sha256'],
+                'deduplicated': True
+            })
+
         @self.app.route('/api/server/status', methods=['GET'])
         def server_status():
             """获取服务器状态接口"""
@@ -139,6 +334,92 @@ class FileServer:
                 'total_space': self._get_directory_size(self.root_dir)
             })
 
+    def _new_file_path(self, sub_dir: str, file_name: str):
+        """
+        生成上传文件的保存路径（时间戳+随机ID+安全文件名），并确保目录存在
+
+        Returns:
+            tuple: (完整路径, 安全文件名)
+
+        Raises:
+            ValueError: 子目录超出存储根目录
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        unique_id = str(uuid.uuid4())[:8]
+        safe_filename = secure_filename(file_name)
+        new_filename = f"{timestamp}_{unique_id}_{safe_filename}"
+
+        save_dir = os.path.abspath(os.path.join(self.root_dir, sub_dir)) if sub_dir else self.root_dir
+        if os.path.commonpath([save_dir, os.path.abspath(self.root_dir)]) != os.path.abspath(self.root_dir) \
+                or (sub_dir and self._is_reserved_path(sub_dir)):
+            raise ValueError(f'无效的子目录: {sub_dir}')
+        os.makedirs(save_dir, exist_ok=True)
+        return os.path.join(save_dir, new_filename), safe_filename
+
+    @staticmethod
+    def _is_reserved_path(file_path: str) -> bool:
+        """路径是否位于服务器内部目录中或超出存储根目录"""
+        parts = os.path.normpath(file_path).replace(os.sep, '/').split('/')
+        return os.path.isabs(file_path) or parts[0] in RESERVED_DIRS or parts[0] == '..'
+
+    @staticmethod
+    def _write_stream(stream, file_path: str, size: int):
+        """
+        把请求体按块写入文件并计算SHA-256，出错时删除写了一半的文件
+
+        Returns:
+            tuple: (SHA-256十六进制摘要, 写入的字节数)
+        """
+        sha256 = hashlib.sha256()
+        written = 0
+        try:
+            with open(file_path, 'xb') as f:
+                while written < size:
+                    chunk = stream.read(min(UPLOAD_CHUNK_SIZE, size - written))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    written += len(chunk)
+        except BaseException:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+        return sha256.hexdigest(), written
+
+    def _store_upload(self, file_path: str, digest: str):
+        """上传的文件写入完成后：启用去重时存入内容存储，否则记录SHA-256供下载时用作ETag"""
+        if file_server_config.dedup:
+            rel_path = os.path.relpath(file_path, self.root_dir)
+            if self.blob_store.add_file(rel_path, file_path, digest):
+                logger.info(f"上传内容已存在，去重保存: {rel_path}")
+        else:
+            self._remember_digest(file_path, digest)
+
+    def _file_digest(self, full_path: str) -> str:
+        """文件内容的SHA-256，按(大小, 修改时间)缓存，文件未变化时不重复读取"""
+        stat = os.stat(full_path)
+        with self._digests_lock:
+            cached = self._digests.get(full_path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        sha256 = hashlib.sha256()
+        with open(full_path, 'rb') as f:
+            for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+                sha256.update(block)
+        digest = sha256.hexdigest()
+        self._remember_digest(full_path, digest, stat)
+        return digest
+
+    def _remember_digest(self, full_path: str, digest: str, stat=None):
+        """记录上传时已计算的SHA-256，下载时不必再读一遍文件"""
+        stat = stat or os.stat(full_path)
+        with self._digests_lock:
+            if len(self._digests) >= DIGEST_CACHE_SIZE:
+                self._digests.pop(next(iter(self._digests)))
+            self._digests[full_path] = (stat.st_size, stat.st_mtime_ns, digest)
+
     def _get_directory_size(self, path):
         """获取目录大小（字节）"""
         total_size = 0
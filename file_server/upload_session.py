@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+文件服务器断点续传会话
+
+一次可续传上传对应存储根目录下 .uploads/<upload_id>/ 目录：
+meta.json 保存文件名、大小、分块大小等信息，data.part 为按偏移写入的文件内容，
+chunks/ 下每个已完整写入的分块对应一个标记文件。分块可以按任意顺序、并发上传，
+全部到齐后提交时校验SHA-256并移动到最终路径，提交结果保留到会话过期。
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+UPLOADS_DIR = '.uploads'
+
+# 允许的分块大小范围（字节）
+MIN_CHUNK_SIZE = 64 << 10
+MAX_CHUNK_SIZE = 64 << 20
+DEFAULT_CHUNK_SIZE = 8 << 20
+
+# 超过该时间（秒）未更新的上传会话会被清理
+UPLOAD_SESSION_TTL = 24 * 60 * 60
+
+# 写入分块、计算校验和时每次读写的字节数
+IO_BLOCK_SIZE = 1 << 20
+
+
+class UploadSessionError(Exception):
+    """上传会话操作失败，status为对应的HTTP状态码"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def chunk_ranges(indexes: List[int]) -> List[List[int]]:
+    """把已排序的分块序号压缩为闭区间列表，如 [0, 1, 2, 5] -> [[0, 2], [5, 5]]"""
+    ranges = []
+    for index in indexes:
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return ranges
+
+
+class UploadSessionStore:
+    """断点续传会话存储"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+
+    @property
+    def base_dir(self) -> str:
+        return os.path.join(self.root_dir, UPLOADS_DIR)
+
+    def _session_dir(self, upload_id: str) -> str:
+        # upload_id由服务器生成，只允许十六进制字符，避免路径穿越
+        if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+            raise UploadSessionError('无效的上传ID', 404)
+        return os.path.join(self.base_dir, upload_id)
+
+    def create(self, file_name: str, sub_dir: str, size: int, chunk_size: Optional[int] = None,
+               sha256: Optional[str] = None) -> Dict[str, Any]:
+        """创建上传会话，预先分配文件大小"""
+        if size < 0:
+            raise UploadSessionError('文件大小无效')
+        chunk_size = min(max(chunk_size or DEFAULT_CHUNK_SIZE, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+        self.purge_expired()
+
+        upload_id = uuid.uuid4().hex
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(os.path.join(session_dir, 'chunks'))
+        with open(os.path.join(session_dir, 'data.part'), 'wb') as f:
+            f.truncate(size)
+        meta = {
+            'upload_id': upload_id,
+            'file_name': file_name,
+            'sub_dir': sub_dir,
+            'size': size,
+            'chunk_size': chunk_size,
+            'chunk_count': max(1, -(-size // chunk_size)),
+            'sha256': sha256.lower() if sha256 else None,
+            'created_at': time.time(),
+        }
+        with open(os.path.join(session_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return meta
+
+    def load(self, upload_id: str) -> Dict[str, Any]:
+        """读取会话信息"""
+        try:
+            with open(os.path.join(self._session_dir(upload_id), 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadSessionError('上传会话不存在或已过期', 404)
+
+    def chunk_length(self, meta: Dict[str, Any], index: int) -> int:
+        """分块的字节数，最后一块可能较短"""
+        if not 0 <= index < meta['chunk_count']:
+            raise UploadSessionError(f'分块序号超出范围: {index}')
+        return max(0, min(meta['chunk_size'], meta['size'] - index * meta['chunk_size']))
+
+    def received(self, upload_id: str) -> List[int]:
+        """已完整接收的分块序号（升序）"""
+        chunks_dir = os.path.join(self._session_dir(upload_id), 'chunks')
+        try:
+            return sorted(int(name) for name in os.listdir(chunks_dir) if name.isdigit())
+        except FileNotFoundError:
+            raise UploadSessionError('上传会话不存在或已过期', 404)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """会话状态：大小、分块信息及已接收的分块区间"""
+        meta = self.load(upload_id)
+        received = self.received(upload_id)
+        return {
+            'upload_id': upload_id,
+            'size': meta['size'],
+            'chunk_size': meta['chunk_size'],
+            'chunk_count': meta['chunk_count'],
+            'received': chunk_ranges(received),
+            'received_count': len(received),
+        }
+
+    def write_chunk(self, upload_id: str, index: int, stream, length: Optional[int],
+                    sha256: Optional[str] = None) -> None:
+        """
+        把请求体写入分块对应的偏移，写入完整（且校验通过）后才记录该分块
+
+        Raises:
+            UploadSessionError: 会话不存在、长度不符或校验失败
+        """
+        meta = self.load(upload_id)
+        expected = self.chunk_length(meta, index)
+        if length is None:
+            raise UploadSessionError('缺少Content-Length', 411)
+        if length != expected:
+            raise UploadSessionError(f'分块大小不正确: {length}，应为 {expected}')
+
+        session_dir = self._session_dir(upload_id)
+        digest = hashlib.sha256()
+        written = 0
+        with open(os.path.join(session_dir, 'data.part'), 'r+b') as f:
+            f.seek(index * meta['chunk_size'])
+            while written < expected:
+                block = stream.read(min(IO_BLOCK_SIZE, expected - written))
+                if not block:
+                    break
+                f.write(block)
+                digest.update(block)
+                written += len(block)
+        if written != expected:
+            raise UploadSessionError(f'分块不完整: 已接收 {written}/{expected} 字节')
+        if sha256 and sha256.lower() != digest.hexdigest():
+            raise UploadSessionError('分块校验失败: SHA-256不一致')
+
+        # 标记文件在数据写完之后创建，中断的分块不会被视为已接收
+        open(os.path.join(session_dir, 'chunks', str(index)), 'wb').close()
+
+    def commit(self, upload_id: str, make_target_path: Callable[[Dict[str, Any]], str],
+               sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        所有分块到齐后校验SHA-256并移动到最终路径
+
+        提交结果保存在会话目录中直到会话过期，提交响应丢失后客户端重复提交会得到同一结果。
+
+        Args:
+            upload_id: 上传ID
+            make_target_path: 根据会话信息生成最终保存路径
+            sha256: 文件的SHA-256，为空时使用创建会话时提供的值
+
+        Returns:
+            Dict[str, Any]: path（最终路径）、size、sha256
+
+        Raises:
+            UploadSessionError: 分块未到齐或校验失败（校验失败时需重新上传全部分块）
+        """
+        meta = self.load(upload_id)
+        session_dir = self._session_dir(upload_id)
+        result_path = os.path.join(session_dir, 'result.json')
+        if os.path.exists(result_path):
+            with open(result_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        received = self.received(upload_id)
+        if len(received) != meta['chunk_count']:
+            raise UploadSessionError(f"分块未到齐: {len(received)}/{meta['chunk_count']}", 409)
+
+        data_path = os.path.join(session_dir, 'data.part')
+        digest = hashlib.sha256()
+        with open(data_path, 'rb') as f:
+            for block in iter(lambda: f.read(IO_BLOCK_SIZE), b''):
+                digest.update(block)
+        expected = (sha256 or meta.get('sha256') or '').lower()
+        if expected and expected != digest.hexdigest():
+            # 内容有误时清除分块标记，客户端需重新上传全部分块
+            shutil.rmtree(os.path.join(session_dir, 'chunks'))
+            os.makedirs(os.path.join(session_dir, 'chunks'))
+            raise UploadSessionError('文件校验失败: SHA-256不一致')
+
+        target_path = make_target_path(meta)
+        os.replace(data_path, target_path)
+        result = {'path': target_path, 'size': meta['size'], 'sha256': digest.hexdigest()}
+        with open(result_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        return result
+
+    def abort(self, upload_id: str) -> None:
+        """放弃上传，删除会话"""
+        session_dir = self._session_dir(upload_id)
+        if not os.path.isdir(session_dir):
+            raise UploadSessionError('上传会话不存在或已过期', 404)
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+    def purge_expired(self) -> int:
+        """删除超过UPLOAD_SESSION_TTL未更新的会话，返回删除的数量"""
+        if not os.path.isdir(self.base_dir):
+            return 0
+        deadline = time.time() - UPLOAD_SESSION_TTL
+        purged = 0
+        for upload_id in os.listdir(self.base_dir):
+            session_dir = os.path.join(self.base_dir, upload_id)
+            try:
+                if os.path.getmtime(os.path.join(session_dir, 'chunks')) < deadline:
+                    shutil.rmtree(session_dir, ignore_errors=True)
+                    purged += 1
+            except OSError:
+                continue
+        if purged:
+            logger.info(f"已清理 {purged} 个过期的上传会话")
+        return purged
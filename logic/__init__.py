@@ -10,4 +10,5 @@ from .project_result_attachment_logic import ProjectResultAttachmentLogic
 from .project_result_logic import ProjectResultLogic
 from .query_logic import QueryLogic
 from .reminder_logic import ReminderLogic
+from .reminder_rule_logic import ReminderRuleLogic
 from .user_logic import UserLogic
@@ -3,24 +3,37 @@
 科研项目管理系统 - 自动提醒功能
 """
 import datetime
+import heapq
+import itertools
 import json
 import os
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer, Qt
 from PyQt5.QtWidgets import QMessageBox
 
 from config.settings import config_dir, BACKUP_CONFIG_DIR
-from logic.reminder_logic import ReminderLogic
+from logic.reminder_logic import ReminderLogic, add_reminder_change_listener
 from models.reminder import Reminder
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 定时器单次最长等待时间（毫秒），超过时分段等待，避免系统休眠或调整时钟后错过提醒
+MAX_TIMER_INTERVAL_MS = 60 * 60 * 1000
+
 
 class AutoReminder(QObject):
-    """自动提醒类，负责在系统启动时检查并显示需要提醒的项目"""
+    """自动提醒类，按提醒的到期时间调度，到期时弹出需要提醒的项目
+
+    最小堆中保存下一批到期时间：最早开始提醒的日期，以及用户选择“下次继续提醒”的提醒
+    在reminder_interval_hours小时后再次提醒的时间。单次定时器只在堆顶时间到达时触发，
+    触发后按索引查询提醒区间包含今天的未读提醒，不再定时扫描整张提醒表。
+    提醒被创建、修改、删除或标记已读后重新查询并调度。
+    """
     reminder_triggered = pyqtSignal(str, str, str)
+    # 提醒变更通知可能来自后台线程，通过信号转到界面线程处理
+    reminders_changed = pyqtSignal()
 
     def __init__(self):
         """初始化自动提醒类"""
@@ -30,6 +43,17 @@ class AutoReminder(QObject):
         self.reminder_interval_hours = 1
         self.main_window = None
 
+        # 到期时间堆：(到期时间, 序号, 提醒ID)，提醒ID为None表示到期后查询需要提醒的提醒
+        self._heap: List[Tuple[datetime.datetime, int, Optional[int]]] = []
+        self._sequence = itertools.count()
+        self._queued_checks = set()
+        # 选择“下次继续提醒”的提醒ID -> 再次提醒时间
+        self._snoozed: Dict[int, datetime.datetime] = {}
+        self._showing = False
+        self._check_pending = False
+
+        self.reminders_changed.connect(self.reschedule)
+
         # 加载定时任务配置
         self.load_timer_config()
 
@@ -37,13 +61,13 @@ class AutoReminder(QObject):
         """初始化定时器（在QApplication创建后调用）"""
         if self.timer is None:
             self.timer = QTimer()
-            self.timer.timeout.connect(self.check_and_show_reminders)
+            self.timer.setSingleShot(True)
+            self.timer.timeout.connect(self._on_timeout)
+            add_reminder_change_listener(self.reminders_changed.emit)
 
-            # 启动时立即检查一次
+            # 启动时立即检查一次，检查后调度下一次到期时间
             self.check_and_show_reminders()
-
-            # 启动定时器
-            self.start_timer()
+            logger.info("提醒调度已启动")
 
     def set_main_window(self, main_window):
         """设置主窗口引用，用于消息框的父窗口"""
@@ -95,68 +119,102 @@ class AutoReminder(QObject):
             logger.error(f"保存提醒配置时发生错误: {e}")
 
     def start_timer(self):
-        """启动定时器"""
-        interval_ms = self.reminder_interval_hours * 60 * 60 * 1000  # 转换为毫秒
-        self.timer.start(interval_ms)
-        logger.info(f"定时提醒已启动，每{self.reminder_interval_hours}小时检查一次")
+        """按堆顶的到期时间启动单次定时器"""
+        if self.timer is None:
+            return
+        while self._heap and not self._is_pending(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self.timer.stop()
+            return
+        delay = (self._heap[0][0] - datetime.datetime.now()).total_seconds() * 1000
+        self.timer.start(int(min(max(delay, 0), MAX_TIMER_INTERVAL_MS)))
 
     def stop_timer(self):
         """停止定时器"""
-        self.timer.stop()
+        if self.timer is not None:
+            self.timer.stop()
 
     def update_interval(self, hours):
-        """更新检查间隔"""
+        """更新“下次继续提醒”的再次提醒间隔，对之后选择稍后提醒的提醒生效"""
         self.reminder_interval_hours = hours
         self.save_timer_config()
-        self.stop_timer()
-        self.start_timer()
 
-    def check_and_show_reminders(self) -> None:
-        """检查需要提醒的项目并显示提醒对话框
-        
-        系统启动后自动扫描提醒表，查询未读的所有提醒，
-        如果当前时间在 start_date 到 start_date + days_before 之间，则弹窗提醒
-        """
-        # 获取所有未读提醒
-        unread_reminders = self.reminder_logic.get_unread_reminders()
-
-        # 获取当前时间
-        current_time = datetime.datetime.now()
+    def reschedule(self):
+        """提醒数据变更后立即重新查询并调度"""
+        self.schedule_check(datetime.datetime.now())
 
-        # 检查哪些提醒需要显示
-        reminders_to_show = self._filter_reminders_to_show(unread_reminders, current_time)
+    def schedule_check(self, when: datetime.datetime) -> None:
+        """在指定时间查询需要提醒的提醒"""
+        if when in self._queued_checks:
+            return
+        self._queued_checks.add(when)
+        heapq.heappush(self._heap, (when, next(self._sequence), None))
+        self.start_timer()
 
-        # 显示需要提醒的项目
-        self._show_reminders(reminders_to_show)
+    def snooze(self, reminder: Reminder) -> None:
+        """reminder_interval_hours小时后再次提醒"""
+        when = datetime.datetime.now() + datetime.timedelta(hours=self.reminder_interval_hours)
+        self._snoozed[reminder.id] = when
+        heapq.heappush(self._heap, (when, next(self._sequence), reminder.id))
+
+    def _is_pending(self, entry) -> bool:
+        """堆中的条目是否仍然有效（稍后提醒的时间被更新后旧条目作废）"""
+        when, _, reminder_id = entry
+        if reminder_id is None:
+            return when in self._queued_checks
+        return self._snoozed.get(reminder_id) == when
+
+    def _on_timeout(self):
+        """取出所有已到期的条目，有到期条目时查询并显示提醒"""
+        now = datetime.datetime.now()
+        due = False
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_pending(entry):
+                continue
+            when, _, reminder_id = entry
+            if reminder_id is None:
+                self._queued_checks.discard(when)
+            else:
+                del self._snoozed[reminder_id]
+            due = True
 
-    def _filter_reminders_to_show(self, reminders: List[Reminder], current_time: datetime.datetime) -> List[Reminder]:
-        """过滤出当前需要显示的提醒
-        
-        Args:
-            reminders: 提醒列表
-            current_time: 当前时间
-            
-        Returns:
-            List[Reminder]: 需要显示的提醒列表
-        """
-        reminders_to_show = []
+        if due:
+            self.check_and_show_reminders()
+        else:
+            self.start_timer()
 
-        for reminder in reminders:
-            # 将start_date转换为datetime对象
-            if isinstance(reminder.start_date, str):
-                start_date = datetime.datetime.strptime(reminder.start_date, '%Y-%m-%d')
-            else:
-                # 处理date对象
-                start_date = datetime.datetime.combine(reminder.start_date, datetime.time.min)
+    def check_and_show_reminders(self) -> None:
+        """检查需要提醒的项目并显示提醒对话框，之后调度下一次到期时间
 
-            # 计算提醒的时间范围：start_date 到 start_date + days_before 天
-            end_date = start_date + datetime.timedelta(days=reminder.days_before)
+        按索引查询提醒区间 [start_date, start_date + days_before] 包含今天的未读提醒，
+        排除尚未到再次提醒时间的提醒后逐个弹窗提醒
+        """
+        if self._showing:
+            # 提醒对话框的事件循环中定时器再次到期，等当前提醒处理完后再检查
+            self._check_pending = True
+            return
 
-            # 检查当前时间是否在提醒时间范围内
-            if start_date <= current_time <= end_date:
-                reminders_to_show.append(reminder)
+        self._showing = True
+        try:
+            while True:
+                self._check_pending = False
+                reminders = self.reminder_logic.get_active_reminders(datetime.date.today())
+                self._show_reminders([r for r in reminders if r.id not in self._snoozed])
+                if not self._check_pending:
+                    break
+        finally:
+            self._showing = False
+
+        self._schedule_next_start()
+        self.start_timer()
 
-        return reminders_to_show
+    def _schedule_next_start(self) -> None:
+        """把最早开始提醒的日期加入堆中，到达当天零点时检查"""
+        next_date = self.reminder_logic.get_next_start_date(datetime.date.today())
+        if next_date is not None:
+            self.schedule_check(datetime.datetime.combine(next_date, datetime.time.min))
 
     def _show_reminders(self, reminders: List[Reminder]) -> None:
         """显示提醒对话框，每个提醒单独显示，操作作用于单个提醒
@@ -215,6 +273,9 @@ class AutoReminder(QObject):
             if msg_box.clickedButton() == remind_stop_btn:
                 # 用户选择"不再提醒"，标记当前提醒为已读
                 self.reminder_logic.mark_reminder_as_read(reminder.id)
+            else:
+                # 用户选择"下次继续提醒"或关闭对话框，间隔时间到达后再次提醒
+                self.snooze(reminder)
 
 
 # 创建单例实例，方便在main中使用
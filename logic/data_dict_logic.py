@@ -51,6 +51,10 @@ class DataDictLogic:
         """获取指定类型的数据字典列表"""
         return self.dao.get_by_type(dict_type)
 
+    def get_all_active_items(self) -> List[DataDict]:
+        """获取所有启用的数据字典项"""
+        return self.dao.get_all_active()
+
     def get_all_dict_items(self) -> List[DataDict]:
         """获取所有数据字典项"""
         return self.dao.get_all()
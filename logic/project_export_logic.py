@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 项目导出业务逻辑
+"""
+import csv
+import gzip
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from logic.query_logic import QueryLogic
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# CSV列：(项目字段, 表头)
+CSV_COLUMNS = [
+    ('project_name', '项目名称'),
+    ('leader', '负责人'),
+    ('department', '科室'),
+    ('phone', '联系电话'),
+    ('project_source', '项目来源'),
+    ('project_type', '项目类型'),
+    ('level', '项目级别'),
+    ('funding_amount', '资助经费（万元）'),
+    ('funding_unit', '资助单位'),
+    ('approval_year', '立项年度'),
+    ('project_number', '项目编号'),
+    ('start_date', '项目开始时间'),
+    ('end_date', '项目结束时间'),
+    ('status', '项目状态'),
+]
+
+# 写文件缓冲区大小
+CSV_BUFFER_SIZE = 1 << 20
+
+# 每写入多少行回调一次进度并检查是否取消
+CSV_PROGRESS_INTERVAL = 1000
+
+
+class ProjectExportLogic:
+    """项目导出业务逻辑"""
+
+    def __init__(self):
+        self.query_logic = QueryLogic()
+
+    def export_csv(self, conditions: Dict[str, Any], file_path: str, compress: Optional[bool] = None,
+                   progress: Optional[Callable[[int], None]] = None,
+                   cancel_event: Optional[threading.Event] = None) -> int:
+        """
+        按查询条件把项目导出为CSV，数据通过服务端游标逐行写入文件，不在内存中汇总
+
+        Args:
+            conditions: 查询条件，同QueryLogic.query_projects_page
+            file_path: 导出文件路径
+            compress: 是否gzip压缩，None表示按文件名是否以.gz结尾判断
+            progress: 进度回调，参数为已写入的行数
+            cancel_event: 取消事件，被设置后停止导出并删除未写完的文件
+
+        Returns:
+            int: 导出的项目数量
+
+        Raises:
+            InterruptedError: 导出被取消
+        """
+        rows = self.query_logic.iter_projects(conditions)
+        try:
+            return self.write_csv(rows, file_path, compress, progress, cancel_event)
+        finally:
+            rows.close()
+
+    @staticmethod
+    def write_csv(projects: Iterable[Dict[str, Any]], file_path: str, compress: Optional[bool] = None,
+                  progress: Optional[Callable[[int], None]] = None,
+                  cancel_event: Optional[threading.Event] = None) -> int:
+        """
+        把项目数据写入CSV文件（参数同export_csv）
+
+        Returns:
+            int: 写入的项目数量
+        """
+        if compress is None:
+            compress = file_path.lower().endswith('.gz')
+
+        fields = [field for field, _ in CSV_COLUMNS]
+        count = 0
+        if compress:
+            csv_file = gzip.open(file_path, 'wt', encoding='utf-8-sig', newline='')
+        else:
+            csv_file = open(file_path, 'w', encoding='utf-8-sig', newline='', buffering=CSV_BUFFER_SIZE)
+        try:
+            with csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow([header for _, header in CSV_COLUMNS])
+                for project in projects:
+                    writer.writerow([project.get(field, '') for field in fields])
+                    count += 1
+                    if count % CSV_PROGRESS_INTERVAL == 0:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise InterruptedError("导出已取消")
+                        if progress:
+                            progress(count)
+        except BaseException:
+            # 不保留写了一半的文件
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            raise
+
+        if progress:
+            progress(count)
+        logger.info(f"已导出 {count} 个项目到 {file_path}")
+        return count
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 项目批量导入业务逻辑
+"""
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+from pydantic import TypeAdapter, ValidationError
+
+from logic.project_logic import ProjectLogic
+from models.project import ProjectCreate
+from utils.decorators import log_operation
+from utils.excel_handler import ExcelImporter
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每批校验的行数
+IMPORT_CHUNK_SIZE = 1000
+
+_PROJECT_LIST = TypeAdapter(List[ProjectCreate])
+
+# 项目字段 -> Excel列名，用于错误报告
+_FIELD_HEADERS = {field: header for header, field in ExcelImporter.COLUMN_FIELDS.items()}
+
+
+class ProjectImportResult:
+    """批量导入结果，记录每一行的处理情况"""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.created_ids: List[int] = []
+        self.skipped: List[Tuple[int, str, str]] = []  # (Excel行号, 项目名称, 原因)
+        self.errors: List[Tuple[int, str, str]] = []  # (Excel行号, 项目名称, 错误信息)
+
+    @property
+    def success_count(self) -> int:
+        return len(self.created_ids)
+
+    def report_rows(self) -> List[Tuple[int, str, str, str]]:
+        """按行号排序的逐行报告：(Excel行号, 项目名称, 结果, 说明)"""
+        rows = [(row, name, '跳过', reason) for row, name, reason in self.skipped]
+        rows.extend((row, name, '失败', message) for row, name, message in self.errors)
+        return sorted(rows)
+
+
+class StagedProjectImport:
+    """已读取并完成类型转换、等待写入数据库的导入数据"""
+
+    def __init__(self, frame: pd.DataFrame, parse_errors: List[Tuple[int, str, str]]):
+        self.frame = frame
+        self.parse_errors = parse_errors
+
+    @property
+    def row_count(self) -> int:
+        return len(self.frame) + len({row for row, _, _ in self.parse_errors})
+
+
+def validate_projects(records: List[Dict[str, Any]]) -> Tuple[List[ProjectCreate], Dict[int, str]]:
+    """
+    批量校验项目数据
+
+    整批交给pydantic一次校验；有错误时按错误位置剔除无效行，其余行再整批校验一次。
+
+    Returns:
+        Tuple[List[ProjectCreate], Dict[int, str]]: 有效项目（保持原顺序），无效行在records中的下标 -> 错误信息
+    """
+    try:
+        return _PROJECT_LIST.validate_python(records), {}
+    except ValidationError as e:
+        invalid: Dict[int, List[str]] = {}
+        for error in e.errors():
+            index, *field = error['loc']
+            header = _FIELD_HEADERS.get(field[0], field[0]) if field else ''
+            invalid.setdefault(index, []).append(f"{header}: {error['msg']}" if header else error['msg'])
+
+    valid = [record for index, record in enumerate(records) if index not in invalid]
+    return _PROJECT_LIST.validate_python(valid), {index: '; '.join(messages) for index, messages in invalid.items()}
+
+
+class ProjectImportLogic:
+    """项目批量导入业务逻辑
+
+    导入分为两步：stage_excel() 读取Excel并按列转换类型；import_staged() 分批校验后，
+    交给ProjectLogic.create_projects_bulk()查重并多行插入，写入失败则整体回滚。
+    """
+
+    def __init__(self):
+        self.project_logic = ProjectLogic()
+
+    @staticmethod
+    def stage_excel(file_path: str) -> StagedProjectImport:
+        """读取Excel并转换类型，返回待导入数据"""
+        frame, parse_errors = ExcelImporter.read_projects_frame(file_path)
+        return StagedProjectImport(frame, parse_errors)
+
+    @log_operation("批量导入项目")
+    def import_staged(self, staged: StagedProjectImport,
+                      chunk_size: int = IMPORT_CHUNK_SIZE) -> ProjectImportResult:
+        """
+        导入已读取的项目数据，名称已存在或在文件中重复的项目跳过
+
+        Args:
+            staged: stage_excel()的返回值
+            chunk_size: 每批校验的行数
+
+        Returns:
+            ProjectImportResult: 导入结果
+
+        Raises:
+            Exception: 写入数据库失败，已导入的数据全部回滚
+        """
+        frame = staged.frame
+        result = ProjectImportResult(staged.row_count)
+        result.errors.extend(staged.parse_errors)
+
+        # 文件内重复的项目名称只导入第一次出现的行
+        duplicated = frame.duplicated('project_name', keep='first')
+        result.skipped.extend((row, name, '文件中项目名称重复') for row, name in
+                              zip(frame.loc[duplicated, 'row_number'].tolist(),
+                                  frame.loc[duplicated, 'project_name'].tolist()))
+        frame = frame[~duplicated]
+
+        fields = ProjectCreate.get_field_names()
+        valid: List[Tuple[int, ProjectCreate]] = []
+        for start in range(0, len(frame), max(1, chunk_size)):
+            valid.extend(self._validate_chunk(frame.iloc[start:start + chunk_size], fields, result))
+        if not valid:
+            return result
+
+        project_ids, skipped = self.project_logic.create_projects_bulk([project for _, project in valid])
+        result.created_ids.extend(project_ids)
+        skipped_ids = {id(project) for project in skipped}
+        result.skipped.extend((row, project.project_name, '项目名称已存在')
+                              for row, project in valid if id(project) in skipped_ids)
+        return result
+
+    @staticmethod
+    def _validate_chunk(chunk: pd.DataFrame, fields: List[str],
+                        result: ProjectImportResult) -> List[Tuple[int, ProjectCreate]]:
+        """校验一批数据，无效行记入result.errors，返回有效项目及其Excel行号"""
+        records = chunk[fields].to_dict('records')
+        rows = chunk['row_number'].tolist()
+        projects, invalid = validate_projects(records)
+        result.errors.extend((rows[index], records[index]['project_name'], message)
+                             for index, message in invalid.items())
+        return list(zip([row for index, row in enumerate(rows) if index not in invalid], projects))
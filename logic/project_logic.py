@@ -3,11 +3,17 @@
 """
 科研项目管理系统 - 项目业务逻辑
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
 
 from data.project_dao import ProjectDAO
+from data.project_stats_dao import ProjectStatsDAO
+from data.reminder_rule_dao import RULE_PROJECT_FIELDS
+from logic.reminder_rule_logic import ReminderRuleLogic
 from models.project import Project, ProjectCreate, ProjectUpdate
 from utils.decorators import validate_model_data, log_operation
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class ProjectLogic:
@@ -15,6 +21,7 @@ class ProjectLogic:
 
     def __init__(self):
         self.project_dao = ProjectDAO()
+        self.project_stats_dao = ProjectStatsDAO()
 
     @validate_model_data(ProjectCreate)
     @log_operation("创建项目")
@@ -32,7 +39,42 @@ class ProjectLogic:
             raise ValueError(f"项目名称 '{project_data.project_name}' 已存在")
 
         # 创建项目
-        return self.project_dao.insert(project_data)
+        project_id = self.project_dao.insert(project_data)
+        if project_id and project_id > 0:
+            self.refresh_rule_reminders([project_id])
+        return project_id
+
+    @log_operation("批量创建项目")
+    def create_projects_bulk(self, projects: List[ProjectCreate]) -> Tuple[List[int], List[ProjectCreate]]:
+        """批量创建项目，名称已存在（或在本批中重复）的项目跳过
+
+        Args:
+            projects: ProjectCreate模型实例列表
+
+        Returns:
+            Tuple[List[int], List[ProjectCreate]]: 新创建的项目ID列表，被跳过的项目列表
+        """
+        existing_names = self.project_dao.get_names_in([project.project_name for project in projects])
+        if existing_names is None:
+            raise ValueError("查询已存在的项目名称失败")
+
+        to_create = []
+        skipped = []
+        for project in projects:
+            if project.project_name in existing_names:
+                skipped.append(project)
+                continue
+            existing_names.add(project.project_name)
+            to_create.append(project)
+
+        if not to_create:
+            return [], skipped
+
+        project_ids = self.project_dao.insert_many(to_create)
+        if project_ids is None:
+            raise ValueError("批量创建项目失败")
+        self.refresh_rule_reminders(project_ids)
+        return project_ids, skipped
 
     @validate_model_data(ProjectUpdate)
     @log_operation("更新项目")
@@ -57,7 +99,10 @@ class ProjectLogic:
                 raise ValueError(f"项目名称 '{project_data.project_name}' 已存在")
 
         # 更新项目
-        return self.project_dao.update(project_id, project_data)
+        success = self.project_dao.update(project_id, project_data)
+        if success and RULE_PROJECT_FIELDS.intersection(project_data.dict(exclude_unset=True, exclude_none=True)):
+            self.refresh_rule_reminders([project_id])
+        return success
 
     @log_operation("删除项目")
     def delete_project(self, project_id: int, operator_id: int = None) -> bool:
@@ -121,6 +166,17 @@ class ProjectLogic:
         """
         return self.project_dao.get_all()
 
+    def iter_all_projects(self, batch_size: int = 500) -> Iterator[List[Project]]:
+        """流式获取所有项目
+
+        Args:
+            batch_size: 每批项目数量
+
+        Returns:
+            Iterator[List[Project]]: 按批产出项目列表的生成器
+        """
+        return self.project_dao.iter_all(batch_size=batch_size)
+
     def search_projects(self, criteria: Dict[str, Any]) -> List[Project]:
         """搜索项目
         
@@ -133,22 +189,27 @@ class ProjectLogic:
         return self.project_dao.search(criteria)
 
     def get_project_statistics(self) -> Dict[str, Any]:
-        """获取项目统计信息
+        """获取项目统计信息（读取统计汇总表）
         
         Returns:
-            Dict[str, Any]: 统计信息
+            Dict[str, Any]: 统计信息，包含total_count、status_count、total_funding
         """
-        all_projects = self.get_all_projects()
-        status_count = self.project_dao.count_by_status()
-
-        # 计算总资金
-        total_funding = sum(float(p.funding_amount) for p in all_projects)
-
-        return {
-            "total_count": len(all_projects),
-            "status_count": status_count,
-            "total_funding": total_funding
-        }
+        statistics = self.project_stats_dao.get_totals()
+        if statistics is None:
+            raise ValueError("获取项目统计信息失败")
+        return statistics
+
+    @log_operation("重建项目统计汇总表")
+    def rebuild_project_statistics(self) -> int:
+        """根据项目表全量重建统计汇总表
+        
+        Returns:
+            int: 重建后的分组数量
+        """
+        groups = self.project_stats_dao.rebuild()
+        if groups is None:
+            raise ValueError("重建项目统计汇总表失败")
+        return groups
 
     def change_project_status(self, project_id: int, status: str) -> bool:
         """更改项目状态
@@ -161,4 +222,18 @@ class ProjectLogic:
             bool: 更改是否成功
         """
         update_data = ProjectUpdate(status=status)
-        return self.project_dao.update(project_id, update_data)
+        success = self.project_dao.update(project_id, update_data)
+        if success:
+            self.refresh_rule_reminders([project_id])
+        return success
+
+    @staticmethod
+    def refresh_rule_reminders(project_ids: List[int]) -> None:
+        """项目新增或日期、状态等字段变更后，重新执行提醒规则
+
+        项目数据已经提交，规则执行失败只记录日志，可运行apply_reminder_rules.py补齐。
+        """
+        try:
+            ReminderRuleLogic().refresh_projects(project_ids)
+        except Exception as e:
+            logger.error(f"执行提醒规则失败: {e}")
@@ -10,7 +10,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from data.project_result_attachment_dao import ProjectResultAttachmentDAO
-from file_server.client import file_server_client
+from file_server.client import file_server_client, get_client
 from models.project_result_attachment import (
     ProjectResultAttachment,
     ProjectResultAttachmentCreate,
@@ -147,16 +147,14 @@ class ProjectResultAttachmentLogic:
         success = self.dao.update(attachment_id, update_data)
 
         if success:
-            # 删除旧文件，使用附件记录中存储的文件服务器信息
+            # 删除旧文件，使用附件记录中存储的文件服务器信息（同一文件服务器共用客户端和HTTP连接）
             try:
-                from file_server.client import FileServerClient
-                # 创建一个临时客户端，使用旧附件记录中的文件服务器信息
-                temp_client = FileServerClient(
-                    host=old_attachment.get('file_server_host', ''),
-                    port=old_attachment.get('file_server_port', ''),
-                    root_dir=old_attachment.get('file_storage_directory', '')
+                client = get_client(
+                    old_attachment.get('file_server_host', ''),
+                    old_attachment.get('file_server_port', ''),
+                    old_attachment.get('file_storage_directory', '')
                 )
-                temp_client.delete_file(old_attachment['file_path'])
+                client.delete_file(old_attachment['file_path'])
             except Exception as e:
                 logger.warning(f"删除旧附件失败: {str(e)}")
                 pass  # 忽略删除旧文件时的错误
@@ -190,14 +188,13 @@ class ProjectResultAttachmentLogic:
         if success:
             # 删除文件，使用附件记录中存储的文件服务器信息
             try:
-                from file_server.client import FileServerClient
-                # 创建一个临时客户端，使用附件记录中的文件服务器信息
-                temp_client = FileServerClient(
-                    host=attachment.get('file_server_host', ''),
-                    port=attachment.get('file_server_port', ''),
-                    root_dir=attachment.get('file_storage_directory', '')
+                # 使用附件记录中的文件服务器信息，同一文件服务器共用客户端和HTTP连接
+                client = get_client(
+                    attachment.get('file_server_host', ''),
+                    attachment.get('file_server_port', ''),
+                    attachment.get('file_storage_directory', '')
                 )
-                temp_client.delete_file(attachment['file_path'])
+                client.delete_file(attachment['file_path'])
             except Exception as e:
                 logger.warning(f"删除附件文件失败: {str(e)}")
                 pass  # 忽略文件删除错误
@@ -228,16 +225,15 @@ class ProjectResultAttachmentLogic:
 
         if success:
             # 删除文件，使用每个附件记录中存储的文件服务器信息
-            from file_server.client import FileServerClient
             for attachment in attachments:
                 try:
-                    # 为每个附件创建一个临时客户端，使用其存储的文件服务器信息
-                    temp_client = FileServerClient(
-                        host=attachment.get('file_server_host', ''),
-                        port=attachment.get('file_server_port', ''),
-                        root_dir=attachment.get('file_storage_directory', '')
+                    # 同一文件服务器上的附件共用客户端，删除请求复用同一个HTTP连接
+                    client = get_client(
+                        attachment.get('file_server_host', ''),
+                        attachment.get('file_server_port', ''),
+                        attachment.get('file_storage_directory', '')
                     )
-                    temp_client.delete_file(attachment['file_path'])
+                    client.delete_file(attachment['file_path'])
                 except Exception as e:
                     logger.warning(f"删除附件失败: {str(e)}")
                     pass  # 忽略文件删除错误
@@ -259,16 +255,15 @@ class ProjectResultAttachmentLogic:
             return False
 
         try:
-            from file_server.client import FileServerClient
-            # 创建一个临时客户端，使用附件记录中的文件服务器信息
-            temp_client = FileServerClient(
-                host=attachment.get('file_server_host', ''),
-                port=attachment.get('file_server_port', ''),
-                root_dir=attachment.get('file_storage_directory', '')
+            # 使用附件记录中的文件服务器信息，同一文件服务器共用客户端和HTTP连接
+            client = get_client(
+                attachment.get('file_server_host', ''),
+                attachment.get('file_server_port', ''),
+                attachment.get('file_storage_directory', '')
             )
 
-            # 先使用相同的临时客户端检查文件是否存在
-            if not temp_client.check_file_exists(attachment['file_path']):
+            # 先使用相同的客户端检查文件是否存在
+            if not client.check_file_exists(attachment['file_path']):
                 logger.warning(f"附件文件在数据库配置的文件服务器上不存在: {attachment['file_path']}")
 
                 # 使用当前系统配置的文件服务再试一次
@@ -283,7 +278,7 @@ class ProjectResultAttachmentLogic:
                     return False
 
             # 文件存在，执行下载
-            success, error = temp_client.download_file(attachment['file_path'], save_dir)
+            success, error = client.download_file(attachment['file_path'], save_dir)
             return success
         except Exception as e:
             logger.error(f"下载附件失败: {str(e)}")
@@ -303,14 +298,13 @@ class ProjectResultAttachmentLogic:
             return False
 
         try:
-            from file_server.client import FileServerClient
-            # 创建一个临时客户端，使用附件记录中的文件服务器信息
-            temp_client = FileServerClient(
-                host=attachment.get('file_server_host', ''),
-                port=attachment.get('file_server_port', ''),
-                root_dir=attachment.get('file_storage_directory', '')
+            # 使用附件记录中的文件服务器信息，同一文件服务器共用客户端和HTTP连接
+            client = get_client(
+                attachment.get('file_server_host', ''),
+                attachment.get('file_server_port', ''),
+                attachment.get('file_storage_directory', '')
             )
-            return temp_client.check_file_exists(attachment['file_path'])
+            return client.check_file_exists(attachment['file_path'])
         except Exception as e:
             logger.error(f"检查附件存在失败: {str(e)}")
             return False
@@ -6,6 +6,7 @@
 """
 from typing import List, Optional, Dict, Any
 
+from data.db_connection import transaction
 from data.project_result_dao import ProjectResultDAO
 from models.project_result import ProjectResult, ProjectResultCreate, ProjectResultUpdate
 from utils.decorators import validate_model_data, log_operation
@@ -106,26 +107,30 @@ class ProjectResultLogic:
         Returns:
             List[Dict[str, Any]]: 成功创建的项目成果列表，包含id和原始数据
         """
-        # 先删除该项目的所有成果
-        self.project_result_dao.delete_by_project_id(project_id)
-
-        # 创建新的成果
-        saved_results = []
+        # 先校验全部成果数据，无效数据记录日志后跳过
+        valid_results = []
+        create_models = []
         for result_data in results_data:
             # 确保包含project_id
             result_data['project_id'] = project_id
-
             try:
-                # 创建成果
-                create_data = ProjectResultCreate(**result_data)
-                result_id = self.create_project_result(create_data)
-                if result_id > 0:
-                    # 将新创建的成果ID添加到结果数据中
-                    result_data['id'] = result_id
-                    saved_results.append(result_data)
-                else:
-                    logger.error(f"创建项目成果失败，ID返回0或负数: {result_data.get('name')}")
+                create_models.append(ProjectResultCreate(**result_data))
+                valid_results.append(result_data)
             except Exception as e:
                 logger.error(f"创建项目成果失败: {e}")
 
+        # 删除旧成果与批量插入新成果在同一事务中完成
+        try:
+            with transaction():
+                self.project_result_dao.delete_by_project_id(project_id)
+                result_ids = self.project_result_dao.insert_many(create_models)
+        except Exception as e:
+            logger.error(f"批量创建项目成果失败: {e}")
+            return []
+
+        saved_results = []
+        for result_data, result_id in zip(valid_results, result_ids):
+            # 将新创建的成果ID添加到结果数据中
+            result_data['id'] = result_id
+            saved_results.append(result_data)
         return saved_results
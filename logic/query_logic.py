@@ -3,37 +3,161 @@
 """
 科研项目管理系统 - 查询业务逻辑
 """
-from pymysql.cursors import Cursor, DictCursor
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from pymysql.cursors import Cursor, DictCursor, SSDictCursor
+
+from data.db_connection import with_db_connection, with_db_stream, compile_row_formatter, get_table_version, \
+    RESULT_FORMAT_NONE
+from data.migrations import FULLTEXT_INDEXES, check_query_plans, get_existing_indexes
+from data.project_stats_dao import ProjectStatsDAO, STATS_DIMENSIONS
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 项目查询返回的字段
+PROJECT_QUERY_COLUMNS = """
+    id, project_name, leader, department, phone, project_source, project_type,
+    start_date, end_date, funding_unit, level, funding_amount, approval_year,
+    project_number, status
+"""
+
+# 分页查询默认每页条数
+DEFAULT_PAGE_SIZE = 100
+
+# 支持全文检索的文本字段
+TEXT_SEARCH_FIELDS = ('project_name', 'leader')
+
+# ngram分词长度（MySQL ngram_token_size默认值），短于该长度的关键词无法走全文索引
+NGRAM_TOKEN_SIZE = 2
+
+# 全文索引不存在时，间隔多久（秒）重新检查一次
+FULLTEXT_RECHECK_INTERVAL = 60
+
+# 已存在全文索引的字段缓存
+_fulltext_state = {'fields': frozenset(), 'checked_at': None}
+
+
+# 查询界面下拉框对应的分面字段
+FACET_FIELDS = ('department', 'funding_unit', 'project_source', 'project_type', 'level', 'status')
+
+# 统计图表的分组维度：维度 -> (SQL分组表达式, 显示名称)
+CHART_DIMENSIONS = {
+    'level': ('level', '项目级别'),
+    'funding_unit': ('funding_unit', '资助单位'),
+    'year': ('YEAR(start_date)', '年份'),
+    'status': ('status', '项目状态'),
+    'department': ('department', '科室'),
+    'project_source': ('project_source', '项目来源'),
+}
+
+# 统计图表的指标：指标 -> (SQL聚合表达式, 显示名称)
+CHART_MEASURES = {
+    'count': ('COUNT(*)', '项目数量'),
+    'funding_sum': ('SUM(funding_amount)', '资助金额'),
+    'funding_avg': ('AVG(funding_amount)', '平均资助金额'),
+}
 
-from data.db_connection import with_db_connection
+# 分面结果缓存的最大条目数（按查询条件缓存）
+FACET_CACHE_SIZE = 32
+
+# 分面结果缓存：查询条件 -> (projects表版本号, 结果)
+_facet_cache = OrderedDict()
+_facet_cache_lock = threading.Lock()
+
+# 可由统计汇总表忽略的日期条件：条件键 -> (日期字段, 是否为下限)
+STATS_DATE_BOUNDS = {
+    'start_date_ge': ('start_date', True),
+    'start_date_le': ('start_date', False),
+    'end_date_ge': ('end_date', True),
+    'end_date_le': ('end_date', False),
+}
+
+# 日期范围缓存：(projects表版本号, {日期字段: (最小值, 最大值)})
+_date_range_cache = {}
+
+
+def _use_fulltext(term):
+    """
+    关键词是否适合用全文索引预筛选
+
+    ngram分词会丢弃包含停用词（a、in等英文单词）的分词，含英文字母的关键词
+    用全文索引可能漏掉结果，因此只对中文、数字等关键词使用全文索引。
+    """
+    return len(term) >= NGRAM_TOKEN_SIZE and not re.search(r'[A-Za-z]', term)
+
+
+def _phrase(term):
+    """转换为BOOLEAN MODE下的短语查询，按分词连续出现匹配"""
+    return '"' + term.replace('"', ' ') + '"'
 
 
 class QueryLogic:
     def __init__(self):
         pass
 
-    @with_db_connection()
-    def query_projects(self, conditions, cursor: DictCursor):
-        """根据条件查询项目"""
-        # 构建SQL查询语句
-        sql = """
-            SELECT
-                id, project_name, leader, department, phone, project_source, project_type,
-                start_date, end_date, funding_unit, level, funding_amount, approval_year,
-                project_number, status
-            FROM projects
-            WHERE 1=1
+    @staticmethod
+    def _get_fulltext_fields(conditions, cursor):
+        """返回本次查询可以使用全文索引的字段，只有包含文本搜索条件时才检查索引"""
+        if not any(conditions.get(field) for field in TEXT_SEARCH_FIELDS):
+            return frozenset()
+        if _fulltext_state['fields']:
+            return _fulltext_state['fields']
+
+        checked_at = _fulltext_state['checked_at']
+        if checked_at is not None and time.monotonic() - checked_at < FULLTEXT_RECHECK_INTERVAL:
+            return frozenset()
+
+        index_names = [FULLTEXT_INDEXES[field] for field in TEXT_SEARCH_FIELDS]
+        existing = get_existing_indexes(cursor, 'projects', index_names)
+        _fulltext_state['fields'] = frozenset(field for field in TEXT_SEARCH_FIELDS
+                                              if FULLTEXT_INDEXES[field] in existing)
+        _fulltext_state['checked_at'] = time.monotonic()
+        return _fulltext_state['fields']
+
+    @staticmethod
+    def _build_text_conditions(conditions, fulltext=frozenset()):
         """
-        params = []
-
-        # 添加查询条件
-        if conditions.get('project_name'):
-            sql += " AND project_name LIKE %s"
-            params.append(f"%{conditions['project_name']}%")
+        构建项目名称、负责人的子串匹配条件
 
-        if conditions.get('leader'):
-            sql += " AND leader LIKE %s"
-            params.append(f"%{conditions['leader']}%")
+        有全文索引时先用 MATCH ... AGAINST 通过索引缩小范围，再用 LIKE 保证子串匹配语义
+        """
+        sql = ""
+        params = []
+        for field in TEXT_SEARCH_FIELDS:
+            value = conditions.get(field)
+            if not value:
+                continue
+            term = value.strip()
+            if field in fulltext and _use_fulltext(term):
+                sql += f" AND MATCH({field}) AGAINST(%s IN BOOLEAN MODE)"
+                params.append(_phrase(term))
+            sql += f" AND {field} LIKE %s"
+            params.append(f"%{value}%")
+        return sql, params
+
+    @staticmethod
+    def _build_relevance_order(conditions, fulltext=frozenset()):
+        """构建按全文检索相关度排序的表达式，没有全文检索条件时返回(None, [])"""
+        terms = []
+        params = []
+        for field in TEXT_SEARCH_FIELDS:
+            value = conditions.get(field)
+            if value and field in fulltext and _use_fulltext(value.strip()):
+                terms.append(f"MATCH({field}) AGAINST(%s IN BOOLEAN MODE)")
+                params.append(_phrase(value.strip()))
+        if not terms:
+            return None, []
+        return " + ".join(terms), params
+
+    @classmethod
+    def _build_project_conditions(cls, conditions, fulltext=frozenset()):
+        """根据查询条件构建项目查询的WHERE子句及参数"""
+        sql, params = cls._build_text_conditions(conditions, fulltext)
+        sql = " WHERE 1=1" + sql
 
         # 处理科室条件
         if conditions.get('department'):
@@ -86,141 +210,299 @@ class QueryLogic:
             sql += " AND approval_year <= %s"
             params.append(conditions['approval_year_le'])
 
-        # 添加排序
-        sql += " ORDER BY start_date DESC"
+        return sql, params
+
+    @classmethod
+    def _build_project_query(cls, conditions, fulltext=frozenset()):
+        """根据查询条件构建项目查询SQL及参数，有全文检索条件时按相关度排序"""
+        where_sql, params = cls._build_project_conditions(conditions, fulltext)
+        relevance_sql, relevance_params = cls._build_relevance_order(conditions, fulltext)
+        if relevance_sql:
+            order_sql = f" ORDER BY ({relevance_sql}) DESC, start_date DESC"
+            params.extend(relevance_params)
+        else:
+            order_sql = " ORDER BY start_date DESC"
+        sql = f"SELECT {PROJECT_QUERY_COLUMNS} FROM projects{where_sql}{order_sql}"
+        return sql, params
+
+    @classmethod
+    def _build_project_page_query(cls, conditions, page_size, after=None, fulltext=frozenset()):
+        """
+        构建键集分页查询SQL及参数，多取一行用于判断是否还有下一页
+
+        键集分页依赖稳定的(start_date, id)排序，全文检索条件只用于筛选，不按相关度排序
+        """
+        where_sql, params = cls._build_project_conditions(conditions, fulltext)
+        if after is not None:
+            # 等价于 (start_date, id) < (after_date, after_id)，拆开写以便使用索引范围扫描
+            after_date, after_id = after
+            where_sql += " AND start_date <= %s AND (start_date < %s OR id < %s)"
+            params.extend([after_date, after_date, after_id])
+
+        sql = f"""
+            SELECT {PROJECT_QUERY_COLUMNS} FROM projects{where_sql}
+            ORDER BY start_date DESC, id DESC
+            LIMIT %s
+        """
+        params.append(page_size + 1)
+        return sql, params
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def query_projects_page(self, conditions, cursor: DictCursor, page_size: int = DEFAULT_PAGE_SIZE, after=None):
+        """
+        按(start_date, id)倒序分页查询项目（键集分页）
+
+        Args:
+            conditions: 查询条件，项目名称、负责人、筛选字段及日期/立项年度范围，见_build_project_conditions
+            page_size: 每页条数
+            after: 上一页返回的next_cursor，None表示第一页
 
+        Returns:
+            dict: rows为本页项目（字段见PROJECT_QUERY_COLUMNS），next_cursor为下一页游标，没有下一页时为None
+        """
+        fulltext = self._get_fulltext_fields(conditions, cursor)
+        sql, params = self._build_project_page_query(conditions, page_size, after, fulltext)
         cursor.execute(sql, params)
-        result = cursor.fetchall()
-        return result if result is not None else []
-
-    @with_db_connection(cursor_type=Cursor)
-    def get_all_funding_units(self, cursor: Cursor):
-        """获取所有资助单位"""
-
-        sql = "SELECT DISTINCT funding_unit FROM projects ORDER BY funding_unit"
-        cursor.execute(sql)
-        result = [item[0] for item in cursor.fetchall()]
-        return result if result is not None else []
-
-    @with_db_connection(cursor_type=Cursor)
-    def get_all_departments(self, cursor: Cursor):
-        """获取所有科室"""
-
-        sql = "SELECT DISTINCT department FROM projects ORDER BY department"
-        cursor.execute(sql)
-        result = [item[0] for item in cursor.fetchall()]
-
-        return result if result is not None else []
-
-    @with_db_connection(cursor_type=Cursor)
-    def get_all_project_sources(self, cursor: Cursor):
-        """获取所有项目来源"""
-
-        sql = "SELECT DISTINCT project_source FROM projects ORDER BY project_source"
-        cursor.execute(sql)
-        result = [item[0] for item in cursor.fetchall()]
-        return result if result is not None else []
-
-    @with_db_connection(cursor_type=Cursor)
-    def get_all_project_types(self, cursor: Cursor):
-        """获取所有项目类型"""
-        sql = "SELECT DISTINCT project_type FROM projects ORDER BY project_type"
-        cursor.execute(sql)
-        result = [item[0] for item in cursor.fetchall()]
-        return result if result is not None else []
-
-    @with_db_connection(cursor_type=Cursor)
-    def get_chart_data(self, conditions, chart_type, chart_format, cursor: Cursor):
-        """获取图表数据"""
-        # 根据图表类型构建SQL查询
-        if chart_type == '按级别统计项目数量':
-            sql = """
-                SELECT level, COUNT(*) as count
-                FROM projects
-                WHERE 1=1
-            """
-            group_by = " GROUP BY level ORDER BY level"
-
-        elif chart_type == '按资助单位统计项目数量':
-            sql = """
-                SELECT funding_unit, COUNT(*) as count
-                FROM projects
-                WHERE 1=1
-            """
-            group_by = " GROUP BY funding_unit ORDER BY funding_unit"
-
-        elif chart_type == '按年份统计项目数量':
-            sql = """
-                SELECT YEAR(start_date) as year, COUNT(*) as count
-                FROM projects
-                WHERE 1=1
-            """
-            group_by = " GROUP BY YEAR(start_date) ORDER BY YEAR(start_date)"
-
-        elif chart_type == '按级别统计资助金额':
-            sql = """
-                SELECT level, SUM(funding_amount) as amount
-                FROM projects
-                WHERE 1=1
-            """
-            group_by = " GROUP BY level ORDER BY level"
+        rows = list(cursor.fetchall())
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = (rows[-1]['start_date'], rows[-1]['id'])
 
+        format_row = compile_row_formatter(cursor.description)
+        if format_row:
+            rows = [format_row(row) for row in rows]
+        return {'rows': rows, 'next_cursor': next_cursor}
+
+    @with_db_connection(result_format=RESULT_FORMAT_NONE)
+    def count_projects(self, conditions, cursor: DictCursor, estimate: bool = False) -> int:
+        """
+        统计符合条件的项目数量
+
+        Args:
+            conditions: 查询条件，同query_projects_page
+            estimate: 没有过滤条件时是否使用表统计信息中的估算行数代替COUNT(*)
+
+        Returns:
+            int: 项目数量
+        """
+        fulltext = self._get_fulltext_fields(conditions, cursor)
+        where_sql, params = self._build_project_conditions(conditions, fulltext)
+        if estimate and not params:
+            cursor.execute("""
+                SELECT TABLE_ROWS AS count FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'projects'
+            """)
         else:
-            return {}
+            cursor.execute(f"SELECT COUNT(*) AS count FROM projects{where_sql}", params)
+        result = cursor.fetchone()
+        return int(result['count'] or 0) if result else 0
 
-        # 添加查询条件
+    def get_facets(self, conditions=None):
+        """
+        获取各分面字段的取值及项目数量，一次查询返回全部分面
+
+        每个分面的数量按除该分面自身以外的查询条件统计，因此已选中的下拉框仍能看到其他取值的数量。
+        结果按查询条件缓存，项目数据被修改后自动失效。
+
+        Args:
+            conditions: 查询条件，同query_projects_page，None表示不过滤
+
+        Returns:
+            Dict[str, List[Tuple[str, int]]]: 分面字段 -> [(取值, 项目数量)]，按取值排序；查询失败返回None
+        """
+        conditions = {k: v for k, v in (conditions or {}).items() if v}
+        key = tuple(sorted(conditions.items()))
+        version = get_table_version('projects')
+        with _facet_cache_lock:
+            cached = _facet_cache.get(key)
+            if cached is not None and cached[0] == version:
+                _facet_cache.move_to_end(key)
+                return cached[1]
+
+        facets = self._query_facets(conditions)
+        if facets is None:
+            return None
+
+        with _facet_cache_lock:
+            _facet_cache[key] = (version, facets)
+            _facet_cache.move_to_end(key)
+            while len(_facet_cache) > FACET_CACHE_SIZE:
+                _facet_cache.popitem(last=False)
+        return facets
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def _query_facets(self, conditions, cursor: Cursor):
+        """用一条UNION ALL查询统计所有分面"""
+        fulltext = self._get_fulltext_fields(conditions, cursor)
+        parts = []
         params = []
+        for field in FACET_FIELDS:
+            facet_conditions = {k: v for k, v in conditions.items() if k != field}
+            where_sql, where_params = self._build_project_conditions(facet_conditions, fulltext)
+            parts.append(f"SELECT %s AS facet, {field} AS value, COUNT(*) AS count "
+                         f"FROM projects{where_sql} GROUP BY {field}")
+            params.append(field)
+            params.extend(where_params)
+
+        sql = " UNION ALL ".join(f"({part})" for part in parts) + " ORDER BY facet, value"
+        cursor.execute(sql, params)
 
-        if conditions.get('project_name'):
-            sql += " AND project_name LIKE %s"
-            params.append(f"%{conditions['project_name']}%")
+        facets = {field: [] for field in FACET_FIELDS}
+        for facet, value, count in cursor.fetchall():
+            facets[facet].append((value, count))
+        return facets
 
-        if conditions.get('leader'):
-            sql += " AND leader LIKE %s"
-            params.append(f"%{conditions['leader']}%")
+    def check_query_indexes(self):
+        """
+        用EXPLAIN检查查询界面的常用查询是否使用了索引
 
-        # 处理开始日期条件
-        if conditions.get('start_date_ge'):
-            sql += " AND start_date >= %s"
-            params.append(conditions['start_date_ge'])
-        if conditions.get('start_date_le'):
-            sql += " AND start_date <= %s"
-            params.append(conditions['start_date_le'])
+        表中数据很少时优化器可能直接选择全表扫描，检查结果以实际数据量下为准。
 
-        # 处理结束日期条件
-        if conditions.get('end_date_ge'):
-            sql += " AND end_date >= %s"
-            params.append(conditions['end_date_ge'])
-        if conditions.get('end_date_le'):
-            sql += " AND end_date <= %s"
-            params.append(conditions['end_date_le'])
+        Returns:
+            List[Dict]: 每个查询的检查结果，见data.migrations.check_query_plans
+        """
+        sample = '__explain__'
+        queries = {
+            '项目分页（首页）': self._build_project_page_query({}, DEFAULT_PAGE_SIZE),
+            '项目分页（后续页）': self._build_project_page_query({}, DEFAULT_PAGE_SIZE, after=('2000-01-01', 1)),
+            '按状态查询项目': self._build_project_page_query({'status': sample}, DEFAULT_PAGE_SIZE),
+            '按级别查询项目': self._build_project_page_query({'level': sample}, DEFAULT_PAGE_SIZE),
+            '按科室查询项目': self._build_project_page_query({'department': sample}, DEFAULT_PAGE_SIZE),
+            '按资助单位查询项目': self._build_project_page_query({'funding_unit': sample}, DEFAULT_PAGE_SIZE),
+            '按结束时间查询项目': self._build_project_page_query(
+                {'end_date_ge': '2000-01-01', 'end_date_le': '2000-01-31'}, DEFAULT_PAGE_SIZE),
+            '按项目名称搜索': self._build_project_page_query(
+                {'project_name': '研究'}, DEFAULT_PAGE_SIZE, fulltext=frozenset(TEXT_SEARCH_FIELDS)),
+            '按负责人搜索': self._build_project_page_query(
+                {'leader': '张三'}, DEFAULT_PAGE_SIZE, fulltext=frozenset(TEXT_SEARCH_FIELDS)),
+            '按状态查询提醒': ("SELECT * FROM reminders WHERE status = %s ORDER BY start_date ASC", [sample]),
+            '查询当前需提醒的提醒': ("SELECT * FROM reminders WHERE status = %s AND remind_until >= %s "
+                               "AND start_date <= %s ORDER BY start_date ASC", [sample, '2000-01-01', '2000-01-01']),
+        }
+        return check_query_plans(queries)
+
+    @with_db_stream(cursor_type=SSDictCursor)
+    def iter_projects(self, conditions, cursor: SSDictCursor = None, batch_size: int = 500):
+        """根据条件流式查询项目，逐行产出与query_projects_page的rows格式相同的字典"""
+        fulltext = self._get_fulltext_fields(conditions, cursor)
+        sql, params = self._build_project_query(conditions, fulltext)
+        cursor.execute(sql, params)
+        format_row = compile_row_formatter(cursor.description)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield format_row(row) if format_row else row
+
+    def aggregate_projects(self, conditions, dimension, measure):
+        """
+        按维度分组统计符合条件的项目
 
-        if conditions.get('funding_unit'):
-            sql += " AND funding_unit = %s"
-            params.append(conditions['funding_unit'])
+        分组维度和查询条件都在统计汇总表的维度内时直接读取汇总表，否则在projects表上分组统计。
 
-        if conditions.get('level'):
-            sql += " AND level = %s"
-            params.append(conditions['level'])
+        Args:
+            conditions: 查询条件，同query_projects_page
+            dimension: 分组维度，CHART_DIMENSIONS中的键
+            measure: 统计指标，CHART_MEASURES中的键
 
-        if conditions.get('status'):
-            sql += " AND status = %s"
-            params.append(conditions['status'])
+        Returns:
+            List[Tuple[str, float]]: [(分组取值, 统计值)]，按分组取值排序，空值显示为“未填写”；查询失败返回None
+        """
+        filters = self._stats_filters(conditions, dimension, measure)
+        if filters is not None:
+            groups = ProjectStatsDAO().aggregate(dimension, filters)
+            if groups is not None:
+                return [(self._group_label(key), self._measure_value(measure, count, funding))
+                        for key, count, funding in groups]
+        return self._aggregate_projects_sql(conditions, dimension, measure)
+
+    def can_use_stats(self, conditions, dimension, measure):
+        """分组维度、统计指标和查询条件是否都能由统计汇总表计算；不能时记录原因便于排查"""
+        return self._stats_filters(conditions, dimension, measure) is not None
+
+    def _stats_filters(self, conditions, dimension, measure):
+        """
+        转换为统计汇总表的过滤条件
 
-        # 添加分组和排序
-        sql += group_by
+        汇总表没有日期维度，但覆盖了projects表全部日期范围的日期条件（如查询界面默认的前后十年）
+        不会过滤掉任何项目，可以忽略。
 
-        cursor.execute(sql, params)
-        results = cursor.fetchall()
-
-        # 格式化结果
-        chart_data = {}
-        for result in results:
-            if chart_type in ['按级别统计项目数量', '按资助单位统计项目数量', '按年份统计项目数量']:
-                key = result['level'] if 'level' in result else (
-                    result['funding_unit'] if 'funding_unit' in result else str(result['year']))
-                chart_data[key] = result['count']
-            elif chart_type == '按级别统计资助金额':
-                chart_data[result['level']] = result['amount']
-
-        return chart_data if chart_data is not None else {}
+        Returns:
+            Dict[str, str]: 汇总表过滤条件；不能使用汇总表时返回None
+        """
+        filters = {k: v for k, v in (conditions or {}).items() if v}
+        date_filters = {k: v for k, v in filters.items() if k in STATS_DATE_BOUNDS}
+        if date_filters:
+            date_range = self.get_date_range()
+            for key, value in date_filters.items():
+                column, lower = STATS_DATE_BOUNDS[key]
+                low, high = (date_range or {}).get(column, (None, None))
+                if low is not None and (str(value) <= low if lower else str(value) >= high):
+                    del filters[key]
+        unsupported = set(filters) - set(STATS_DIMENSIONS) - {'approval_year_ge', 'approval_year_le'}
+        if dimension not in STATS_DIMENSIONS or measure not in CHART_MEASURES or unsupported:
+            logger.debug(f"统计未使用汇总表: 维度={dimension}, 指标={measure}, 汇总表不支持的条件={sorted(unsupported)}")
+            return None
+        return filters
+
+    def get_date_range(self):
+        """
+        获取项目开始/结束日期的最小值和最大值，结果在项目数据被修改后自动失效
+
+        Returns:
+            Dict[str, Tuple[str, str]]: 日期字段 -> (最小值, 最大值)，格式yyyy-MM-dd；没有项目或查询失败返回None
+        """
+        version = get_table_version('projects')
+        cached = _date_range_cache.get('projects')
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        date_range = self._query_date_range()
+        if date_range is not None:
+            _date_range_cache['projects'] = (version, date_range)
+        return date_range
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def _query_date_range(self, cursor: Cursor):
+        """MIN/MAX可以直接读取start_date和end_date上的索引"""
+        cursor.execute("SELECT MIN(start_date), MAX(start_date), MIN(end_date), MAX(end_date) FROM projects")
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            return None
+        start_min, start_max, end_min, end_max = (str(value) for value in row)
+        return {'start_date': (start_min, start_max), 'end_date': (end_min, end_max)}
+
+    @staticmethod
+    def _group_label(key):
+        return '未填写' if key is None or key == '' else str(key)
+
+    @staticmethod
+    def _measure_value(measure, count, funding):
+        """由汇总表的项目数量和资助金额计算统计指标"""
+        if measure == 'count':
+            return float(count)
+        if measure == 'funding_sum':
+            return funding
+        return funding / count if count else 0.0
+
+    @with_db_connection(cursor_type=Cursor, result_format=RESULT_FORMAT_NONE)
+    def _aggregate_projects_sql(self, conditions, dimension, measure, cursor: Cursor):
+        """在projects表上按维度分组统计，分组和计算都在数据库中完成"""
+        if dimension not in CHART_DIMENSIONS:
+            raise ValueError(f"不支持的统计维度: {dimension}")
+        if measure not in CHART_MEASURES:
+            raise ValueError(f"不支持的统计指标: {measure}")
+        group_expr = CHART_DIMENSIONS[dimension][0]
+        measure_expr = CHART_MEASURES[measure][0]
+
+        fulltext = self._get_fulltext_fields(conditions, cursor)
+        where_sql, params = self._build_project_conditions(conditions, fulltext)
+        cursor.execute(f"""
+            SELECT {group_expr} AS dimension, {measure_expr} AS value
+            FROM projects{where_sql}
+            GROUP BY {group_expr}
+            ORDER BY {group_expr}
+        """, params)
+        return [(self._group_label(key), float(value or 0)) for key, value in cursor.fetchall()]
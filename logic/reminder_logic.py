@@ -3,13 +3,78 @@
 """
 科研项目管理系统 - 提醒业务逻辑
 """
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Iterator, Union
 
+from pydantic import ValidationError
+
+from data.db_connection import transaction
 from data.project_dao import ProjectDAO
 from data.reminder_dao import ReminderDAO
-from models.reminder import Reminder, ReminderCreate, ReminderUpdate, ReminderStatus, ReminderType
+from models.project import Project
+from models.reminder import Reminder, ReminderCreate, ReminderUpdate, ReminderStatus, ReminderType, ReminderWay
 from utils.decorators import validate_model_data, log_operation
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 提醒变更监听器，提醒被创建、修改、删除或标记已读后调用（可能在后台线程中调用）
+_change_listeners: List[Callable[[], None]] = []
+
+
+def add_reminder_change_listener(listener: Callable[[], None]) -> None:
+    """注册提醒变更监听器"""
+    if listener not in _change_listeners:
+        _change_listeners.append(listener)
+
+
+def remove_reminder_change_listener(listener: Callable[[], None]) -> None:
+    """移除提醒变更监听器"""
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+
+def notify_reminders_changed() -> None:
+    """通知所有监听器提醒数据已变更"""
+    for listener in list(_change_listeners):
+        try:
+            listener()
+        except Exception as e:
+            logger.error(f"提醒变更通知失败: {e}")
+
+
+def compute_reminder_start_date(reminder_type: ReminderType, project: Project,
+                                base_date: Union[date, str, None], days_before: int) -> date:
+    """
+    计算提醒开始日期：基准日期减去提前天数
+
+    基准日期按提醒类型取项目结束日期、项目开始日期或自定义的基准日期。
+    """
+    if reminder_type == ReminderType.PROJECT_END:
+        target = project.end_date
+    elif reminder_type == ReminderType.PROJECT_START:
+        target = project.start_date
+    else:
+        target = base_date
+    if isinstance(target, str):
+        target = datetime.strptime(target, '%Y-%m-%d').date()
+    return target - timedelta(days=days_before)
+
+
+class BulkReminderResult:
+    """批量创建提醒的结果，按项目记录"""
+
+    def __init__(self):
+        self.created: Dict[int, int] = {}  # 项目ID -> 新提醒ID
+        self.errors: Dict[int, str] = {}  # 项目ID -> 错误信息
+
+    @property
+    def success_count(self) -> int:
+        return len(self.created)
+
+    @property
+    def fail_count(self) -> int:
+        return len(self.errors)
 
 
 class ReminderLogic:
@@ -36,21 +101,8 @@ class ReminderLogic:
             raise ValueError(f"项目ID {reminder_data.project_id} 不存在")
 
         # 计算提醒日期
-        if reminder_data.reminder_type == ReminderType.PROJECT_END:
-            end_date = project.end_date
-        elif reminder_data.reminder_type == ReminderType.PROJECT_START:
-            end_date = project.start_date
-        elif reminder_data.reminder_type == ReminderType.CUSTOM:
-            end_date = reminder_data.start_date
-        days_before = reminder_data.days_before
-
-        # 如果end_date是字符串，转换为日期对象
-        if isinstance(end_date, str):
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d')
-        else:
-            end_date_obj = end_date
-
-        reminder_date = end_date_obj - timedelta(days=days_before)
+        reminder_date = compute_reminder_start_date(reminder_data.reminder_type, project,
+                                                    reminder_data.start_date, reminder_data.days_before)
 
         # 设置提醒日期
         reminder_data_dict = reminder_data.dict()
@@ -59,7 +111,70 @@ class ReminderLogic:
 
         # 创建提醒
         updated_reminder_data = ReminderCreate(**reminder_data_dict)
-        return self.reminder_dao.insert(updated_reminder_data)
+        reminder_id = self.reminder_dao.insert(updated_reminder_data)
+        if reminder_id and reminder_id > 0:
+            notify_reminders_changed()
+        return reminder_id
+
+    @log_operation("批量创建提醒")
+    def create_reminders_bulk(self, project_ids: List[int], reminder_type: ReminderType, days_before: int,
+                              reminder_way: ReminderWay = ReminderWay.SYSTEM, content: str = "",
+                              start_date: Union[date, str, None] = None) -> BulkReminderResult:
+        """为多个项目创建相同设置的提醒
+
+        一次IN查询读取所有项目，在内存中计算各项目的提醒开始日期，
+        再在同一个事务中用多行INSERT写入全部提醒。
+
+        Args:
+            project_ids: 项目ID列表
+            reminder_type: 提醒类型
+            days_before: 提前天数
+            reminder_way: 提醒方式
+            content: 提醒内容
+            start_date: 自定义提醒的基准日期
+
+        Returns:
+            BulkReminderResult: 每个项目的创建结果
+
+        Raises:
+            Exception: 写入数据库失败，本次创建的提醒全部回滚
+        """
+        result = BulkReminderResult()
+        project_ids = list(dict.fromkeys(project_ids))
+        projects = self.project_dao.get_by_ids(project_ids)
+        if projects is None:
+            raise ConnectionError("读取项目数据失败")
+
+        reminders = []
+        for project_id in project_ids:
+            project = projects.get(project_id)
+            if project is None:
+                result.errors[project_id] = f"项目ID {project_id} 不存在"
+                continue
+            try:
+                reminder_date = compute_reminder_start_date(reminder_type, project, start_date, days_before)
+                reminders.append(ReminderCreate(
+                    project_id=project_id,
+                    project_name=project.project_name,
+                    reminder_type=reminder_type,
+                    days_before=days_before,
+                    reminder_way=reminder_way,
+                    content=content,
+                    start_date=reminder_date,
+                    status=ReminderStatus.UNREAD,
+                ))
+            except ValidationError as e:
+                result.errors[project_id] = '; '.join(str(error.get('ctx', {}).get('error', error['msg']))
+                                                      for error in e.errors())
+            except (ValueError, TypeError) as e:
+                result.errors[project_id] = str(e)
+
+        if reminders:
+            with transaction():
+                reminder_ids = self.reminder_dao.insert_many(reminders)
+            result.created.update(zip((reminder.project_id for reminder in reminders), reminder_ids))
+            notify_reminders_changed()
+        return result
 
     @validate_model_data(ReminderUpdate)
     @log_operation("更新提醒")
@@ -104,7 +219,10 @@ class ReminderLogic:
 
         # 更新提醒
         updated_reminder_data = ReminderUpdate(**reminder_data_dict)
-        return self.reminder_dao.update(reminder_id, updated_reminder_data)
+        success = self.reminder_dao.update(reminder_id, updated_reminder_data)
+        if success:
+            notify_reminders_changed()
+        return success
 
     @log_operation("删除提醒")
     def delete_reminder(self, reminder_id: int) -> bool:
@@ -124,7 +242,10 @@ class ReminderLogic:
         if not SessionManager.is_admin():
             raise PermissionError("只有管理员才能删除提醒")
 
-        return self.reminder_dao.delete(reminder_id)
+        success = self.reminder_dao.delete(reminder_id)
+        if success:
+            notify_reminders_changed()
+        return success
 
     def get_reminder_by_id(self, reminder_id: int) -> Optional[Reminder]:
         """根据ID获取提醒
@@ -145,6 +266,17 @@ class ReminderLogic:
         """
         return self.reminder_dao.get_all()
 
+    def iter_all_reminders(self, batch_size: int = 500) -> Iterator[List[Reminder]]:
+        """流式获取所有提醒
+
+        Args:
+            batch_size: 每批提醒数量
+
+        Returns:
+            Iterator[List[Reminder]]: 按批产出提醒列表的生成器
+        """
+        return self.reminder_dao.iter_all(batch_size=batch_size)
+
     def get_unread_reminders(self) -> List[Reminder]:
         """获取未读提醒
         
@@ -162,7 +294,32 @@ class ReminderLogic:
         Returns:
             bool: 标记是否成功
         """
-        return self.reminder_dao.mark_as_read(reminder_id)
+        success = self.reminder_dao.mark_as_read(reminder_id)
+        if success:
+            notify_reminders_changed()
+        return success
+
+    def get_active_reminders(self, day: Optional[date] = None) -> List[Reminder]:
+        """获取提醒区间包含指定日期（默认今天）的未读提醒
+
+        Args:
+            day: 日期，默认今天
+
+        Returns:
+            List[Reminder]: 需要提醒的未读提醒列表
+        """
+        return self.reminder_dao.get_active_unread(day or date.today()) or []
+
+    def get_next_start_date(self, after: Optional[date] = None) -> Optional[date]:
+        """获取指定日期（默认今天）之后最早开始提醒的日期
+
+        Args:
+            after: 日期，默认今天
+
+        Returns:
+            Optional[date]: 开始日期，没有待开始的未读提醒时返回None
+        """
+        return self.reminder_dao.get_next_start_date(after or date.today())
 
     def check_due_reminders(self) -> List[Reminder]:
         """检查开始日期提醒
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 提醒规则业务逻辑
+"""
+from typing import List, Optional, Sequence, Tuple
+
+from data.reminder_rule_dao import ReminderRuleDAO
+from logic.reminder_logic import notify_reminders_changed
+from models.reminder_rule import ReminderRule, ReminderRuleCreate, ReminderRuleUpdate
+from utils.decorators import validate_model_data, log_operation
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReminderRuleLogic:
+    """提醒规则业务逻辑类
+
+    规则创建、修改后立即对全部项目执行；项目的日期、状态等字段变更后
+    由ProjectLogic调用refresh_projects()只对变更的项目重新执行。
+    """
+
+    def __init__(self):
+        self.rule_dao = ReminderRuleDAO()
+
+    @validate_model_data(ReminderRuleCreate)
+    @log_operation("创建提醒规则")
+    def create_rule(self, rule_data: ReminderRuleCreate) -> int:
+        """创建提醒规则并为匹配的项目生成提醒
+
+        Args:
+            rule_data: 规则数据，ReminderRuleCreate模型实例
+
+        Returns:
+            int: 新创建的规则ID，失败返回-1
+        """
+        rule_id = self.rule_dao.insert(rule_data)
+        if rule_id and rule_id > 0:
+            self._apply(rule_ids=[rule_id])
+        return rule_id
+
+    @validate_model_data(ReminderRuleUpdate)
+    @log_operation("更新提醒规则")
+    def update_rule(self, rule_id: int, rule_data: ReminderRuleUpdate) -> bool:
+        """更新提醒规则，并按新规则更新它生成的提醒
+
+        Args:
+            rule_id: 规则ID
+            rule_data: 规则更新数据，ReminderRuleUpdate模型实例
+
+        Returns:
+            bool: 更新是否成功
+        """
+        if not self.get_rule_by_id(rule_id):
+            raise ValueError(f"提醒规则ID {rule_id} 不存在")
+
+        success = self.rule_dao.update(rule_id, rule_data)
+        if success:
+            self._apply(rule_ids=[rule_id])
+        return success
+
+    @log_operation("删除提醒规则")
+    def delete_rule(self, rule_id: int) -> bool:
+        """删除提醒规则及其生成的未读提醒
+
+        Args:
+            rule_id: 规则ID
+
+        Returns:
+            bool: 删除是否成功
+
+        Raises:
+            PermissionError: 当前用户无删除权限
+        """
+        from utils.session import SessionManager
+        if not SessionManager.is_admin():
+            raise PermissionError("只有管理员才能删除提醒规则")
+
+        success = self.rule_dao.delete(rule_id)
+        if success:
+            notify_reminders_changed()
+        return success
+
+    def get_rule_by_id(self, rule_id: int) -> Optional[ReminderRule]:
+        """根据ID获取提醒规则"""
+        return self.rule_dao.get_by_id(rule_id)
+
+    def get_all_rules(self) -> List[ReminderRule]:
+        """获取所有提醒规则"""
+        return self.rule_dao.get_all() or []
+
+    @log_operation("执行全部提醒规则")
+    def apply_all_rules(self) -> Tuple[int, int, int]:
+        """对全部项目执行全部规则
+
+        Returns:
+            Tuple[int, int, int]: (删除的过时提醒数, 原地更新的提醒数, 新生成的提醒数)
+        """
+        return self._apply()
+
+    def refresh_projects(self, project_ids: Sequence[int]) -> Tuple[int, int, int]:
+        """项目新增或修改后，只对这些项目重新执行全部规则
+
+        Args:
+            project_ids: 新增或修改的项目ID
+
+        Returns:
+            Tuple[int, int, int]: (删除的过时提醒数, 原地更新的提醒数, 新生成的提醒数)
+        """
+        if not project_ids:
+            return 0, 0, 0
+        return self._apply(project_ids=project_ids)
+
+    def _apply(self, rule_ids: Optional[Sequence[int]] = None,
+               project_ids: Optional[Sequence[int]] = None) -> Tuple[int, int, int]:
+        result = self.rule_dao.apply_rules(rule_ids=rule_ids, project_ids=project_ids)
+        if result is None:
+            raise ValueError("执行提醒规则失败")
+        removed, updated, created = result
+        if removed or updated or created:
+            logger.info(f"提醒规则执行完成，删除过时提醒 {removed} 条，更新提醒 {updated} 条，生成提醒 {created} 条")
+            notify_reminders_changed()
+        return removed, updated, created
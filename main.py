@@ -13,6 +13,8 @@ from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QApplication
 
 from config.settings import ICON_PATH, QSS_PATH
+from data.migrations import migrate
+from file_server.client import close_sessions
 from file_server.start_server import start_file_server
 from logic.auto_reminder import auto_reminder
 from ui.login_dialog import LoginDialog
@@ -37,6 +39,8 @@ def main():
     app = QApplication(sys.argv)
     app.setAttribute(Qt.AA_EnableHighDpiScaling)  # 启用高DPI缩放
     app.setAttribute(Qt.AA_UseHighDpiPixmaps)  # 启用高DPI图标
+    # 退出时关闭文件服务器客户端的HTTP会话，释放保持的连接
+    app.aboutToQuit.connect(close_sessions)
 
     # 设置应用程序图标（任务栏图标）
     if os.path.exists(ICON_PATH):
@@ -56,6 +60,9 @@ def main():
 
         # 如果不是隐藏管理员，执行数据初始化和启动服务
         if not is_hidden_admin:
+            # 升级数据库结构到最新版本
+            if not migrate():
+                logger.error("数据库迁移失败，部分查询可能较慢")
             # 启动文件服务器
             try:
                 start_file_server()
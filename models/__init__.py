@@ -10,4 +10,5 @@ from .project import Project, ProjectCreate, ProjectUpdate
 from .project_result import ProjectResult, ProjectResultCreate, ProjectResultUpdate
 from .project_result_attachment import ProjectResultAttachment, ProjectResultAttachmentCreate
 from .reminder import Reminder, ReminderCreate, ReminderUpdate, ReminderType, ReminderStatus, ReminderWay
+from .reminder_rule import ReminderRule, ReminderRuleCreate, ReminderRuleUpdate
 from .user import User, UserCreate, UserUpdate, UserLogin, UserRole, UserStatus
@@ -114,6 +114,7 @@ class Reminder(ReminderBase):
     """提醒完整模型"""
     id: int = Field(..., description="提醒ID")
     create_time: datetime = Field(..., description="创建时间")
+    rule_id: Optional[int] = Field(None, description="生成提醒的规则ID，手动创建的提醒为空")
 
     class Config:
         orm_mode = True
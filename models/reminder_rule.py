@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+科研项目管理系统 - 提醒规则数据模型
+"""
+from datetime import datetime
+from typing import Optional, List
+
+from pydantic import Field, validator
+
+from models.base import BaseDataModel
+from models.reminder import ReminderType, ReminderWay
+
+
+class ReminderRuleBase(BaseDataModel):
+    """提醒规则基础模型
+
+    规则为满足筛选条件的项目自动生成提醒：在项目开始/结束日期前days_before天开始提醒。
+    筛选条件为空表示不限。
+    """
+    name: str = Field(..., description="规则名称", max_length=100)
+    reminder_type: ReminderType = Field(..., description="提醒类型")
+    days_before: int = Field(0, description="提前天数", ge=0)
+    reminder_way: ReminderWay = Field(ReminderWay.SYSTEM, description="提醒方式")
+    content: str = Field("", description="提醒内容", max_length=500)
+    project_status: Optional[str] = Field(None, description="项目状态", max_length=20)
+    project_level: Optional[str] = Field(None, description="项目级别", max_length=20)
+    department: Optional[str] = Field(None, description="科室", max_length=50)
+    project_source: Optional[str] = Field(None, description="项目来源", max_length=50)
+    is_active: bool = Field(True, description="是否启用")
+
+    @validator('reminder_type')
+    def validate_reminder_type(cls, v):
+        """规则只能按项目开始或结束日期提醒"""
+        if v == ReminderType.CUSTOM:
+            raise ValueError('提醒规则的提醒类型只能是项目开始或项目结束')
+        return v
+
+    @classmethod
+    def get_field_names(cls) -> List[str]:
+        """获取所有字段名称"""
+        return list(cls.__fields__.keys())
+
+
+class ReminderRuleCreate(ReminderRuleBase):
+    """创建提醒规则模型"""
+    create_time: datetime = Field(default_factory=datetime.now, description="创建时间")
+
+
+class ReminderRuleUpdate(BaseDataModel):
+    """更新提醒规则模型，筛选条件设为空字符串表示不限"""
+    name: Optional[str] = None
+    reminder_type: Optional[ReminderType] = None
+    days_before: Optional[int] = Field(None, ge=0)
+    reminder_way: Optional[ReminderWay] = None
+    content: Optional[str] = None
+    project_status: Optional[str] = None
+    project_level: Optional[str] = None
+    department: Optional[str] = None
+    project_source: Optional[str] = None
+    is_active: Optional[bool] = None
+
+    @validator('reminder_type')
+    def validate_reminder_type(cls, v):
+        """规则只能按项目开始或结束日期提醒"""
+        if v == ReminderType.CUSTOM:
+            raise ValueError('提醒规则的提醒类型只能是项目开始或项目结束')
+        return v
+
+
+class ReminderRule(ReminderRuleBase):
+    """提醒规则完整模型"""
+    id: int = Field(..., description="规则ID")
+    create_time: datetime = Field(..., description="创建时间")
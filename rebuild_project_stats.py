@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 项目统计汇总表重建脚本
+
+直接修改过projects表（如执行help/update_status.py）后，运行本脚本重建统计汇总表。
+"""
+
+import sys
+from pathlib import Path
+
+from utils.logger import get_logger
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from logic.project_logic import ProjectLogic
+
+logger = get_logger(__name__)
+
+
+def rebuild_project_stats():
+    """全量重建项目统计汇总表"""
+    try:
+        logger.info("开始重建项目统计汇总表...")
+        groups = ProjectLogic().rebuild_project_statistics()
+        logger.info(f"项目统计汇总表重建完成，共 {groups} 个分组")
+        return True
+    except Exception as e:
+        logger.error(f"重建项目统计汇总表时出错: {str(e)}")
+        return False
+
+
+if __name__ == "__main__":
+    if not rebuild_project_stats():
+        sys.exit(1)
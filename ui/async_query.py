@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 后台查询执行器
+"""
+import threading
+from typing import Any, Callable, Optional
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 查询线程池的最大线程数，被取消但仍在数据库中执行的查询会占用线程
+QUERY_THREAD_COUNT = 2
+
+
+class QueryCancelled(Exception):
+    """查询已被更新的请求取代"""
+
+
+class _QuerySignals(QObject):
+    """QRunnable不是QObject，需要单独的信号对象把结果投递回界面线程"""
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    progress = pyqtSignal(int, int)
+
+
+class _QueryTask(QRunnable):
+    """在线程池中执行一次查询"""
+
+    def __init__(self, request_id: int, work: Callable[..., Any], with_progress: bool = False):
+        super().__init__()
+        self.request_id = request_id
+        self.work = work
+        self.with_progress = with_progress
+        self.cancel_event = threading.Event()
+        self.signals = _QuerySignals()
+
+    def run(self):
+        if self.cancel_event.is_set():
+            return
+        try:
+            if self.with_progress:
+                result = self.work(self.cancel_event, self.report_progress)
+            else:
+                result = self.work(self.cancel_event)
+        except QueryCancelled:
+            return
+        except Exception as e:
+            logger.error(f"后台查询失败: {str(e)}")
+            if not self.cancel_event.is_set():
+                self.signals.failed.emit(self.request_id, str(e))
+            return
+        if not self.cancel_event.is_set():
+            self.signals.finished.emit(self.request_id, result)
+
+    def report_progress(self, value: int) -> None:
+        if not self.cancel_event.is_set():
+            self.signals.progress.emit(self.request_id, value)
+
+
+class AsyncQueryRunner(QObject):
+    """后台查询执行器
+
+    submit() 在线程池中执行查询函数，并取消之前尚未完成的请求：
+    未开始的请求直接从队列移除，已在执行的请求结果被丢弃。
+    只有最新请求的结果会通过 finished/failed 信号投递回界面线程。
+
+    查询函数接收一个 threading.Event，可在多个步骤之间检查它，
+    或调用 check_cancelled() 提前结束已被取代的查询。
+    以 with_progress=True 提交时，查询函数还会收到一个进度回调，进度通过 progress 信号投递。
+    """
+
+    started = pyqtSignal(int)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(QUERY_THREAD_COUNT)
+        self._latest_id = 0
+        self._current: Optional[_QueryTask] = None
+
+    @property
+    def latest_id(self) -> int:
+        return self._latest_id
+
+    def is_busy(self) -> bool:
+        """最新的请求是否尚未返回结果"""
+        return self._current is not None
+
+    def submit(self, work: Callable[..., Any], with_progress: bool = False) -> int:
+        """
+        提交查询，取消之前的请求
+
+        Args:
+            work: 在后台线程中执行的查询函数，参数为取消事件，返回值通过finished信号投递
+            with_progress: 是否向查询函数传入进度回调（第二个参数）
+
+        Returns:
+            int: 请求ID
+        """
+        self.cancel()
+        self._latest_id += 1
+        task = _QueryTask(self._latest_id, work, with_progress)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.progress.connect(self._on_progress)
+        self._current = task
+        self._pool.start(task)
+        self.started.emit(task.request_id)
+        return task.request_id
+
+    def cancel(self) -> None:
+        """取消当前请求"""
+        task = self._current
+        if task is None:
+            return
+        task.cancel_event.set()
+        try:
+            self._pool.tryTake(task)
+        except RuntimeError:
+            pass  # 任务已执行完毕并被线程池释放
+        self._current = None
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """等待线程池中的查询结束（关闭界面时使用）"""
+        return self._pool.waitForDone(msecs)
+
+    def _take_latest(self, request_id: int) -> bool:
+        if self._current is None or request_id != self._current.request_id:
+            return False
+        self._current = None
+        return True
+
+    def _on_finished(self, request_id: int, result: Any) -> None:
+        if self._take_latest(request_id):
+            self.finished.emit(request_id, result)
+
+    def _on_failed(self, request_id: int, message: str) -> None:
+        if self._take_latest(request_id):
+            self.failed.emit(request_id, message)
+
+    def _on_progress(self, request_id: int, value: int) -> None:
+        if self._current is not None and request_id == self._current.request_id:
+            self.progress.emit(request_id, value)
+
+
+def check_cancelled(cancel_event: threading.Event) -> None:
+    """查询已被取消时抛出QueryCancelled，用于在查询步骤之间提前结束"""
+    if cancel_event.is_set():
+        raise QueryCancelled()
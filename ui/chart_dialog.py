@@ -10,38 +10,62 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                             QComboBox, QTabWidget, QWidget, QPushButton)
+                             QComboBox, QTabWidget, QWidget, QPushButton, QMessageBox)
+
+from logic.query_logic import QueryLogic, CHART_DIMENSIONS, CHART_MEASURES
+from ui.async_query import AsyncQueryRunner
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # 设置中文字体
 plt.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC"]
 
+# 分组较多的维度只显示统计值最大的前几组，其余合并为“其他”
+TOP_GROUPS = {'funding_unit': 5, 'department': 10, 'project_source': 10}
+
+# 可以累加的指标才适合用饼图展示占比
+ADDITIVE_MEASURES = ('count', 'funding_sum')
+
 
 class ChartDialog(QDialog):
-    """图表弹窗类"""
+    """图表弹窗类，统计数据由数据库按查询条件分组汇总得到，统计在后台线程执行"""
 
-    def __init__(self, parent=None, projects_data=None):
+    def __init__(self, parent=None, conditions=None):
         super().__init__(parent)
         self.setWindowTitle('图表显示')
         self.setModal(True)
         self.resize(800, 600)  # 设置弹窗大小
-        self.projects_data = projects_data
+        self.query_logic = QueryLogic()
+        self.conditions = conditions or {}
+        # 切换维度或指标时取消之前的统计，只显示最新一次的结果
+        self.query_runner = AsyncQueryRunner(self)
+        self.query_runner.finished.connect(self.on_aggregate_finished)
+        self.query_runner.failed.connect(self.on_aggregate_failed)
         self.init_ui()
 
     def init_ui(self):
         # 创建主布局
         main_layout = QVBoxLayout(self)
 
-        # 创建图表数据类型选择区域
+        # 创建统计维度和指标选择区域
         chart_type_layout = QHBoxLayout()
-        chart_type_layout.addWidget(QLabel('图表数据类型:'))
-        self.chart_data_combo = QComboBox()
-        self.chart_data_combo.addItems([
-            '按级别统计项目数量', '按资助单位统计项目数量',
-            '按年份统计项目数量', '按级别统计资助金额'
-        ])
-        self.chart_data_combo.currentIndexChanged.connect(self.generate_charts)
-        chart_type_layout.addWidget(self.chart_data_combo)
+        chart_type_layout.addWidget(QLabel('统计维度:'))
+        self.dimension_combo = QComboBox()
+        for dimension, (_, label) in CHART_DIMENSIONS.items():
+            self.dimension_combo.addItem(f'按{label}', dimension)
+        self.dimension_combo.currentIndexChanged.connect(self.generate_charts)
+        chart_type_layout.addWidget(self.dimension_combo)
+
+        chart_type_layout.addWidget(QLabel('统计指标:'))
+        self.measure_combo = QComboBox()
+        for measure, (_, label) in CHART_MEASURES.items():
+            self.measure_combo.addItem(label, measure)
+        self.measure_combo.currentIndexChanged.connect(self.generate_charts)
+        chart_type_layout.addWidget(self.measure_combo)
         chart_type_layout.addStretch()
+        self.status_label = QLabel()
+        chart_type_layout.addWidget(self.status_label)
 
         main_layout.addLayout(chart_type_layout)
 
@@ -85,170 +109,100 @@ class ChartDialog(QDialog):
         self.generate_charts()
 
     def generate_charts(self):
-        """生成图表"""
-        if not self.projects_data:
-            return
-
-        chart_type = self.chart_data_combo.currentText()
-
+        """在后台按当前维度和指标统计，完成后绘制图表"""
+        dimension = self.dimension_combo.currentData()
+        measure = self.measure_combo.currentData()
+        query_logic = self.query_logic
+        conditions = self.conditions
+
+        def work(cancel_event):
+            groups = query_logic.aggregate_projects(conditions, dimension, measure)
+            if groups is None:
+                raise ValueError('获取统计数据失败')
+            return dimension, measure, self.arrange_groups(groups, dimension, measure)
+
+        self.query_runner.submit(work)
+        self.status_label.setText('正在统计...')
+
+    def on_aggregate_finished(self, request_id, result):
+        """后台统计完成（只会收到最新一次请求的结果）"""
+        self.status_label.clear()
+        self.draw_charts(*result)
+
+    def on_aggregate_failed(self, request_id, message):
+        """后台统计失败，显示空图表"""
+        self.status_label.clear()
+        QMessageBox.warning(self, '错误', message)
+        self.draw_charts(self.dimension_combo.currentData(), self.measure_combo.currentData(), [])
+
+    def closeEvent(self, event):
+        """关闭时丢弃尚未返回的统计结果"""
+        self.query_runner.cancel()
+        super().closeEvent(event)
+
+    def draw_charts(self, dimension, measure, groups):
+        """绘制图表"""
         # 清除现有图表
         self.bar_figure.clear()
         self.pie_figure.clear()
         self.line_figure.clear()
 
-        # 根据选择的图表类型生成数据
-        if chart_type == '按级别统计项目数量':
-            self.generate_level_count_charts()
-        elif chart_type == '按资助单位统计项目数量':
-            self.generate_funding_unit_count_charts()
-        elif chart_type == '按年份统计项目数量':
-            self.generate_year_count_charts()
-        elif chart_type == '按级别统计资助金额':
-            self.generate_level_funding_charts()
-
-        # 刷新画布
-        self.bar_canvas.draw()
-        self.pie_canvas.draw()
-        self.line_canvas.draw()
+        dimension_label = CHART_DIMENSIONS[dimension][1]
+        measure_label = CHART_MEASURES[measure][1]
+        title = f'按{dimension_label}统计{measure_label}'
+        labels = [label for label, _ in groups]
+        values = [value for _, value in groups]
 
-    def generate_level_count_charts(self):
-        """按级别统计项目数量"""
-        # 准备数据
-        from utils.dict_utils import dict_utils
-        level_list = dict_utils.get_project_levels()
-        level_counts = {}
-
-        # 初始化所有级别的计数为0
-        for level in level_list:
-            level_counts[level['value']] = 0
-
-        # 统计每个级别的项目数量
-        for project in self.projects_data:
-            level = project['level']
-            if level in level_counts:
-                level_counts[level] += 1
-            else:
-                level_counts['其他'] = level_counts.get('其他', 0) + 1
-
-        # 绘制柱状图
+        # 柱状图适用于所有统计
         ax_bar = self.bar_figure.add_subplot(111)
-        levels = list(level_counts.keys())
-        counts = list(level_counts.values())
-        ax_bar.bar(levels, counts)
-        ax_bar.set_title('按级别统计项目数量')
-        ax_bar.set_xlabel('项目级别')
-        ax_bar.set_ylabel('项目数量')
+        ax_bar.bar(labels, values)
+        ax_bar.set_title(title)
+        ax_bar.set_xlabel(dimension_label)
+        ax_bar.set_ylabel(measure_label)
         ax_bar.tick_params(axis='x', rotation=45)
 
-        # 绘制饼图
-        ax_pie = self.pie_figure.add_subplot(111)
-        ax_pie.pie(counts, labels=levels, autopct='%1.1f%%')
-        ax_pie.set_title('项目级别分布')
-
-    def generate_funding_unit_count_charts(self):
-        """按资助单位统计项目数量"""
-        # 准备数据
-        unit_counts = {}
-        for project in self.projects_data:
-            unit = project['funding_unit']
-            if unit in unit_counts:
-                unit_counts[unit] += 1
-            else:
-                unit_counts[unit] = 1
-
-        # 限制显示的单位数量，避免图表过于拥挤
-        if len(unit_counts) > 5:
-            # 取前5个，其余合并为'其他'
-            sorted_units = sorted(unit_counts.items(), key=lambda x: x[1], reverse=True)
-            top_units = sorted_units[:5]
-            other_count = sum(item[1] for item in sorted_units[5:])
-            unit_counts = dict(top_units)
-            unit_counts['其他'] = other_count
-
-        # 绘制柱状图
-        ax_bar = self.bar_figure.add_subplot(111)
-        units = list(unit_counts.keys())
-        counts = list(unit_counts.values())
-        ax_bar.bar(units, counts)
-        ax_bar.set_title('按资助单位统计项目数量')
-        ax_bar.set_xlabel('资助单位')
-        ax_bar.set_ylabel('项目数量')
-        ax_bar.tick_params(axis='x', rotation=45)
+        # 饼图只用于可累加的指标
+        if measure in ADDITIVE_MEASURES and any(values):
+            ax_pie = self.pie_figure.add_subplot(111)
+            ax_pie.pie(values, labels=labels, autopct='%1.1f%%')
+            ax_pie.set_title(f'{measure_label}{dimension_label}分布')
+
+        # 折线图只用于按年份的趋势
+        if dimension == 'year':
+            ax_line = self.line_figure.add_subplot(111)
+            ax_line.plot(labels, values, marker='o')
+            ax_line.set_title(f'{measure_label}年度趋势')
+            ax_line.set_xlabel(dimension_label)
+            ax_line.set_ylabel(measure_label)
+            ax_line.grid(True)
 
-        # 绘制饼图
-        ax_pie = self.pie_figure.add_subplot(111)
-        ax_pie.pie(counts, labels=units, autopct='%1.1f%%')
-        ax_pie.set_title('资助单位分布')
-
-    def generate_year_count_charts(self):
-        """按年份统计项目数量"""
-        # 准备数据
-        year_counts = {}
-        for project in self.projects_data:
-            # 假设start_date格式为'YYYY-MM-DD'
-            year = project['start_date'].split('-')[0]
-            if year in year_counts:
-                year_counts[year] += 1
-            else:
-                year_counts[year] = 1
-
-        # 按年份排序
-        sorted_years = sorted(year_counts.keys())
-        year_counts = {year: year_counts[year] for year in sorted_years}
-
-        # 绘制柱状图
-        ax_bar = self.bar_figure.add_subplot(111)
-        years = list(year_counts.keys())
-        counts = list(year_counts.values())
-        ax_bar.bar(years, counts)
-        ax_bar.set_title('按年份统计项目数量')
-        ax_bar.set_xlabel('年份')
-        ax_bar.set_ylabel('项目数量')
-
-        # 绘制折线图
-        ax_line = self.line_figure.add_subplot(111)
-        ax_line.plot(years, counts, marker='o')
-        ax_line.set_title('项目数量年度趋势')
-        ax_line.set_xlabel('年份')
-        ax_line.set_ylabel('项目数量')
-        ax_line.grid(True)
-
-    def generate_level_funding_charts(self):
-        """按级别统计资助金额"""
-        # 准备数据
-        from utils.dict_utils import dict_utils
-        level_list = dict_utils.get_project_levels()
-        level_funding = {}
-
-        # 初始化所有级别的金额为0
-        for level in level_list:
-            level_funding[level['value']] = 0
-
-        # 统计每个级别的资助金额
-        for project in self.projects_data:
-            level = project['level']
-            try:
-                # 假设funding_amount是字符串，需要转换为浮点数
-                amount = float(project['funding_amount'])
-                if level in level_funding:
-                    level_funding[level] += amount
-                else:
-                    level_funding['其他'] = level_funding.get('其他', 0) + amount
-            except (ValueError, TypeError):
-                # 如果无法转换，跳过
-                continue
-
-        # 绘制柱状图
-        ax_bar = self.bar_figure.add_subplot(111)
-        levels = list(level_funding.keys())
-        funding = list(level_funding.values())
-        ax_bar.bar(levels, funding)
-        ax_bar.set_title('按级别统计资助金额')
-        ax_bar.set_xlabel('项目级别')
-        ax_bar.set_ylabel('资助金额')
-        ax_bar.tick_params(axis='x', rotation=45)
+        # 刷新画布
+        self.bar_canvas.draw()
+        self.pie_canvas.draw()
+        self.line_canvas.draw()
 
-        # 绘制饼图
-        ax_pie = self.pie_figure.add_subplot(111)
-        ax_pie.pie(funding, labels=levels, autopct='%1.1f%%')
-        ax_pie.set_title('资助金额级别分布')
+    @staticmethod
+    def arrange_groups(groups, dimension, measure):
+        """
+        调整分组顺序（只处理分组结果，不涉及项目明细）
+
+        项目级别按数据字典顺序显示，没有项目的级别显示为0，字典外的取值合并为“其他”；
+        分组较多的维度只保留前几组，其余合并为“其他”。
+        """
+        additive = measure in ADDITIVE_MEASURES
+        if dimension == 'level':
+            from utils.dict_utils import dict_utils
+            values = dict(groups)
+            levels = [level['value'] for level in dict_utils.get_project_levels()]
+            arranged = [(level, values.pop(level, 0)) for level in levels]
+            if values and additive:
+                arranged.append(('其他', sum(values.values())))
+            elif values:
+                arranged.extend(values.items())
+            return arranged
+
+        top = TOP_GROUPS.get(dimension)
+        if top and additive and len(groups) > top:
+            groups = sorted(groups, key=lambda group: group[1], reverse=True)
+            return groups[:top] + [('其他', sum(value for _, value in groups[top:]))]
+        return groups
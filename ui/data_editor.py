@@ -13,6 +13,7 @@ from PyQt5.QtWidgets import (
     QTableWidgetItem, QDialog, QDialogButtonBox, QListWidget, QFileDialog, QListWidgetItem
 )
 
+from data.db_connection import transaction
 from logic.project_logic import ProjectLogic
 from logic.project_result_attachment_logic import ProjectResultAttachmentLogic
 from logic.project_result_logic import ProjectResultLogic
@@ -160,14 +161,14 @@ class ResultDialog(QDialog):
             QMessageBox.warning(self, '错误', '附件文件路径不存在')
             return
 
-        # 创建临时文件服务器客户端
-        from file_server.client import FileServerClient
+        # 获取附件所在文件服务器的共享客户端
+        from file_server.client import get_client
         try:
             # 使用附件记录中存储的文件服务器信息
-            temp_client = FileServerClient(
-                host=attachment_data.get('file_server_host'),
-                port=attachment_data.get('file_server_port'),
-                root_dir=attachment_data.get('file_storage_directory')
+            temp_client = get_client(
+                attachment_data.get('file_server_host'),
+                attachment_data.get('file_server_port'),
+                attachment_data.get('file_storage_directory')
             )
 
             # 检查文件是否存在
@@ -787,116 +788,114 @@ class BaseProjectEditor(object):
         # 保存项目信息
         if self.validate_form():
             project_data = self.collect_form_data()
-            success = False
-            project_id = None
-
-            if self.project_id:
-                # 更新项目
-                from models.project import ProjectUpdate
-                project_update = ProjectUpdate(**project_data)
-                success = self.project_logic.update_project(self.project_id, project_update)
-                project_id = self.project_id
-            else:
-                # 新建项目
-                from models.project import ProjectCreate
-                project_create = ProjectCreate(**project_data)
-                project_id = self.project_logic.create_project(project_create)
-                success = project_id > 0
-
-            # 如果项目保存成功，保存项目成果
-            if success and project_id:
-                # 收集当前UI上的成果数据
-                current_results_on_ui = self.collect_result_data()
-
-                # 用于存储已保存的成果，以便后续处理附件
-                processed_results = []
-
-                # 遍历当前UI上的成果数据，区分新增和更新
-                for result_data in current_results_on_ui:
-                    result_id = result_data.get('id')
-                    attachments_to_add = result_data.get('attachments_to_add', [])
-                    attachments_to_delete = result_data.get('attachments_to_delete', [])
-
-                    if result_id:
-                        # 更新现有成果
-                        from models.project_result import ProjectResultUpdate
-                        update_data = ProjectResultUpdate(
-                            type=result_data['type'],
-                            name=result_data['name'],
-                            date=result_data['date']
-                        )
-                        self.project_result_logic.update_project_result(result_id, update_data)
-                        processed_results.append({'id': result_id, **result_data})
+            # 收集当前UI上的成果数据
+            current_results_on_ui = self.collect_result_data()
+            # 新建成果的ID，提交成功后再回填到成果数据中
+            new_result_ids = {}
+
+            try:
+                # 项目及成果记录在同一个事务中保存，任一步失败整体回滚
+                with transaction():
+                    if self.project_id:
+                        # 更新项目
+                        from models.project import ProjectUpdate
+                        project_update = ProjectUpdate(**project_data)
+                        if not self.project_logic.update_project(self.project_id, project_update):
+                            raise ValueError('项目更新失败')
+                        project_id = self.project_id
                     else:
-                        # 创建新成果
-                        from models.project_result import ProjectResultCreate
-                        create_data = ProjectResultCreate(
-                            project_id=project_id,
-                            type=result_data['type'],
-                            name=result_data['name'],
-                            date=result_data['date']
-                        )
-                        new_result_id = self.project_result_logic.create_project_result(create_data)
-                        if new_result_id > 0:
-                            result_data['id'] = new_result_id  # 更新ID以便后续附件处理
-                            processed_results.append({'id': new_result_id, **result_data})
+                        # 新建项目
+                        from models.project import ProjectCreate
+                        project_create = ProjectCreate(**project_data)
+                        project_id = self.project_logic.create_project(project_create)
+                        if not project_id or project_id <= 0:
+                            raise ValueError('项目创建失败')
+
+                    # 遍历当前UI上的成果数据，区分新增和更新
+                    for index, result_data in enumerate(current_results_on_ui):
+                        result_id = result_data.get('id')
+                        if result_id:
+                            # 更新现有成果
+                            from models.project_result import ProjectResultUpdate
+                            update_data = ProjectResultUpdate(
+                                type=result_data['type'],
+                                name=result_data['name'],
+                                date=result_data['date']
+                            )
+                            self.project_result_logic.update_project_result(result_id, update_data)
                         else:
-                            QMessageBox.warning(self.widget, '保存失败', f'创建成果 {result_data["name"]} 失败')
-                            continue
-
-                    # 处理当前成果的附件
-                    # 删除附件
-                    for att_id in attachments_to_delete:
-                        try:
-                            self.attachment_logic.delete_attachment(att_id)
-                        except Exception as e:
-                            logger.warning(f"删除附件失败: {str(e)}")
-                            # 忽略删除错误，继续处理其他附件
-
-                    # 添加附件
-                    for file_path in attachments_to_add:
-                        try:
-                            self.attachment_logic.create_attachment(result_data['id'], file_path)
-                        except PermissionError as e:
-                            # 捕获权限错误并给出用户友好的提示
-                            QMessageBox.critical(self.widget, '保存失败', str(e))
-                            logger.error(f"附件保存权限错误: {str(e)}")
-                            return  # 停止处理，让用户重新操作
-                        except Exception as e:
-                            # 捕获其他异常
-                            QMessageBox.warning(self.widget, '附件保存失败',
-                                                f'文件 {os.path.basename(file_path)} 保存失败：{str(e)}')
-                            logger.error(f"附件保存失败: {str(e)}")
-                            continue  # 继续处理其他附件
-
-                    # 清空已处理的附件列表，防止重复处理或影响其他成果
-                    # 并且更新 self.results_data 中对应成果的附件列表
-                    for i, r in enumerate(self.results_data):
-                        if r.get('id') == result_data['id']:
-                            # 重新加载附件列表，确保是最新的
-                            self.results_data[i]['attachments'] = self.attachment_logic.get_attachments_by_result(
-                                result_data['id'])
-                            self.results_data[i]['attachments_to_add'] = []
-                            self.results_data[i]['attachments_to_delete'] = []
-                            break
-
-                ## 处理删除的成果及其附件
-                if hasattr(self, 'results_to_delete_ids') and self.results_to_delete_ids:
-                    for result_id_to_delete in self.results_to_delete_ids:
-                        # 删除成果的所有附件
-                        self.attachment_logic.delete_result_attachments(result_id_to_delete)
-                        # 删除成果本身
-                        self.project_result_logic.delete_project_result(result_id_to_delete)
-                    self.results_to_delete_ids = []  # 清空列表
-
-                QMessageBox.information(self.widget, '保存成功', '项目信息已成功保存')
-                if hasattr(self, 'on_save_success') and callable(self.on_save_success):
-                    self.on_save_success()
-                # 如果是对话框模式，保存成功后关闭
-                if hasattr(self, 'accept') and callable(self.accept):
-                    self.accept()
-            else:
-                QMessageBox.warning(self.widget, '保存失败', '项目信息保存失败，请重试')
+                            # 创建新成果
+                            from models.project_result import ProjectResultCreate
+                            create_data = ProjectResultCreate(
+                                project_id=project_id,
+                                type=result_data['type'],
+                                name=result_data['name'],
+                                date=result_data['date']
+                            )
+                            new_result_id = self.project_result_logic.create_project_result(create_data)
+                            if not new_result_id or new_result_id <= 0:
+                                raise ValueError(f'创建成果 {result_data["name"]} 失败')
+                            new_result_ids[index] = new_result_id
+            except Exception as e:
+                logger.error(f"保存项目失败: {str(e)}")
+                QMessageBox.warning(self.widget, '保存失败', f'项目信息保存失败，请重试\n{str(e)}')
+                return
+
+            # 事务提交后更新ID以便后续附件处理
+            for index, new_result_id in new_result_ids.items():
+                current_results_on_ui[index]['id'] = new_result_id
+
+            # 附件需要经过文件服务器，在数据库事务之外处理
+            for result_data in current_results_on_ui:
+                attachments_to_add = result_data.get('attachments_to_add', [])
+                attachments_to_delete = result_data.get('attachments_to_delete', [])
+
+                # 删除附件
+                for att_id in attachments_to_delete:
+                    try:
+                        self.attachment_logic.delete_attachment(att_id)
+                    except Exception as e:
+                        logger.warning(f"删除附件失败: {str(e)}")
+                        # 忽略删除错误，继续处理其他附件
+
+                # 添加附件
+                for file_path in attachments_to_add:
+                    try:
+                        self.attachment_logic.create_attachment(result_data['id'], file_path)
+                    except PermissionError as e:
+                        # 捕获权限错误并给出用户友好的提示
+                        QMessageBox.critical(self.widget, '保存失败', str(e))
+                        logger.error(f"附件保存权限错误: {str(e)}")
+                        return  # 停止处理，让用户重新操作
+                    except Exception as e:
+                        # 捕获其他异常
+                        QMessageBox.warning(self.widget, '附件保存失败',
+                                            f'文件 {os.path.basename(file_path)} 保存失败：{str(e)}')
+                        logger.error(f"附件保存失败: {str(e)}")
+                        continue  # 继续处理其他附件
+
+                # 清空已处理的附件列表，防止重复处理或影响其他成果
+                # 并且更新 self.results_data 中对应成果的附件列表
+                if attachments_to_add or attachments_to_delete:
+                    result_data['attachments'] = self.attachment_logic.get_attachments_by_result(result_data['id'])
+                result_data['attachments_to_add'] = []
+                result_data['attachments_to_delete'] = []
+
+            ## 处理删除的成果及其附件
+            if hasattr(self, 'results_to_delete_ids') and self.results_to_delete_ids:
+                for result_id_to_delete in self.results_to_delete_ids:
+                    # 删除成果的所有附件
+                    self.attachment_logic.delete_result_attachments(result_id_to_delete)
+                    # 删除成果本身
+                    self.project_result_logic.delete_project_result(result_id_to_delete)
+                self.results_to_delete_ids = []  # 清空列表
+
+            QMessageBox.information(self.widget, '保存成功', '项目信息已成功保存')
+            if hasattr(self, 'on_save_success') and callable(self.on_save_success):
+                self.on_save_success()
+            # 如果是对话框模式，保存成功后关闭
+            if hasattr(self, 'accept') and callable(self.accept):
+                self.accept()
 
     def accept(self):
         pass
@@ -3,22 +3,25 @@
 """
 科研项目管理系统 - 项目查询界面
 """
-import csv
 import os
 
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import (
     QWidget, QFormLayout, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QDateEdit, QComboBox, QPushButton, QTableWidget, QTableWidgetItem,
-    QGroupBox, QMessageBox, QSplitter, QFileDialog, QHeaderView, QDialog
+    QLineEdit, QDateEdit, QComboBox, QPushButton, QTableView, QAbstractItemView,
+    QGroupBox, QMessageBox, QSplitter, QFileDialog, QHeaderView, QDialog, QProgressBar, QApplication,
+    QProgressDialog
 )
 from matplotlib import pyplot as plt
 
+from logic.project_export_logic import ProjectExportLogic
 from logic.project_logic import ProjectLogic
-from logic.query_logic import QueryLogic
+from logic.query_logic import QueryLogic, DEFAULT_PAGE_SIZE
+from ui.async_query import AsyncQueryRunner, check_cancelled
 from ui.chart_dialog import ChartDialog
 from ui.data_editor import ProjectEditorDialog
+from ui.project_table_model import ProjectTableModel, PROJECT_TABLE_COLUMNS
 from utils.logger import get_logger
 
 # 动态导入其他对话框，避免循环依赖
@@ -34,16 +37,26 @@ class ProjectQuery(QWidget):
         super().__init__()
         self.query_logic = QueryLogic()
         self.project_logic = ProjectLogic()  # 用于项目删除操作
-        self.selected_rows = set()  # 用于存储选中的项目ID
+        # 查询在后台线程执行，只处理最新一次请求的结果
+        self.query_runner = AsyncQueryRunner(self)
+        self.query_runner.finished.connect(self.on_query_finished)
+        self.query_runner.failed.connect(self.on_query_failed)
+        # 导出使用单独的执行器，不会被新的查询取消
+        self.project_export_logic = ProjectExportLogic()
+        self.export_runner = AsyncQueryRunner(self)
+        self.export_runner.progress.connect(self.on_export_progress)
+        self.export_runner.finished.connect(self.on_export_finished)
+        self.export_runner.failed.connect(self.on_export_failed)
+        self.export_progress = None
+        self.export_file_path = ''
         self.init_ui()
-        self.load_project_status()
-        self.load_funding_units()
-        self.load_project_levels()
-        self.load_departments()
-        self.load_project_sources()
-        self.load_project_types()
-        self.select_all = False
+        self.load_facets()
+        self.connect_filter_signals()
         self.sort_order = {}  # 记录每列的排序状态
+        self.page_size = DEFAULT_PAGE_SIZE  # 每次加载的项目数量
+        self.query_conditions = {}  # 当前结果对应的查询条件
+        self.next_cursor = None  # 下一页的键集游标
+        self.total_count = None  # 符合条件的项目总数
 
     def init_ui(self):
         # 创建主布局
@@ -215,24 +228,49 @@ class ProjectQuery(QWidget):
         # 创建结果展示区域
         self.result_splitter = QSplitter(Qt.Vertical)
 
-        # 结果表格
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(10)
-        self.result_table.setHorizontalHeaderLabels([
-            '选择', '项目名称', '负责人', '起始日期', '结束日期', '资助单位', '级别', '资助经费', '状态', '币种'
-        ])
+        # 结果表格，数据由模型按需提供
+        self.result_model = ProjectTableModel(self)
+        self.result_model.fetch_more_handler = self.load_more_projects
+        self.selected_rows = self.result_model.checked_ids  # 与模型共用选中的项目ID集合
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.result_table.verticalHeader().setDefaultSectionSize(24)
         # 设置表头样式
         header = self.result_table.horizontalHeader()
+        header.setStyleSheet("""
+            QHeaderView::section {
+                background-color: #f0f0f0;
+                padding: 5px;
+                border: 1px solid #ddd;
+                font-weight: bold;
+            }
+        """)
         header.setSectionResizeMode(QHeaderView.Stretch)
         header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(len(PROJECT_TABLE_COLUMNS) - 1, QHeaderView.ResizeToContents)
         # 添加双击事件处理
         self.result_table.doubleClicked.connect(self.on_project_double_clicked)
         # 添加表头点击事件处理
         header.sectionClicked.connect(self.on_header_clicked)
-        # 添加单元格点击事件处理
-        self.result_table.itemClicked.connect(self.on_item_clicked)
         self.result_splitter.addWidget(self.result_table)
 
+        # 分页区域：只加载当前可见的一页，按需加载更多
+        page_layout = QHBoxLayout()
+        self.page_info_label = QLabel('')
+        page_layout.addWidget(self.page_info_label)
+        self.query_progress = QProgressBar()
+        self.query_progress.setRange(0, 0)  # 查询耗时未知，显示忙碌状态
+        self.query_progress.setMaximumWidth(150)
+        self.query_progress.setTextVisible(False)
+        self.query_progress.hide()
+        page_layout.addWidget(self.query_progress)
+        page_layout.addStretch()
+        self.load_more_btn = QPushButton('加载更多')
+        self.load_more_btn.clicked.connect(self.load_more_projects)
+        self.load_more_btn.setEnabled(False)
+        page_layout.addWidget(self.load_more_btn)
+
         # 创建功能按钮区域
         action_btn_layout = QHBoxLayout()
 
@@ -259,77 +297,103 @@ class ProjectQuery(QWidget):
         action_btn_layout.addStretch()
 
         main_layout.addWidget(self.result_splitter)
+        main_layout.addLayout(page_layout)
         main_layout.addLayout(action_btn_layout)
 
-    def load_project_status(self):
-        """加载项目状态"""
-        from utils.dict_utils import dict_utils
-        self.status_combo.clear()
-        self.status_combo.addItem('全部')
-        status_list = dict_utils.get_project_status()
-        for status in status_list:
-            self.status_combo.addItem(status['value'])
-
-    def load_funding_units(self):
-        """加载资助单位"""
-        funding_units = self.query_logic.get_all_funding_units()
-        self.funding_unit_combo.clear()
-        self.funding_unit_combo.addItem('全部')
-        self.funding_unit_combo.addItems(funding_units)
-
-    def load_project_levels(self):
-        """加载项目级别"""
-        from utils.dict_utils import dict_utils
-        self.level_combo.clear()
-        self.level_combo.addItem('全部')
-        level_list = dict_utils.get_project_levels()
-        for level in level_list:
-            self.level_combo.addItem(level['value'])
-
-    def load_project_sources(self):
-        """加载项目来源"""
-        from utils.dict_utils import dict_utils
-        self.project_source_combo.clear()
-        self.project_source_combo.addItem('全部')
-        source_list = dict_utils.get_project_sources()
-        for source in source_list:
-            self.project_source_combo.addItem(source['value'])
-
-    def load_project_types(self):
-        """加载项目类型"""
-        from utils.dict_utils import dict_utils
-        self.project_type_combo.clear()
-        self.project_type_combo.addItem('全部')
-        type_list = dict_utils.get_project_types()
-        for type_item in type_list:
-            self.project_type_combo.addItem(type_item['value'])
-
-    def load_departments(self):
-        # 加载科室
-        departments = self.query_logic.get_all_departments()
-        self.department_combo.addItems(departments)
-
-    def load_project_sources(self):
-        # 加载项目来源
-        sources = self.query_logic.get_all_project_sources()
-        self.project_source_combo.addItems(sources)
-
-    def load_project_types(self):
-        # 加载项目类型
-        types = self.query_logic.get_all_project_types()
-        self.project_type_combo.addItems(types)
+    def load_facets(self):
+        """在后台一次查询加载所有筛选下拉框的取值及对应的项目数量"""
+        self.facet_combos = {
+            'department': self.department_combo,
+            'funding_unit': self.funding_unit_combo,
+            'project_source': self.project_source_combo,
+            'project_type': self.project_type_combo,
+            'level': self.level_combo,
+            'status': self.status_combo,
+        }
+        self.facets_loaded = False
+        query_logic = self.query_logic
+
+        def work(cancel_event):
+            from utils.dict_utils import dict_utils
+            # 项目状态、级别按数据字典的顺序显示，其余按项目中已有的取值显示
+            dict_values = {
+                'status': [item['value'] for item in dict_utils.get_project_status()],
+                'level': [item['value'] for item in dict_utils.get_project_levels()],
+            }
+            check_cancelled(cancel_event)
+            return {'kind': 'load_facets', 'facets': query_logic.get_facets(), 'dict_values': dict_values}
+
+        self.query_runner.submit(work)
+
+    def fill_facet_combos(self, facets, dict_values=None):
+        """填充筛选下拉框的取值及项目数量"""
+        dict_values = dict_values or {}
+        for field, combo in self.facet_combos.items():
+            counts = dict(facets.get(field) or [])
+            values = dict_values.get(field, list(counts.keys()))
+            # 重新填充不是查询条件的变化，不触发取消查询
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem('全部', '')
+            for value in values:
+                combo.addItem(self.facet_text(value, counts.get(value, 0)), value)
+            combo.blockSignals(False)
+        self.facets_loaded = True
+
+    def refresh_facet_counts(self, conditions):
+        """按当前查询条件在后台刷新下拉框中显示的项目数量"""
+        query_logic = self.query_logic
+
+        def work(cancel_event):
+            return {'kind': 'facets', 'facets': query_logic.get_facets(conditions)}
+
+        self.query_runner.submit(work)
+
+    def apply_facet_counts(self, facets):
+        """更新下拉框中显示的项目数量"""
+        if facets is None:
+            return
+        if not self.facets_loaded:
+            # 首次加载被之后的查询取代时，用该查询的分面结果填充下拉框
+            self.fill_facet_combos(facets)
+            return
+        for field, combo in self.facet_combos.items():
+            counts = dict(facets.get(field) or [])
+            for index in range(1, combo.count()):
+                value = combo.itemData(index)
+                combo.setItemText(index, self.facet_text(value, counts.get(value, 0)))
+
+    def connect_filter_signals(self):
+        """查询条件变化时取消进行中的查询，其结果已与当前条件不符"""
+        for combo in self.facet_combos.values():
+            combo.currentIndexChanged.connect(self.cancel_running_query)
+        for edit in (self.project_name_edit, self.leader_edit):
+            edit.textChanged.connect(self.cancel_running_query)
+        for date_edit in (self.start_date_from, self.start_date_to, self.end_date_from, self.end_date_to,
+                          self.approval_year_from, self.approval_year_to):
+            date_edit.dateChanged.connect(self.cancel_running_query)
+
+    @staticmethod
+    def facet_text(value, count):
+        """下拉框选项文本：取值（项目数量）"""
+        return f'{value} ({count})'
+
+    @staticmethod
+    def combo_value(combo):
+        """下拉框当前选中的取值，“全部”返回空字符串"""
+        return combo.currentData() or ''
 
     def collect_query_conditions(self):
         # 收集查询条件
         conditions = {
             'project_name': self.project_name_edit.text(),
             'leader': self.leader_edit.text(),
-            'department': self.department_combo.currentText() if self.department_combo.currentText() != '全部' else '',
-            'project_source': self.project_source_combo.currentText() if self.project_source_combo.currentText() != '全部' else '',
-            'project_type': self.project_type_combo.currentText() if self.project_type_combo.currentText() != '全部' else '',
-            'funding_unit': self.funding_unit_combo.currentText() if self.funding_unit_combo.currentText() != '全部' else '',
-            'level': self.level_combo.currentText() if self.level_combo.currentText() != '全部' else '',
-            'status': self.status_combo.currentText() if self.status_combo.currentText() != '全部' else ''
+            'department': self.combo_value(self.department_combo),
+            'project_source': self.combo_value(self.project_source_combo),
+            'project_type': self.combo_value(self.project_type_combo),
+            'funding_unit': self.combo_value(self.funding_unit_combo),
+            'level': self.combo_value(self.level_combo),
+            'status': self.combo_value(self.status_combo)
         }
 
         # 处理开始日期范围 (项目在该时间范围内开始)
@@ -370,98 +434,122 @@ class ProjectQuery(QWidget):
 
         return conditions
 
+    @property
+    def projects_data(self):
+        """已加载的查询结果（由表格模型持有）"""
+        return self.result_model.projects
+
     def query_projects(self):
-        # 查询项目
+        # 在后台查询项目，只取第一页，总数和下拉框计数一并统计
         conditions = self.collect_query_conditions()
-        projects = self.query_logic.query_projects(conditions)
-        self.display_query_results(projects)
+        query_logic = self.query_logic
+        page_size = self.page_size
+
+        def work(cancel_event):
+            page = query_logic.query_projects_page(conditions, page_size=page_size)
+            if page is None:
+                raise ValueError('查询项目失败')
+            check_cancelled(cancel_event)
+            total_count = query_logic.count_projects(conditions) if page['next_cursor'] else len(page['rows'])
+            check_cancelled(cancel_event)
+            return {
+                'kind': 'query',
+                'conditions': conditions,
+                'page': page,
+                'total_count': total_count,
+                'facets': query_logic.get_facets(conditions),
+            }
 
-    def display_query_results(self, projects):
-        """显示查询结果"""
-        if not projects:
-            QMessageBox.information(self, '提示', '没有找到符合条件的项目')
-            self.result_table.setRowCount(0)
+        self.query_runner.submit(work)
+        self.set_busy(True, '正在查询...')
+
+    def load_more_projects(self):
+        """在后台按键集游标加载下一页查询结果（点击“加载更多”或表格滚动到底部时调用）"""
+        if not self.next_cursor or self.query_runner.is_busy():
             return
+        conditions = self.query_conditions
+        after = self.next_cursor
+        query_logic = self.query_logic
+        page_size = self.page_size
+
+        def work(cancel_event):
+            page = query_logic.query_projects_page(conditions, page_size=page_size, after=after)
+            if page is None:
+                raise ValueError('加载更多项目失败')
+            return {'kind': 'more', 'page': page}
+
+        # 加载完成前停止表格滚动触发的自动加载
+        self.result_model.has_more = False
+        self.query_runner.submit(work)
+        self.set_busy(True, '正在加载...')
+
+    def on_query_finished(self, request_id, result):
+        """后台查询完成（只会收到最新一次请求的结果）"""
+        kind = result['kind']
+        if kind == 'query':
+            page = result['page']
+            self.query_conditions = result['conditions']
+            self.next_cursor = page['next_cursor']
+            self.total_count = result['total_count']
+            self.set_busy(False)
+            self.display_query_results(page['rows'])
+            self.apply_facet_counts(result['facets'])
+        elif kind == 'more':
+            page = result['page']
+            self.next_cursor = page['next_cursor']
+            self.set_busy(False)
+            self.result_model.append_projects(page['rows'], has_more=bool(self.next_cursor))
+        elif kind == 'load_facets':
+            if result['facets'] is not None:
+                self.fill_facet_combos(result['facets'], result['dict_values'])
+        else:
+            self.set_busy(False)
+            self.apply_facet_counts(result['facets'])
+
+    def on_query_failed(self, request_id, message):
+        """后台查询失败"""
+        self.set_busy(False)
+        QMessageBox.warning(self, '错误', message)
+
+    def cancel_running_query(self):
+        """取消进行中的查询"""
+        if self.query_runner.is_busy():
+            self.query_runner.cancel()
+            self.result_model.has_more = bool(self.next_cursor)
+            self.set_busy(False)
+
+    def set_busy(self, busy, text=''):
+        """显示或隐藏查询进度"""
+        self.query_progress.setVisible(busy)
+        if busy:
+            self.page_info_label.setText(text)
+            self.load_more_btn.setEnabled(False)
+        else:
+            self.update_page_info()
 
-        # 清空表格
-        self.result_table.setRowCount(0)
-        self.projects_data = projects  # 保存项目数据
-        self.selected_rows.clear()  # 清空选中行集合
-
-        # 设置列数
-        self.result_table.setColumnCount(14)
-        self.result_table.setHorizontalHeaderLabels([
-            '选择', '项目名称', '负责人', '科室', '项目来源',
-            '项目类型', '项目级别', '资助经费（万元）', '资助单位',
-            '立项年度', '项目编号', '项目开始时间', '项目结束时间',
-            '项目状态'
-        ])
+    def update_page_info(self):
+        """更新分页信息及“加载更多”按钮状态"""
+        loaded = len(self.projects_data)
+        total = self.total_count if self.total_count is not None else loaded
+        self.page_info_label.setText(f'已加载 {loaded} / 共 {total} 条' if loaded else '')
+        self.load_more_btn.setEnabled(bool(self.next_cursor))
 
-        # 设置表头样式
-        header = self.result_table.horizontalHeader()
-        header.setStyleSheet("""
-            QHeaderView::section {
-                background-color: #f0f0f0;
-                padding: 5px;
-                border: 1px solid #ddd;
-                font-weight: bold;
-            }
-        """)
-
-        # 设置表头复选框
-        header_item = QTableWidgetItem()
-        header_item.setCheckState(Qt.Unchecked)
-        header_item.setText('全选')
-        self.result_table.setHorizontalHeaderItem(0, header_item)
-
-        # 填充数据
-        for row, project in enumerate(projects):
-            self.result_table.insertRow(row)
-
-            # 添加复选框
-            check_item = QTableWidgetItem()
-            check_item.setCheckState(Qt.Unchecked)
-            check_item.setData(Qt.UserRole, project.get('id'))
-            self.result_table.setItem(row, 0, check_item)
-
-            # 设置其他列数据
-            self.result_table.setItem(row, 1, QTableWidgetItem(project.get('project_name', '')))
-            self.result_table.setItem(row, 2, QTableWidgetItem(project.get('leader', '')))
-            self.result_table.setItem(row, 3, QTableWidgetItem(project.get('department', '')))
-            self.result_table.setItem(row, 4, QTableWidgetItem(project.get('project_source', '')))
-            self.result_table.setItem(row, 5, QTableWidgetItem(project.get('project_type', '')))
-            self.result_table.setItem(row, 6, QTableWidgetItem(project.get('level', '')))
-            self.result_table.setItem(row, 7, QTableWidgetItem(str(project.get('funding_amount', ''))))
-            self.result_table.setItem(row, 8, QTableWidgetItem(project.get('funding_unit', '')))
-            self.result_table.setItem(row, 9, QTableWidgetItem(project.get('approval_year', '')))
-            self.result_table.setItem(row, 10, QTableWidgetItem(project.get('project_number', '')))
-            self.result_table.setItem(row, 11, QTableWidgetItem(project.get('start_date', '')))
-            self.result_table.setItem(row, 12, QTableWidgetItem(project.get('end_date', '')))
-            self.result_table.setItem(row, 13, QTableWidgetItem(project.get('status', '')))
-
-        # 设置列宽
-        self.result_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.result_table.horizontalHeader().setSectionResizeMode(13, QHeaderView.ResizeToContents)
-        for i in range(1, 13):
-            self.result_table.horizontalHeader().setSectionResizeMode(i, QHeaderView.Stretch)
-
-        # 保存查询结果供图表使用
-        self.projects_data = projects
-        self.selected_rows = set()  # 跟踪选中的行
-        self.select_all = False
+    def display_query_results(self, projects):
+        """显示查询结果"""
+        self.result_model.set_projects(projects or [], has_more=bool(self.next_cursor))
         self.sort_order = {}  # 重置排序状态
-
-        # 连接单元格点击事件以更新选中状态
-        self.result_table.itemClicked.connect(self.on_item_clicked)
+        self.result_table.horizontalHeader().setSortIndicatorShown(False)
+        if not projects:
+            QMessageBox.information(self, '提示', '没有找到符合条件的项目')
 
     def show_chart_dialog(self):
         """显示图表弹窗"""
-        if not hasattr(self, 'projects_data') or not self.projects_data:
+        if not self.projects_data:
             QMessageBox.information(self, '提示', '请先查询项目数据')
             return
 
-        # 创建并显示图表弹窗
-        chart_dialog = ChartDialog(self, self.projects_data)
+        # 统计数据由数据库按当前查询条件分组汇总，无需加载全部结果
+        chart_dialog = ChartDialog(self, self.query_conditions)
         chart_dialog.exec_()
 
     def on_date_quick_changed(self, index, date_type):
@@ -550,220 +638,54 @@ class ProjectQuery(QWidget):
         self.project_source_combo.setCurrentIndex(0)
         self.project_type_combo.setCurrentIndex(0)
 
-        # 清空结果表格
-        self.result_table.setRowCount(0)
+        # 重置分页状态
+        self.query_conditions = {}
+        self.next_cursor = None
 
-        # 清除图表数据
-        if hasattr(self, 'projects_data'):
-            delattr(self, 'projects_data')
+        # 清空结果表格及图表数据
+        self.result_model.set_projects([])
+        self.result_table.horizontalHeader().setSortIndicatorShown(False)
+        self.total_count = None
+        self.update_page_info()
+        self.refresh_facet_counts({})
 
     def on_header_clicked(self, logical_index):
         """表头点击事件处理"""
         if logical_index == 0:  # 复选框列
-            # 获取表头复选框状态
-            header_item = self.result_table.horizontalHeaderItem(0)
-            self.select_all = not self.select_all
-            if self.select_all:
-                check_state = Qt.Checked
-                header_item.setText("取消")
-            else:
-                check_state = Qt.Unchecked
-                header_item.setText("全选")
-
-            # 更新所有行的复选框状态
-            for row in range(self.result_table.rowCount()):
-                item = self.result_table.item(row, 0)
-                item.setCheckState(check_state)
-
-                # 更新选中行集合
-                project_id = item.data(Qt.UserRole)
-                if check_state == Qt.Checked:
-                    self.selected_rows.add(project_id)
-                else:
-                    self.selected_rows.discard(project_id)
+            self.result_model.set_all_checked(not self.result_model.is_all_checked())
         else:
             # 实现排序功能
             self.sort_table_by_column(logical_index)
 
     def sort_table_by_column(self, column):
         """按列排序表格"""
-        if not hasattr(self, 'projects_data') or not self.projects_data:
+        if not self.projects_data:
             return
 
-        # 获取列名
-        header_item = self.result_table.horizontalHeaderItem(column)
-        column_name = header_item.text()
-
         # 切换排序方向
         if column not in self.sort_order:
             self.sort_order[column] = Qt.AscendingOrder
         else:
             self.sort_order[column] = Qt.DescendingOrder if self.sort_order[column] == Qt.AscendingOrder else Qt.AscendingOrder
 
-        # 定义列名到数据字段的映射
-        column_mapping = {
-            1: 'project_name',      # 项目名称
-            2: 'leader',           # 负责人
-            3: 'department',       # 科室
-            4: 'project_source',   # 项目来源
-            5: 'project_type',     # 项目类型
-            6: 'level',            # 项目级别
-            7: 'funding_amount',   # 资助经费
-            8: 'funding_unit',     # 资助单位
-            9: 'approval_year',    # 立项年度
-            10: 'project_number',  # 项目编号
-            11: 'start_date',      # 项目开始时间
-            12: 'end_date',        # 项目结束时间
-            13: 'status'           # 项目状态
-        }
-
-        if column not in column_mapping:
-            return
-
-        field_name = column_mapping[column]
-
         try:
-            # 执行排序
-            sorted_projects = sorted(
-                self.projects_data,
-                key=lambda x: self.get_sort_key(x, field_name),
-                reverse=(self.sort_order[column] == Qt.DescendingOrder)
-            )
-
-            # 重新显示排序后的数据
-            self.display_sorted_results(sorted_projects)
+            # 模型只重排已加载的数据，选中状态按项目ID保存，排序后无需恢复
+            self.result_model.sort(column, self.sort_order[column])
 
             # 更新表头显示排序指示器
-            self.update_sort_indicator(column)
+            header = self.result_table.horizontalHeader()
+            header.setSortIndicatorShown(True)
+            header.setSortIndicator(column, self.sort_order[column])
 
         except Exception as e:
             logger.error(f"排序失败: {str(e)}")
             QMessageBox.warning(self, '排序错误', f'排序失败: {str(e)}')
 
-    def get_sort_key(self, project, field_name):
-        """获取排序键值"""
-        value = project.get(field_name, '')
-        
-        # 处理空值
-        if value is None or value == '':
-            return ''
-
-        # 根据字段类型处理排序值
-        if field_name == 'funding_amount':
-            # 处理资助经费（数值）
-            try:
-                return float(str(value).replace(',', ''))
-            except (ValueError, TypeError):
-                return 0.0
-        elif field_name in ['approval_year']:
-            # 处理年份（数值）
-            try:
-                return int(str(value))
-            except (ValueError, TypeError):
-                return 0
-        elif field_name in ['start_date', 'end_date']:
-            # 处理日期
-            try:
-                return QDate.fromString(str(value), 'yyyy-MM-dd').toString('yyyyMMdd')
-            except:
-                return ''
-        else:
-            # 默认按字符串排序
-            return str(value).lower()
-
-    def display_sorted_results(self, sorted_projects):
-        """显示排序后的结果"""
-        # 清空表格
-        self.result_table.setRowCount(0)
-        
-        # 重新填充排序后的数据
-        for row, project in enumerate(sorted_projects):
-            self.result_table.insertRow(row)
-
-            # 添加复选框
-            check_item = QTableWidgetItem()
-            check_item.setCheckState(Qt.Unchecked)
-            check_item.setData(Qt.UserRole, project.get('id'))
-            self.result_table.setItem(row, 0, check_item)
-
-            # 设置其他列数据
-            self.result_table.setItem(row, 1, QTableWidgetItem(project.get('project_name', '')))
-            self.result_table.setItem(row, 2, QTableWidgetItem(project.get('leader', '')))
-            self.result_table.setItem(row, 3, QTableWidgetItem(project.get('department', '')))
-            self.result_table.setItem(row, 4, QTableWidgetItem(project.get('project_source', '')))
-            self.result_table.setItem(row, 5, QTableWidgetItem(project.get('project_type', '')))
-            self.result_table.setItem(row, 6, QTableWidgetItem(project.get('level', '')))
-            self.result_table.setItem(row, 7, QTableWidgetItem(str(project.get('funding_amount', ''))))
-            self.result_table.setItem(row, 8, QTableWidgetItem(project.get('funding_unit', '')))
-            self.result_table.setItem(row, 9, QTableWidgetItem(project.get('approval_year', '')))
-            self.result_table.setItem(row, 10, QTableWidgetItem(project.get('project_number', '')))
-            self.result_table.setItem(row, 11, QTableWidgetItem(project.get('start_date', '')))
-            self.result_table.setItem(row, 12, QTableWidgetItem(project.get('end_date', '')))
-            self.result_table.setItem(row, 13, QTableWidgetItem(project.get('status', '')))
-
-        # 恢复选中状态
-        self.restore_selection_state()
-
-    def update_sort_indicator(self, column):
-        """更新排序指示器"""
-        # 重置所有列的排序指示器
-        for col in range(1, self.result_table.columnCount()):
-            header_item = self.result_table.horizontalHeaderItem(col)
-            if col == column:
-                if self.sort_order[column] == Qt.AscendingOrder:
-                    header_item.setText(header_item.text().split(' ')[0] + ' ↑')
-                else:
-                    header_item.setText(header_item.text().split(' ')[0] + ' ↓')
-            else:
-                # 恢复原始文本（去掉排序指示器）
-                header_item.setText(header_item.text().split(' ')[0])
-
-    def restore_selection_state(self):
-        """恢复选中状态"""
-        # 根据保存的选中行ID恢复选中状态
-        for row in range(self.result_table.rowCount()):
-            item = self.result_table.item(row, 0)
-            project_id = item.data(Qt.UserRole)
-            if project_id in self.selected_rows:
-                item.setCheckState(Qt.Checked)
-
-    def on_item_clicked(self, item):
-        """单元格点击事件处理"""
-        if item.column() == 0:  # 复选框列
-            # 更新选中行集合
-            project_id = item.data(Qt.UserRole)
-            if item.checkState() == Qt.Checked:
-                self.selected_rows.add(project_id)
-            else:
-                self.selected_rows.discard(project_id)
-
-            # 更新表头复选框状态
-            all_checked = True
-            all_unchecked = True
-            for row in range(self.result_table.rowCount()):
-                if not all_checked and not all_unchecked:
-                    break
-                row_item = self.result_table.item(row, 0)
-                if row_item.checkState() != Qt.Checked:
-                    all_checked = False
-                if row_item.checkState() != Qt.Unchecked:
-                    all_unchecked = False
-
-            header_item = self.result_table.horizontalHeaderItem(0)
-            if all_checked:
-                header_item.setCheckState(Qt.Checked)
-            elif all_unchecked:
-                header_item.setCheckState(Qt.Unchecked)
-            else:
-                header_item.setCheckState(Qt.PartiallyChecked)
-
     def on_project_double_clicked(self, index):
         """双击项目行事件处理"""
-        # 获取选中行
-        row = index.row()
-        # 从保存的项目数据中获取项目ID
-        if hasattr(self, 'projects_data') and 0 <= row < len(self.projects_data):
-            project = self.projects_data[row]
+        # 从模型中获取该行的项目数据
+        project = self.result_model.project_at(index.row())
+        if project:
             project_id = project.get('id')
 
             if project_id:
@@ -793,31 +715,29 @@ class ProjectQuery(QWidget):
         try:
             # 动态导入提醒对话框
             from ui.reminder_dialog import BatchReminderDialog
-            batch_dialog = BatchReminderDialog(project_ids=self.selected_rows)
+            batch_dialog = BatchReminderDialog(project_ids=list(self.selected_rows))
             if batch_dialog.exec_() == QDialog.Accepted:
                 reminder_data = batch_dialog.get_reminder_data()
                 # 调用提醒逻辑批量添加提醒
                 from logic.reminder_logic import ReminderLogic
                 reminder_logic = ReminderLogic()
-                success_count = 0
-                fail_count = 0
-                for project_id in reminder_data['project_ids']:
-                    project = self.project_logic.get_project_by_id(project_id)
-                    if project:
-                        reminder_create_data = {
-                            'project_id': project_id,
-                            'project_name': project.project_name,
-                            'reminder_type': reminder_data['reminder_type'],
-                            'days_before': reminder_data['days_before'],
-                            'reminder_way': reminder_data['reminder_way'],
-                            'content': reminder_data['content'],
-                            'start_date': reminder_data['start_date']  # 添加start_date字段
-                        }
-                        if reminder_logic.create_reminder(reminder_create_data):
-                            success_count += 1
-                        else:
-                            fail_count += 1
-                QMessageBox.information(self, '批量添加结果', f'成功添加{success_count}个提醒，失败{fail_count}个')
+                result = reminder_logic.create_reminders_bulk(
+                    reminder_data['project_ids'],
+                    reminder_data['reminder_type'],
+                    reminder_data['days_before'],
+                    reminder_data['reminder_way'],
+                    reminder_data['content'],
+                    reminder_data['start_date'],
+                )
+                message = f'成功添加{result.success_count}个提醒，失败{result.fail_count}个'
+                if result.errors:
+                    names = {project['id']: project.get('project_name', '') for project in self.projects_data}
+                    details = [f"{names.get(project_id) or project_id}: {error}"
+                               for project_id, error in list(result.errors.items())[:10]]
+                    message += '\n\n' + '\n'.join(details)
+                    if len(result.errors) > len(details):
+                        message += f'\n……等{len(result.errors)}个'
+                QMessageBox.information(self, '批量添加结果', message)
         except Exception as e:
             logger.error(f'打开提醒对话框时出错: {str(e)}')
             QMessageBox.critical(self, '错误', f'打开提醒对话框时出错: {str(e)}')
@@ -852,66 +772,105 @@ class ProjectQuery(QWidget):
                 QMessageBox.critical(self, '错误', f'批量删除项目时出错: {str(e)}')
 
     def export_results(self):
-        """导出查询结果到CSV文件"""
-        if not hasattr(self, 'projects_data') or not self.projects_data:
+        """在后台把查询结果导出到CSV文件（可选gzip压缩）"""
+        if not self.projects_data:
             QMessageBox.information(self, '提示', '没有查询结果可导出')
             return
-        if not self.selected_rows:
-            QMessageBox.warning(self, '提示', '请先选择项目')
+        if self.export_runner.is_busy():
+            QMessageBox.information(self, '提示', '正在导出，请稍候')
+            return
+        scope = self.choose_export_scope()
+        if scope is None:
             return
 
         # 获取保存路径
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, '导出结果', os.path.expanduser('~'), 'CSV文件 (*.csv)'
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, '导出结果', os.path.expanduser('~'), 'CSV文件 (*.csv);;gzip压缩的CSV文件 (*.csv.gz)'
         )
 
         if not file_path:
             return
+        if selected_filter.startswith('gzip') and not file_path.lower().endswith('.gz'):
+            file_path += '.gz'
 
-        try:
-            with open(file_path, 'w', newline='', encoding='utf-8-sig') as csv_file:
-                writer = csv.writer(csv_file)
-                # 写入表头
-                headers = [
-                    '项目名称', '负责人', '科室', '联系电话', '项目来源',
-                    '项目类型', '项目级别', '资助经费（万元）', '资助单位',
-                    '立项年度', '项目编号', '项目开始时间', '项目结束时间', '项目状态'
-                ]
-                writer.writerow(headers)
-
-                # 写入数据
-                for project in self.projects_data:
-                    if project["id"] not in self.selected_rows:
-                        continue
-                    row_data = [
-                        project.get('project_name', ''),
-                        project.get('leader', ''),
-                        project.get('department', ''),
-                        project.get('phone', ''),
-                        project.get('source', ''),
-                        project.get('type', ''),
-                        project.get('level', ''),
-                        project.get('funding_amount', ''),
-                        project.get('funding_unit', ''),
-                        project.get('approval_year', ''),
-                        project.get('project_code', ''),
-                        project.get('start_date', ''),
-                        project.get('end_date', ''),
-                        project.get('status', '')
-                    ]
-                    writer.writerow(row_data)
-
-            QMessageBox.information(self, '成功', f'结果已导出到: {file_path}')
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'导出失败: {str(e)}')
+        export_logic = self.project_export_logic
+        if scope == 'selected':
+            # 选中的项目已在内存中，直接写入
+            projects = [p for p in self.projects_data if p["id"] in self.selected_rows]
+            total = len(projects)
+
+            def work(cancel_event, progress):
+                return export_logic.write_csv(projects, file_path, progress=progress, cancel_event=cancel_event)
+        else:
+            # 全部查询结果由服务端游标流式写入
+            conditions = self.query_conditions
+            total = self.total_count
+
+            def work(cancel_event, progress):
+                return export_logic.export_csv(conditions, file_path, progress=progress, cancel_event=cancel_event)
+
+        self.export_progress = QProgressDialog('正在导出...', '取消', 0, total or 0, self)
+        self.export_progress.setWindowTitle('导出CSV')
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(500)
+        self.export_progress.canceled.connect(self.cancel_export)
+        self.export_file_path = file_path
+        self.export_runner.submit(work, with_progress=True)
+
+    def on_export_progress(self, request_id, count):
+        """更新导出进度"""
+        if self.export_progress is None:
+            return
+        if self.export_progress.maximum():
+            self.export_progress.setValue(min(count, self.export_progress.maximum() - 1))
+        self.export_progress.setLabelText(f'正在导出... 已写入 {count} 条')
+
+    def on_export_finished(self, request_id, count):
+        """导出完成"""
+        self.close_export_progress()
+        QMessageBox.information(self, '成功', f'已导出 {count} 个项目到: {self.export_file_path}')
+
+    def on_export_failed(self, request_id, message):
+        """导出失败"""
+        self.close_export_progress()
+        QMessageBox.critical(self, '错误', f'导出失败: {message}')
+
+    def cancel_export(self):
+        """取消导出，后台任务在下一批数据时停止并删除未写完的文件"""
+        self.export_runner.cancel()
+        self.close_export_progress()
+
+    def close_export_progress(self):
+        if self.export_progress is not None:
+            self.export_progress.canceled.disconnect(self.cancel_export)
+            self.export_progress.close()
+            self.export_progress = None
+
+    def choose_export_scope(self):
+        """选择导出范围：'selected' 选中的项目，'all' 全部查询结果，None 取消"""
+        box = QMessageBox(self)
+        box.setWindowTitle('选择导出范围')
+        total = self.total_count if self.total_count is not None else len(self.projects_data)
+        box.setText(f'已选中 {len(self.selected_rows)} 个项目，查询结果共 {total} 个项目')
+        selected_btn = box.addButton('导出选中项目', QMessageBox.AcceptRole)
+        all_btn = box.addButton('导出全部查询结果', QMessageBox.AcceptRole)
+        box.addButton('取消', QMessageBox.RejectRole)
+        if not self.selected_rows:
+            selected_btn.setEnabled(False)
+        box.exec_()
+        if box.clickedButton() == selected_btn:
+            return 'selected'
+        if box.clickedButton() == all_btn:
+            return 'all'
+        return None
 
     def export_to_excel(self):
         """导出查询结果到Excel文件"""
-        if not hasattr(self, 'projects_data') or not self.projects_data:
+        if not self.projects_data:
             QMessageBox.information(self, '提示', '没有查询结果可导出')
             return
-        if not self.selected_rows:
-            QMessageBox.warning(self, '提示', '请先选择项目')
+        scope = self.choose_export_scope()
+        if scope is None:
             return
 
         # 获取保存路径
@@ -922,19 +881,22 @@ class ProjectQuery(QWidget):
         if not file_path:
             return
 
-        try:
-            from utils.excel_handler import ExcelExporter
-            exporter = ExcelExporter()
+        from utils.excel_handler import ExcelExporter
 
+        if scope == 'selected':
             # 筛选选中的项目数据
-            selected_projects = [p for p in self.projects_data if p["id"] in self.selected_rows]
-
-            success = exporter.export_projects_to_excel(selected_projects, file_path)
+            projects = [p for p in self.projects_data if p["id"] in self.selected_rows]
+        else:
+            # 全部查询结果通过服务端游标逐行读取，不一次性加载到内存
+            projects = self.query_logic.iter_projects(self.query_conditions)
 
-            if success:
-                QMessageBox.information(self, '成功', f'项目数据已导出到: {file_path}')
-            else:
-                QMessageBox.critical(self, '错误', '导出失败')
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            success = ExcelExporter.export_projects_to_excel(projects, file_path)
+        finally:
+            QApplication.restoreOverrideCursor()
 
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'导出失败: {str(e)}')
+        if success:
+            QMessageBox.information(self, '成功', f'项目数据已导出到: {file_path}')
+        else:
+            QMessageBox.critical(self, '错误', '导出失败')
@@ -3,10 +3,13 @@
 """
 科研项目管理系统 - 项目登记界面
 """
+import csv
+import os
+
 from PyQt5.QtWidgets import QLabel, QMessageBox, QPushButton, QFileDialog
 
 from ui.data_editor import ProjectEditor
-from utils.excel_handler import ExcelTemplateGenerator, ExcelImporter
+from utils.excel_handler import ExcelTemplateGenerator
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -24,7 +27,9 @@ class ProjectRegistration(ProjectEditor):
 
         # 初始化项目逻辑
         from logic.project_logic import ProjectLogic
+        from logic.project_import_logic import ProjectImportLogic
         self.project_logic = ProjectLogic()
+        self.project_import_logic = ProjectImportLogic()
 
         # 添加Excel功能按钮
         self.init_excel_buttons()
@@ -111,10 +116,10 @@ class ProjectRegistration(ProjectEditor):
             )
 
             if file_path:
-                # 导入数据
-                projects = ExcelImporter.import_projects_from_excel(file_path)
+                # 读取并转换数据
+                staged = self.project_import_logic.stage_excel(file_path)
 
-                if not projects:
+                if not staged.row_count:
                     QMessageBox.information(
                         self,
                         '提示',
@@ -126,7 +131,7 @@ class ProjectRegistration(ProjectEditor):
                 reply = QMessageBox.question(
                     self,
                     '确认导入',
-                    f'找到 {len(projects)} 个项目信息，\n'
+                    f'找到 {staged.row_count} 个项目信息，\n'
                     f'是否确认导入？\n'
                     f'（已存在项目名称将被跳过）',
                     QMessageBox.Yes | QMessageBox.No,
@@ -134,7 +139,7 @@ class ProjectRegistration(ProjectEditor):
                 )
 
                 if reply == QMessageBox.Yes:
-                    self.import_projects_batch(projects)
+                    self.import_projects_batch(staged)
 
         except Exception as e:
             QMessageBox.warning(
@@ -143,55 +148,55 @@ class ProjectRegistration(ProjectEditor):
                 f'导入Excel时出错：\n{str(e)}'
             )
 
-    def import_projects_batch(self, projects: list):
+    def import_projects_batch(self, staged):
         """批量导入项目"""
         try:
-            from models.project import ProjectCreate
-
-            success_count = 0
-            skip_count = 0
-            error_count = 0
-
-            for project_data in projects:
-                try:
-                    # 检查项目名称是否已存在
-                    if self.project_logic.is_project_name_exists(project_data['project_name']):
-                        skip_count += 1
-                        continue
-
-                    # 创建项目
-                    project_create = ProjectCreate(**project_data)
-                    project_id = self.project_logic.create_project(project_create)
-
-                    if project_id > 0:
-                        success_count += 1
-                    else:
-                        error_count += 1
-
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"导入项目失败: {str(e)}")
-                    continue
-
-            # 显示导入结果
-            message = f'导入完成！\n'
-            message += f'成功：{success_count} 个\n'
-            message += f'跳过：{skip_count} 个（已存在）\n'
-            message += f'失败：{error_count} 个'
-
-            QMessageBox.information(self, '导入结果', message)
-
-            # 如果导入成功，刷新项目列表（如果有）
-            if success_count > 0:
-                # 通知主界面刷新项目列表
-                pass
-
+            result = self.project_import_logic.import_staged(staged)
         except Exception as e:
+            logger.error(f"批量导入项目失败: {str(e)}")
             QMessageBox.warning(
                 self,
                 '批量导入失败',
-                f'批量导入时出错：\n{str(e)}'
+                f'批量导入时出错，已导入的数据已全部撤销：\n{str(e)}'
             )
+            return
+
+        # 显示导入结果
+        message = f'导入完成！\n'
+        message += f'成功：{result.success_count} 个\n'
+        message += f'跳过：{len(result.skipped)} 个\n'
+        message += f'失败：{len(result.errors)} 个'
+
+        report_rows = result.report_rows()
+        if not report_rows:
+            QMessageBox.information(self, '导入结果', message)
+            return
+
+        reply = QMessageBox.question(
+            self,
+            '导入结果',
+            message + '\n\n是否保存逐行处理报告？',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.Yes
+        )
+        if reply == QMessageBox.Yes:
+            self.save_import_report(report_rows)
+
+    def save_import_report(self, report_rows):
+        """保存导入报告到CSV文件"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, '保存导入报告', os.path.expanduser('~/项目导入报告.csv'), 'CSV文件 (*.csv)'
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'w', newline='', encoding='utf-8-sig') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(['Excel行号', '项目名称', '结果', '说明'])
+                writer.writerows(report_rows)
+            QMessageBox.information(self, '成功', f'导入报告已保存到: {file_path}')
+        except Exception as e:
+            QMessageBox.critical(self, '错误', f'保存导入报告失败: {str(e)}')
 
     def save_project(self):
         # 重写保存方法，添加保存成功后的重置表单逻辑
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+科研项目管理系统 - 项目查询结果表格模型
+"""
+from typing import Callable, Dict, List, Optional
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+
+# 表格列：(表头, 项目字段)，第0列为选择列
+PROJECT_TABLE_COLUMNS = [
+    ('选择', 'id'),
+    ('项目名称', 'project_name'),
+    ('负责人', 'leader'),
+    ('科室', 'department'),
+    ('项目来源', 'project_source'),
+    ('项目类型', 'project_type'),
+    ('项目级别', 'level'),
+    ('资助经费（万元）', 'funding_amount'),
+    ('资助单位', 'funding_unit'),
+    ('立项年度', 'approval_year'),
+    ('项目编号', 'project_number'),
+    ('项目开始时间', 'start_date'),
+    ('项目结束时间', 'end_date'),
+    ('项目状态', 'status'),
+]
+
+# 视图每次滚动到底部时向视图追加的行数
+FETCH_BATCH_SIZE = 200
+
+
+class ProjectTableModel(QAbstractTableModel):
+    """项目查询结果表格模型
+
+    数据保存在项目字典列表中，视图只为可见单元格调用data()，不再为每个单元格创建QTableWidgetItem。
+    已加载的数据通过canFetchMore/fetchMore分批暴露给视图；数据全部暴露后，
+    若还有下一页则调用fetch_more_handler从数据库加载。选中状态以项目ID集合保存。
+    按列排序后，之后加载的下一页数据也按同样的顺序插入。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.projects: List[Dict] = []  # 已加载的项目数据
+        self.checked_ids = set()  # 选中的项目ID
+        self.has_more = False  # 数据库中是否还有下一页
+        self.fetch_more_handler: Optional[Callable[[], None]] = None
+        self._visible_count = 0  # 已暴露给视图的行数
+        self._sort_column: Optional[int] = None  # 当前排序列，None表示保持数据库返回的顺序
+        self._sort_order = Qt.AscendingOrder
+
+    def set_projects(self, projects: List[Dict], has_more: bool = False) -> None:
+        """替换全部数据，清空选中状态"""
+        self.beginResetModel()
+        self.projects = list(projects)
+        self.checked_ids.clear()
+        self.has_more = has_more
+        self._visible_count = min(len(self.projects), FETCH_BATCH_SIZE)
+        self._sort_column = None
+        self.endResetModel()
+
+    def append_projects(self, projects: List[Dict], has_more: bool = False) -> None:
+        """追加下一页数据"""
+        self.has_more = has_more
+        if not projects:
+            return
+        self.projects.extend(projects)
+        self._expose_rows(len(projects))
+        if self._sort_column is not None:
+            # 已按列排序时，新加载的行按当前排序插入到相应位置
+            self._sort_projects()
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+
+    def project_at(self, row: int) -> Optional[Dict]:
+        """获取视图中某一行对应的项目"""
+        if 0 <= row < self._visible_count:
+            return self.projects[row]
+        return None
+
+    def is_all_checked(self) -> bool:
+        return bool(self.projects) and len(self.checked_ids) == len(self.projects)
+
+    def set_all_checked(self, checked: bool) -> None:
+        """全选/取消全选已加载的项目"""
+        if checked:
+            self.checked_ids.update(project.get('id') for project in self.projects)
+        else:
+            self.checked_ids.clear()
+        if self._visible_count:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._visible_count - 1, 0), [Qt.CheckStateRole])
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+
+    def _expose_rows(self, count: int) -> None:
+        count = min(count, len(self.projects) - self._visible_count)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._visible_count, self._visible_count + count - 1)
+        self._visible_count += count
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._visible_count
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(PROJECT_TABLE_COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._visible_count < len(self.projects) or (self.has_more and self.fetch_more_handler is not None)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        if self._visible_count < len(self.projects):
+            self._expose_rows(FETCH_BATCH_SIZE)
+        elif self.has_more and self.fetch_more_handler is not None:
+            self.fetch_more_handler()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._visible_count:
+            return QVariant()
+        project = self.projects[index.row()]
+        column = index.column()
+
+        if column == 0:
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if project.get('id') in self.checked_ids else Qt.Unchecked
+            if role == Qt.UserRole:
+                return project.get('id')
+            return QVariant()
+
+        if role == Qt.DisplayRole:
+            value = project.get(PROJECT_TABLE_COLUMNS[column][1])
+            return '' if value is None else str(value)
+        return QVariant()
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != 0 or role != Qt.CheckStateRole:
+            return False
+        project_id = self.projects[index.row()].get('id')
+        if value == Qt.Checked:
+            self.checked_ids.add(project_id)
+        else:
+            self.checked_ids.discard(project_id)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.headerDataChanged.emit(Qt.Horizontal, 0, 0)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal or role != Qt.DisplayRole:
+            return QVariant()
+        if section == 0:
+            return '取消' if self.is_all_checked() else '全选'
+        return PROJECT_TABLE_COLUMNS[section][0]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """按列排序已加载的数据，只重排行顺序，不重建数据"""
+        if column <= 0 or column >= len(PROJECT_TABLE_COLUMNS):
+            return
+        self._sort_column = column
+        self._sort_order = order
+        self._sort_projects()
+
+    def _sort_projects(self) -> None:
+        field_name = PROJECT_TABLE_COLUMNS[self._sort_column][1]
+        self.layoutAboutToBeChanged.emit()
+        self.projects.sort(key=lambda project: self.get_sort_key(project, field_name),
+                           reverse=(self._sort_order == Qt.DescendingOrder))
+        self.layoutChanged.emit()
+
+    @staticmethod
+    def get_sort_key(project, field_name):
+        """获取排序键值，空值排在最前"""
+        value = project.get(field_name, '')
+
+        # 处理空值
+        if value is None or value == '':
+            return 0, ''
+
+        # 根据字段类型处理排序值
+        if field_name == 'funding_amount':
+            # 处理资助经费（数值）
+            try:
+                return 1, float(str(value).replace(',', ''))
+            except (ValueError, TypeError):
+                return 1, 0.0
+        elif field_name == 'approval_year':
+            # 处理年份（数值）
+            try:
+                return 1, int(str(value))
+            except (ValueError, TypeError):
+                return 1, 0
+        else:
+            # 日期为yyyy-MM-dd格式，与其他字段一样按字符串排序
+            return 1, str(value).lower()
@@ -4,7 +4,7 @@ from PyQt5 import QtCore
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QFormLayout, QLineEdit, QPushButton,
     QFileDialog, QGroupBox, QHBoxLayout, QTabWidget,
-    QRadioButton, QLabel, QSpinBox, QMessageBox, QComboBox
+    QRadioButton, QLabel, QSpinBox, QMessageBox, QComboBox, QCheckBox
 )
 
 from config import settings
@@ -111,6 +111,10 @@ class SystemSettings(QWidget):
         file_server_layout.addRow('文件存储目录', self.file_server_dir_edit)
         file_server_layout.addRow('', self.select_file_server_dir_button)
 
+        # 去重存储（本机作为文件服务器时生效）
+        self.file_server_dedup_check = QCheckBox('相同内容的文件只保存一份')
+        file_server_layout.addRow('去重存储', self.file_server_dedup_check)
+
         # 添加提示信息
         hint_label = QLabel('注意：修改文件服务器配置后需要重启应用程序才能生效')
         hint_label.setStyleSheet('color: #888; font-size: 10px;')
@@ -253,7 +257,7 @@ class SystemSettings(QWidget):
         reminder_layout = QVBoxLayout(self.reminder_config_widget)
 
         # 提醒配置说明
-        reminder_info = QLabel("设置系统自动检查提醒的时间间隔")
+        reminder_info = QLabel("设置选择“下次继续提醒”后再次提醒的时间间隔")
         reminder_info.setStyleSheet('color: #666; font-size: 12px; margin-bottom: 10px;')
         reminder_layout.addWidget(reminder_info)
 
@@ -265,9 +269,9 @@ class SystemSettings(QWidget):
         self.reminder_interval_spinbox.setRange(1, 24)  # 1-24小时
         self.reminder_interval_spinbox.setSuffix(' 小时')
         self.reminder_interval_spinbox.setValue(1)  # 默认1小时
-        self.reminder_interval_spinbox.setToolTip('设置系统自动检查提醒的时间间隔')
+        self.reminder_interval_spinbox.setToolTip('设置选择“下次继续提醒”后再次提醒的时间间隔')
 
-        reminder_form_layout.addRow('提醒检查间隔', self.reminder_interval_spinbox)
+        reminder_form_layout.addRow('再次提醒间隔', self.reminder_interval_spinbox)
 
         reminder_group.setLayout(reminder_form_layout)
         reminder_layout.addWidget(reminder_group)
@@ -275,8 +279,8 @@ class SystemSettings(QWidget):
         # 提醒说明
         reminder_desc = QLabel(
             "说明：\n"
-            "• 系统会按照设定的时间间隔自动检查待办提醒\n"
-            "• 当发现有需要提醒的项目时，会自动弹出提醒窗口\n"
+            "• 提醒到达开始日期时会自动弹出提醒窗口\n"
+            "• 选择“下次继续提醒”的提醒会在设定的时间间隔后再次弹出\n"
             "• 修改后立即生效，无需重启应用程序"
         )
         reminder_desc.setStyleSheet('color: #666; font-size: 11px; margin-top: 10px;')
@@ -311,6 +315,7 @@ class SystemSettings(QWidget):
             self.remote_host_edit.setText(str(file_server_config.get('remote_host', '')))
             self.remote_port_edit.setText(str(file_server_config.get('remote_port', 5001)))
             self.file_server_dir_edit.setText(str(file_server_config.get('root_dir', '')))
+            self.file_server_dedup_check.setChecked(bool(file_server_config.get('dedup', False)))
 
             self.toggle_server_mode()
 
@@ -448,6 +453,12 @@ class SystemSettings(QWidget):
                 init_success = init_database()
 
                 if init_success:
+                    # 检查常用查询是否命中索引，结果记录到日志
+                    from logic.query_logic import QueryLogic
+                    for plan in QueryLogic().check_query_indexes():
+                        logger.info(f"查询执行计划检查: {plan['name']} key={plan['key']} "
+                                    f"type={plan['type']} rows={plan['rows']} ok={plan['ok']}")
+
                     from init_data_dict import initialize_data_dict
                     success = initialize_data_dict()
 
@@ -505,7 +516,8 @@ class SystemSettings(QWidget):
                 'port': int(self.local_port_edit.text().strip() or 5001),
                 'remote_host': self.remote_host_edit.text().strip(),
                 'remote_port': int(self.remote_port_edit.text().strip() or 5001),
-                'root_dir': self.file_server_dir_edit.text().strip()
+                'root_dir': self.file_server_dir_edit.text().strip(),
+                'dedup': self.file_server_dedup_check.isChecked()
             }
 
             # 保存配置
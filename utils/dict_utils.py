@@ -4,13 +4,26 @@
 数据字典工具类
 提供从数据字典获取枚举值的方法
 """
+import threading
+import time
 from typing import List, Dict
 
+from data.db_connection import get_table_version
 from logic.data_dict_logic import DataDictLogic
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 缓存的最长有效期（秒），用于发现其他客户端对数据字典的修改
+DICT_CACHE_TTL = 300
 
 
 class DictUtils:
-    """数据字典工具类"""
+    """数据字典工具类
+
+    首次使用时用一次查询预加载所有启用的字典项，之后的查询和校验都在内存中完成。
+    数据字典被修改（data_dicts表版本号变化）或缓存超过DICT_CACHE_TTL后自动重新加载。
+    """
 
     _instance = None
     _logic = None
@@ -19,47 +32,71 @@ class DictUtils:
         if cls._instance is None:
             cls._instance = super(DictUtils, cls).__new__(cls)
             cls._logic = DataDictLogic()
+            cls._instance._lock = threading.Lock()
+            cls._instance._version = None
+            cls._instance._loaded_at = 0.0
+            cls._instance._values_by_type = {}
+            cls._instance._value_index = set()
         return cls._instance
 
+    def _ensure_loaded(self) -> bool:
+        """确保缓存为最新，返回数据字典是否可用"""
+        version = get_table_version('data_dicts')
+        if self._version == version and time.monotonic() - self._loaded_at < DICT_CACHE_TTL:
+            return True
+
+        with self._lock:
+            if self._version == version and time.monotonic() - self._loaded_at < DICT_CACHE_TTL:
+                return True
+
+            items = self._logic.get_all_active_items()
+            if items is None:
+                logger.error("加载数据字典失败")
+                return False
+
+            values_by_type = {}
+            for item in items:
+                values_by_type.setdefault(item.dict_type, []).append(item.dict_value)
+            self._values_by_type = values_by_type
+            self._value_index = {(item.dict_type, item.dict_value) for item in items}
+            self._version = version
+            self._loaded_at = time.monotonic()
+        return True
+
+    def invalidate(self) -> None:
+        """使缓存失效，下次使用时重新加载"""
+        with self._lock:
+            self._version = None
+
+    def _get_values(self, dict_type: str) -> List[Dict[str, str]]:
+        self._ensure_loaded()
+        return [{"value": value} for value in self._values_by_type.get(dict_type, [])]
+
     def get_project_status(self) -> List[Dict[str, str]]:
         """获取项目状态列表"""
-        items = self._logic.get_dict_items("project_status")
-        return [{"value": item.dict_value}
-                for item in items if item.is_active]
+        return self._get_values("project_status")
 
     def get_project_levels(self) -> List[Dict[str, str]]:
         """获取项目级别列表"""
-
-        items = self._logic.get_dict_items("project_level")
-        return [{"value": item.dict_value}
-                for item in items if item.is_active]
+        return self._get_values("project_level")
 
     def get_project_sources(self) -> List[Dict[str, str]]:
         """获取项目来源列表"""
-        items = self._logic.get_dict_items("project_source")
-        return [{"value": item.dict_value}
-                for item in items if item.is_active]
+        return self._get_values("project_source")
 
     def get_project_types(self) -> List[Dict[str, str]]:
         """获取项目类型列表"""
-        items = self._logic.get_dict_items("project_type")
-        return [{"value": item.dict_value}
-                for item in items if item.is_active]
+        return self._get_values("project_type")
 
     def get_result_types(self) -> List[Dict[str, str]]:
         """获取成果类型列表"""
-        items = self._logic.get_dict_items("result_type")
-        return [{"value": item.dict_value}
-                for item in items if item.is_active]
+        return self._get_values("result_type")
 
     def validate_dict_value(self, dict_type: str, dict_value: str) -> bool:
         """验证字典值是否有效"""
-        try:
-            items = self._logic.get_dict_items(dict_type)
-            return any(item.dict_value == dict_value and item.is_active
-                       for item in items)
-        except:
+        if not self._ensure_loaded():
             return True  # 如果数据字典不可用，允许所有值
+        return (dict_type, dict_value) in self._value_index
 
     @classmethod
     def get_type_values(cls, type_dict_list, key="value"):
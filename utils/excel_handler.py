@@ -4,12 +4,14 @@
 科研项目管理系统 - Excel处理工具模块
 提供Excel文件的导入、导出和模板生成功能
 """
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Tuple, Iterable
 
 import pandas as pd
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
 
 from utils.dict_utils import dict_utils
@@ -138,125 +140,145 @@ class ExcelTemplateGenerator:
 class ExcelImporter:
     """Excel导入器"""
 
-    @staticmethod
-    def import_projects_from_excel(file_path: str) -> List[Dict[str, Any]]:
-        """从Excel文件导入项目数据"""
-        try:
-            df = pd.read_excel(file_path, sheet_name="项目信息模板")
-
-            # 检查必要的列
-            required_columns = [
-                '项目名称', '项目负责人', '科室', '联系电话',
-                '项目来源', '项目类型', '项目级别', '资助经费（万元）',
-                '资助单位', '立项年度', '项目编号', '项目状态',
-                '项目开始时间', '项目结束时间'
-            ]
+    SHEET_NAME = "项目信息模板"
+
+    # Excel列名 -> 项目字段
+    COLUMN_FIELDS = {
+        '项目名称': 'project_name',
+        '项目负责人': 'leader',
+        '科室': 'department',
+        '联系电话': 'phone',
+        '项目来源': 'project_source',
+        '项目类型': 'project_type',
+        '项目级别': 'level',
+        '资助经费（万元）': 'funding_amount',
+        '资助单位': 'funding_unit',
+        '立项年度': 'approval_year',
+        '项目编号': 'project_number',
+        '项目状态': 'status',
+        '项目开始时间': 'start_date',
+        '项目结束时间': 'end_date',
+    }
+
+    TEXT_FIELDS = ['project_name', 'leader', 'department', 'phone', 'project_source', 'project_type',
+                   'level', 'funding_unit', 'approval_year', 'project_number', 'status']
 
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"缺少必要的列: {missing_columns}")
-
-            # 处理空值
-            df = df.dropna(subset=['项目名称'])  # 移除空行
-
-            projects = []
-            for _, row in df.iterrows():
-                try:
-                    project_data = {
-                        'project_name': str(row['项目名称']).strip(),
-                        'leader': str(row['项目负责人']).strip(),
-                        'department': str(row['科室']).strip(),
-                        'phone': str(row['联系电话']).strip(),
-                        'project_source': str(row['项目来源']).strip(),
-                        'project_type': str(row['项目类型']).strip(),
-                        'level': str(row['项目级别']).strip(),
-                        'funding_amount': float(row['资助经费（万元）']),
-                        'funding_unit': str(row['资助单位']).strip(),
-                        'approval_year': str(row['立项年度']).strip(),
-                        'project_number': str(row['项目编号']).strip(),
-                        'status': str(row['项目状态']).strip(),
-                        'start_date': pd.to_datetime(row['项目开始时间']).date(),
-                        'end_date': pd.to_datetime(row['项目结束时间']).date(),
-                    }
-                    projects.append(project_data)
-                except Exception as e:
-                    logger.warning(f"处理行数据失败: {str(e)}")
-                    continue
-
-            return projects
-
-        except Exception as e:
-            logger.error(f"导入Excel失败: {str(e)}")
-            raise
+    @classmethod
+    def read_projects_frame(cls, file_path: str) -> Tuple[pd.DataFrame, List[Tuple[int, str, str]]]:
+        """
+        读取Excel项目数据并按列整体转换类型
+
+        Returns:
+            Tuple[pd.DataFrame, List[Tuple[int, str, str]]]:
+                转换成功的数据（列为项目字段，row_number为Excel行号），
+                以及转换失败的行 [(Excel行号, 项目名称, 错误信息)]
+        """
+        # 按文本读取，避免联系电话、立项年度等被识别为浮点数
+        df = pd.read_excel(file_path, sheet_name=cls.SHEET_NAME, dtype=str)
+
+        missing_columns = [col for col in cls.COLUMN_FIELDS if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"缺少必要的列: {missing_columns}")
+
+        df = df[list(cls.COLUMN_FIELDS)].rename(columns=cls.COLUMN_FIELDS)
+        df['row_number'] = df.index + 2  # 第1行为表头
+        df = df.dropna(subset=['project_name'])  # 移除空行
+
+        for field in cls.TEXT_FIELDS:
+            df[field] = df[field].fillna('').str.strip()
+        df = df[df['project_name'] != '']
+
+        funding = pd.to_numeric(df['funding_amount'].str.replace(',', '', regex=False), errors='coerce')
+        start_date = pd.to_datetime(df['start_date'], errors='coerce', format='mixed')
+        end_date = pd.to_datetime(df['end_date'], errors='coerce', format='mixed')
+
+        # 同一行的多个错误合并为一条
+        row_errors: Dict[int, Tuple[str, List[str]]] = {}
+        invalid = pd.Series(False, index=df.index)
+        for mask, message in ((funding.isna(), '资助经费（万元）格式错误'),
+                              (start_date.isna(), '项目开始时间格式错误'),
+                              (end_date.isna(), '项目结束时间格式错误')):
+            for row, name in zip(df.loc[mask, 'row_number'].tolist(), df.loc[mask, 'project_name'].tolist()):
+                row_errors.setdefault(row, (name, []))[1].append(message)
+            invalid |= mask
+        errors = [(row, name, '; '.join(messages)) for row, (name, messages) in sorted(row_errors.items())]
+
+        df = df.assign(funding_amount=funding, start_date=start_date.dt.date, end_date=end_date.dt.date)
+        return df[~invalid], errors
 
 
 class ExcelExporter:
     """Excel导出器"""
 
-    @staticmethod
-    def export_projects_to_excel(projects: List[Dict[str, Any]], file_path: str) -> bool:
-        """将项目数据导出到Excel"""
+    # 项目字段 -> Excel列名
+    COLUMN_MAPPING = {
+        'project_name': '项目名称',
+        'leader': '项目负责人',
+        'department': '科室',
+        'phone': '联系电话',
+        'project_source': '项目来源',
+        'project_type': '项目类型',
+        'level': '项目级别',
+        'funding_amount': '资助经费（万元）',
+        'funding_unit': '资助单位',
+        'approval_year': '立项年度',
+        'project_number': '项目编号',
+        'status': '项目状态',
+        'start_date': '项目开始时间',
+        'end_date': '项目结束时间',
+    }
+
+    _FUNDING_INDEX = list(COLUMN_MAPPING).index('funding_amount')
+
+    # 用于估算列宽的样本行数
+    WIDTH_SAMPLE_SIZE = 200
+
+    MAX_COLUMN_WIDTH = 50
+
+    @classmethod
+    def export_projects_to_excel(cls, projects: Iterable[Dict[str, Any]], file_path: str) -> bool:
+        """
+        将项目数据流式导出到Excel
+
+        使用openpyxl的write_only模式逐行写入，projects可以是列表或DAO返回的迭代器，
+        内存占用与导出的行数无关。列宽按前WIDTH_SAMPLE_SIZE行估算。
+
+        Returns:
+            bool: 是否成功，没有数据时返回False
+        """
         try:
-            if not projects:
+            rows = (cls._project_row(project) for project in projects)
+            sample = list(islice(rows, cls.WIDTH_SAMPLE_SIZE))
+            if not sample:
                 return False
 
-            df = pd.DataFrame(projects)
-
-            # 重命名列以匹配中文标题
-            column_mapping = {
-                'project_name': '项目名称',
-                'leader': '项目负责人',
-                'department': '科室',
-                'phone': '联系电话',
-                'project_source': '项目来源',
-                'project_type': '项目类型',
-                'level': '项目级别',
-                'funding_amount': '资助经费（万元）',
-                'funding_unit': '资助单位',
-                'approval_year': '立项年度',
-                'project_number': '项目编号',
-                'status': '项目状态',
-                'start_date': '项目开始时间',
-                'end_date': '项目结束时间',
-            }
-
-            df = df.rename(columns=column_mapping)
-
-            # 只保留需要的列
-            df = df[[col for col in column_mapping.values() if col in df.columns]]
-
-            # 创建Excel工作簿
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "项目信息"
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("项目信息")
 
-            # 将DataFrame数据写入工作表
-            for r in dataframe_to_rows(df, index=False, header=True):
-                ws.append(r)
+            # write_only模式下列宽必须在写入数据前设置
+            headers = list(cls.COLUMN_MAPPING.values())
+            for index, header in enumerate(headers):
+                width = max([column_widths[index], len(header)] +
+                            [len(str(row[index])) for row in sample if row[index] is not None])
+                ws.column_dimensions[get_column_letter(index + 1)].width = min(width, cls.MAX_COLUMN_WIDTH)
 
-            # 设置样式
+            # 标题行样式只创建一次
             header_font = Font(bold=True, size=12, color="FFFFFF")
             header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
             header_alignment = Alignment(horizontal="center", vertical="center")
-
-            # 应用样式到标题行
-            for cell in ws[1]:
+            header_cells = []
+            for header in headers:
+                cell = WriteOnlyCell(ws, value=header)
                 cell.font = header_font
                 cell.fill = header_fill
                 cell.alignment = header_alignment
+                header_cells.append(cell)
+            ws.append(header_cells)
 
-            # 调整列宽
-            for index, column in enumerate(ws.columns):
-                max_length = column_widths[index]
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            for row in sample:
+                ws.append(row)
+            for row in rows:
+                ws.append(row)
 
             wb.save(file_path)
             return True
@@ -264,3 +286,13 @@ class ExcelExporter:
         except Exception as e:
             logger.error(f"导出Excel失败: {str(e)}")
             return False
+
+    @classmethod
+    def _project_row(cls, project: Dict[str, Any]) -> List[Any]:
+        """项目数据转换为Excel行，资助经费按数值写入"""
+        row = [project.get(field) for field in cls.COLUMN_MAPPING]
+        try:
+            row[cls._FUNDING_INDEX] = float(row[cls._FUNDING_INDEX])
+        except (TypeError, ValueError):
+            pass
+        return row